@@ -1,3 +1,6 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import FreeSimpleGUI as sg
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -10,6 +13,7 @@ from controllers.fila_de_espera_controller import FilaController
 from controllers.funcionario_controller import FuncionarioController
 from controllers.cardapio_controller import CardapioController
 from controllers.grupo_cliente_controller import ClienteController
+from models.excecoes import DiaComAtendimentoAbertoError
 
 from views.gui_main_view import GuiMainView
 from views.gui_equipe_view import GuiEquipeView
@@ -20,6 +24,10 @@ from views.gui_checkout_view import GuiCheckoutView
 
 from views.ui_theme import configure_global_ui
 
+from persistence.abstract_dao import tempos_de_carga
+from persistence.armazenamento import configurar_armazenamento, encerrar_armazenamento
+from persistence.carga_preguicosa import aguardar_cargas
+
 
 def _get_selected_mesa_id(values: Dict[str, Any], mesas_cache: List[Dict[str, Any]]) -> Optional[int]:
     selecionadas = values.get("-TABELA_MESAS-")
@@ -91,20 +99,39 @@ def _atualizar_pedidos_da_mesa(
 
 # --- Funções Principais de Construção e Execução ---
 
-def build_app_gui() -> Dict[str, Any]:
+def build_app_gui(backend: str = "pickle", durabilidade: str = "batched") -> Dict[str, Any]:
     configure_global_ui() 
-
-    cliente_ctrl = ClienteController()
-    fila_ctrl = FilaController(cliente_controller=cliente_ctrl)
-    mesa_ctrl = MesaController()
-    func_ctrl = FuncionarioController()
-    cardapio_ctrl = CardapioController()
+    # "pickle" (journal em arquivos .pkl) ou "sqlite" (restaurante.db com índices);
+    # fora do modo "sync" a gravação em disco fica numa thread e a GUI não espera por ela
+    configurar_armazenamento(backend, durabilidade=durabilidade)
+
+    # cada controller carrega o próprio DAO; os arquivos são independentes, então a carga
+    # roda em paralelo (o mapa de identidade liga as referências em qualquer ordem).
+    # Construtor que lê entidades de outro DAO espera pelo future dele: a fila procura
+    # cada grupo pelo id, então só é montada depois dos grupos.
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        cliente_f = pool.submit(ClienteController)
+        mesa_f = pool.submit(MesaController)
+        func_f = pool.submit(FuncionarioController)
+        cardapio_f = pool.submit(CardapioController)
+        fila_f = pool.submit(lambda: FilaController(cliente_controller=cliente_f.result()))
+
+        cliente_ctrl = cliente_f.result()
+        fila_ctrl = fila_f.result()
+        mesa_ctrl = mesa_f.result()
+        func_ctrl = func_f.result()
+        cardapio_ctrl = cardapio_f.result()
+
+    # contas e pedidos crescem com o histórico e ficam fora da abertura da janela: carregam
+    # na primeira vez que alguém precisa deles ou na pré-carga que o run_gui dispara. As
+    # contas leem a mesa de cada uma (c.mesa.id_mesa), por isso só depois das mesas
     conta_ctrl = ContaController()
-    
     pedido_ctrl = PedidoController(
-        conta_controller=conta_ctrl, 
-        cardapio_controller=cardapio_ctrl
+        conta_controller=conta_ctrl,
+        cardapio_controller=cardapio_ctrl,
     )
+    dados_prontos_ms = (time.perf_counter() - inicio) * 1000
 
     restaurante = RestauranteController(
         mesa_controller=mesa_ctrl,
@@ -127,6 +154,10 @@ def build_app_gui() -> Dict[str, Any]:
         "func_ctrl": func_ctrl,
         "cardapio_ctrl": cardapio_ctrl,
         "gui": gui_view,
+        # tempo até os dados da janela estarem prontos e a carga de cada DAO; contas e
+        # pedidos entram no dicionário quando a carga deles termina
+        "dados_prontos_ms": dados_prontos_ms,
+        "tempos_de_carga": tempos_de_carga,
     }
 
 def run_gui(app_parts: Dict[str, Any]) -> None:
@@ -150,13 +181,22 @@ def run_gui(app_parts: Dict[str, Any]) -> None:
     mesas_cache, cardapio_cache = _atualizar_dashboard(gui, mesa_ctrl, fila_ctrl, cardapio_ctrl)
     mesa_id_selecionada: Optional[int] = None 
     gui.set_status("Sistema inicializado.")
+    # a janela já tem o que mostrar; o histórico de contas e pedidos carrega em segundo plano
+    # e o laço acorda de tempos em tempos para ver se terminou
+    restaurante.pre_carregar()
+    carga_concluida = False
 
     while True:
-        event, values = gui.read()
+        event, values = gui.read(timeout=None if carga_concluida else 100)
         
         if event in (sg.WIN_CLOSED, "-BTN_SAIR-"):
             break
 
+        if not carga_concluida:
+            carga_concluida = restaurante.concluir_carga()
+        if event == sg.TIMEOUT_EVENT:
+            continue
+
         try:
             if event == "-BTN_ATUALIZAR-":
                 mesas_cache, cardapio_cache = _atualizar_dashboard(gui, mesa_ctrl, fila_ctrl, cardapio_ctrl)
@@ -281,6 +321,14 @@ def run_gui(app_parts: Dict[str, Any]) -> None:
             elif event == "-BTN_STATS-": 
                 gui_stats.show_stats_window()
                 
+            elif event == "-BTN_FECHAR_DIA-":
+                dia = restaurante.dia_de_servico_atual()
+                if sg.popup_yes_no(f"Fechar o dia de serviço {dia}?", title="Fechar dia") == "Yes":
+                    try:
+                        gui.set_status(restaurante.fechar_dia())
+                    except DiaComAtendimentoAbertoError as e:
+                        gui.show_error(e.mensagem)
+
             elif event == "-BTN_MENU_ADMIN-": 
                 gui_cardapio.show_cardapio_window()
                 mesas_cache, cardapio_cache = _atualizar_dashboard(gui, mesa_ctrl, fila_ctrl, cardapio_ctrl)
@@ -290,4 +338,12 @@ def run_gui(app_parts: Dict[str, Any]) -> None:
             traceback.print_exc()
             gui.show_error(f"Erro de Sistema: {e}")
 
-    gui.close()
\ No newline at end of file
+    gui.close()
+    # grava o que ficou na fila do gravador antes de sair (e o que a pré-carga ainda regrava)
+    aguardar_cargas()
+    try:
+        encerrar_armazenamento()
+    except Exception as e:
+        # o que o gravador não conseguiu gravar se perde ao sair: avisa em vez de sair calado
+        print(f"[AVISO DAO] Falha ao gravar os dados antes de sair: {e}")
+        sg.popup_error(f"Falha ao gravar os dados antes de sair: {e}", title="Erro de gravação")
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""Vendas por prato, garçom e mesa numa janela de tempo: baldes por minuto contra reler o livro.
+
+Monta um histórico sintético de itens vendidos espalhados pelos últimos dias e grava
+no livro colunar, em segmentos de um dia fechado (lidos com mmap, como os dias
+passados). Mede quanto custa registrar uma venda (as linhas de um pedido) nos
+baldes (JanelasDeVendas), quanto leva montar os baldes da semana a partir do livro
+na primeira consulta e, para cada janela, a consulta pelos baldes
+(LivroDeItens.vendas_na_janela) contra o jeito sem baldes: ler as colunas, filtrar
+pelo instante e somar com bincount por prato, garçom e mesa.
+
+Roda numa pasta temporária, que é apagada no fim.
+
+Uso (a partir de src/):
+    python -m benchmarks.janelas_de_vendas
+    python -m benchmarks.janelas_de_vendas --itens 100000,3000000 --dias 30
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from persistence.janelas_de_vendas import DIMENSOES, MINUTOS_GUARDADOS, JanelaDeTempo, JanelasDeVendas, inicio_da_janela
+from persistence.livro_itens import COLUNAS, LivroDeItens
+
+ITENS_PADRAO = (100_000, 1_000_000)
+
+# vendas registradas uma a uma para medir o custo por venda
+VENDAS = 500
+
+
+def gerar_colunas(qtd_itens: int, dias: int, agora: float, semente: int = 42) -> Dict[str, np.ndarray]:
+    aleatorio = np.random.default_rng(semente)
+    # 1 a 4 itens por pedido, todos com o instante do pedido
+    qtd_pedidos = qtd_itens // 2
+    pedido_id = np.sort(aleatorio.integers(1, qtd_pedidos + 1, qtd_itens))
+    instante_do_pedido = np.sort(agora - aleatorio.uniform(0, dias * 86400, qtd_pedidos + 1))
+    return {
+        "pedido_id": pedido_id.astype(np.int64),
+        "prato_id": aleatorio.integers(1, 31, qtd_itens).astype(np.int32),
+        "quantidade": aleatorio.integers(1, 4, qtd_itens).astype(np.int32),
+        "preco_centavos": aleatorio.integers(1000, 8500, qtd_itens).astype(np.int64),
+        "instante": instante_do_pedido[pedido_id],
+        "garcom_id": aleatorio.integers(101, 106, qtd_itens).astype(np.int32),
+        "mesa_id": aleatorio.integers(1, 21, qtd_itens).astype(np.int32),
+        "conta_id": np.zeros(qtd_itens, dtype=np.int32),
+    }
+
+
+def por_varredura(livro: LivroDeItens, desde: float, agora: float) -> Dict[str, Dict[int, Tuple[int, int]]]:
+    """(itens, receita em centavos) por dimensão, relendo as colunas do livro."""
+    colunas = livro.colunas(nomes=["instante", "quantidade", "preco_centavos", *DIMENSOES])
+    # mesma resolução dos baldes: o minuto inteiro entra
+    minuto = colunas["instante"] // 60
+    janela = np.flatnonzero((minuto >= max(desde // 60, agora // 60 - MINUTOS_GUARDADOS + 1)) & (minuto <= agora // 60))
+    quantidade = colunas["quantidade"][janela]
+    receita = quantidade.astype(np.int64) * colunas["preco_centavos"][janela]
+    somas = {}
+    for dimensao in DIMENSOES:
+        chaves = colunas[dimensao][janela]
+        itens = np.bincount(chaves, weights=quantidade)
+        valores = np.bincount(chaves, weights=receita)
+        somas[dimensao] = {int(c): (int(itens[c]), int(valores[c])) for c in np.flatnonzero(itens)}
+    return somas
+
+
+def _melhor_de(funcao: Callable[[], object], repeticoes: int = 5, vezes: int = 1) -> Tuple[float, object]:
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        for _ in range(vezes):
+            resultado = funcao()
+        melhor = min(melhor, (time.perf_counter() - inicio) / vezes)
+    return melhor, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", default=",".join(str(i) for i in ITENS_PADRAO),
+                        help="tamanhos de histórico (itens vendidos) separados por vírgula")
+    parser.add_argument("--dias", type=int, default=14, help="dias de histórico, contados de agora para trás")
+    args = parser.parse_args()
+
+    origem = os.getcwd()
+    print("vendas por prato, garçom e mesa numa janela (melhor de 5)")
+    print(f"{'itens':>10} {'venda (µs)':>11} {'montar (ms)':>12} {'janela':>15} {'na janela':>10}"
+          f" {'varredura (ms)':>15} {'baldes (ms)':>12}")
+    with tempfile.TemporaryDirectory() as pasta:
+        # o dia de serviço e o livro ficam na pasta temporária, longe dos dados do restaurante
+        os.chdir(pasta)
+        try:
+            for qtd in (int(i) for i in args.itens.split(",")):
+                agora = time.time()
+                colunas = gerar_colunas(qtd, args.dias, agora)
+                # um dia fechado que abriu no começo do histórico e foi até agora
+                dia = (date.today() - timedelta(days=args.dias)).isoformat()
+                livro = LivroDeItens(pasta=os.path.join(pasta, f"livro-{qtd}"), sincronizar=False)
+                livro.importar(dia, colunas)
+
+                # os primeiros pedidos, um por vez, como chegam do atendimento
+                fins = np.flatnonzero(np.diff(colunas["pedido_id"][:VENDAS + 1000])) + 1
+                vendas = [{nome: c[inicio:fim] for nome, c in colunas.items()}
+                          for inicio, fim in zip(fins[:VENDAS], fins[1:VENDAS + 1])]
+                janelas = JanelasDeVendas()
+                t_venda, _ = _melhor_de(lambda: [janelas.registrar(v) for v in vendas])
+                t_venda /= len(vendas)
+
+                # a primeira consulta monta os baldes a partir do livro; as seguintes só os somam
+                inicio = time.perf_counter()
+                livro.vendas_na_janela(JanelaDeTempo.HOJE, agora)
+                t_montar = time.perf_counter() - inicio
+                for janela in JanelaDeTempo:
+                    desde = inicio_da_janela(janela, agora)
+                    t_varredura, esperado = _melhor_de(lambda: por_varredura(livro, desde, agora))
+                    t_baldes, obtido = _melhor_de(lambda: livro.vendas_na_janela(janela, agora))
+                    for dimensao in DIMENSOES:
+                        if {c: t[:2] for c, t in obtido[dimensao].items()} != esperado[dimensao]:
+                            raise AssertionError("Os baldes e a varredura não somaram o mesmo.")
+                    na_janela = sum(t[0] for t in obtido["mesa_id"].values())
+                    print(f"{qtd:>10} {t_venda * 1e6:>11.1f} {t_montar * 1000:>12.0f} {janela.value:>15} {na_janela:>10}"
+                          f" {t_varredura * 1000:>15.2f} {t_baldes * 1000:>12.2f}")
+                del colunas, livro
+        finally:
+            os.chdir(origem)
+
+
+if __name__ == "__main__":
+    main()
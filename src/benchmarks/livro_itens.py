@@ -0,0 +1,118 @@
+"""Quantidade vendida por prato: passeio pelos objetos dos pedidos contra o livro de itens.
+
+Monta um histórico sintético de pedidos (1 a 4 itens cada) e grava os mesmos itens
+no livro colunar, em segmentos de um dia fechado (lidos com mmap, como os dias
+passados). Mede o relatório de pratos do jeito antigo (Counter percorrendo
+pedido.itens), com LivroDeItens.somar_por (bincount sobre as colunas) e com os
+contadores mantidos pelo livro (vendas_por_prato), além do prato mais vendido
+(mais_vendidos(1)), que não depende do tamanho do histórico.
+
+Roda numa pasta temporária, que é apagada no fim.
+
+Uso (a partir de src/):
+    python -m benchmarks.livro_itens
+    python -m benchmarks.livro_itens --pedidos 100000,3000000
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from models.garcom import Garcom
+from models.grupo_cliente import GrupoCliente
+from models.mesa import Mesa
+from models.pedido import Pedido
+from models.prato import Prato
+from models.status_enums import StatusPedido
+from persistence.livro_itens import COLUNAS, LivroDeItens
+
+PEDIDOS_PADRAO = (100_000, 1_000_000)
+
+
+def gerar_pedidos(qtd_pedidos: int, semente: int = 42) -> List[Pedido]:
+    aleatorio = random.Random(semente)
+    mesas = [Mesa(i, 4) for i in range(1, 21)]
+    garcons = [Garcom(100 + i, f"Garcom {i}", 1500.0) for i in range(1, 6)]
+    pratos = [Prato(i, f"Prato {i}", 10 + i * 2.5, "") for i in range(1, 31)]
+    grupo = GrupoCliente(1, 2)
+    pedidos = []
+    for n in range(qtd_pedidos):
+        pedido = Pedido(aleatorio.choice(mesas), aleatorio.choice(garcons), grupo, id_pedido=n + 1)
+        for _ in range(aleatorio.randint(1, 4)):
+            pedido.adicionar_item(aleatorio.choice(pratos), aleatorio.randint(1, 3))
+        pedido._status = StatusPedido.ENTREGUE
+        pedidos.append(pedido)
+    return pedidos
+
+
+def colunas_dos_pedidos(pedidos: List[Pedido]) -> Dict[str, np.ndarray]:
+    linhas = [
+        (p.id_pedido, it.prato.id_prato, it.quantidade, it.subtotal_centavos // it.quantidade,
+         p.data_hora.timestamp(), p.garcom.id_funcionario, p.mesa.id_mesa, 0)
+        for p in pedidos for it in p.itens
+    ]
+    registros = np.array(linhas, dtype=list(COLUNAS))
+    return {nome: registros[nome] for nome, _ in COLUNAS}
+
+
+def por_objetos(pedidos: List[Pedido]) -> Dict[int, int]:
+    contagem: Counter = Counter()
+    for pedido in pedidos:
+        if pedido.status == StatusPedido.CANCELADO:
+            continue
+        for item in pedido.itens:
+            contagem[item.prato.id_prato] += item.quantidade
+    return dict(contagem)
+
+
+# vezes > 1 para o que leva microssegundos: o tempo é a média das chamadas seguidas
+def _melhor_de(funcao: Callable[[], object], repeticoes: int = 5, vezes: int = 1) -> Tuple[float, object]:
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        for _ in range(vezes):
+            resultado = funcao()
+        melhor = min(melhor, (time.perf_counter() - inicio) / vezes)
+    return melhor, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", default=",".join(str(p) for p in PEDIDOS_PADRAO),
+                        help="tamanhos de histórico (pedidos) separados por vírgula")
+    args = parser.parse_args()
+
+    origem = os.getcwd()
+    print("quantidade vendida por prato (melhor de 5)")
+    print(f"{'pedidos':>10} {'itens':>10} {'objetos (ms)':>13} {'colunas (ms)':>13}"
+          f" {'contadores (µs)':>16} {'top-1 (µs)':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        # o dia de serviço e o livro ficam na pasta temporária, longe dos dados do restaurante
+        os.chdir(pasta)
+        try:
+            for qtd in (int(p) for p in args.pedidos.split(",")):
+                pedidos = gerar_pedidos(qtd)
+                livro = LivroDeItens(pasta=os.path.join(pasta, f"livro-{qtd}"), sincronizar=False)
+                livro.importar("2000-01-01", colunas_dos_pedidos(pedidos))
+                t_objetos, esperado = _melhor_de(lambda: por_objetos(pedidos))
+                t_colunas, obtido = _melhor_de(lambda: livro.somar_por("prato_id", "quantidade"))
+                t_contadores, contado = _melhor_de(lambda: livro.vendas_por_prato(), vezes=1000)
+                t_top, top = _melhor_de(lambda: livro.mais_vendidos(1), vezes=1000)
+                if obtido != esperado or contado != esperado or top[0][1] != max(esperado.values()):
+                    raise AssertionError("O livro e os pedidos não somaram o mesmo.")
+                print(f"{qtd:>10} {len(livro):>10} {t_objetos * 1000:>13.1f} {t_colunas * 1000:>13.2f}"
+                      f" {t_contadores * 1e6:>16.1f} {t_top * 1e6:>11.1f}")
+                del pedidos, livro
+        finally:
+            os.chdir(origem)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Memória das entidades do histórico: classes com __slots__ contra o layout antigo com __dict__.
+
+O layout antigo é reproduzido com classes vazias que recebem os mesmos atributos
+(é o que eram Pedido, ItemPedido etc. antes dos slots). Mede, com tracemalloc, os
+bytes por entidade de cada tipo; depois, num processo novo para cada layout, quanto
+a memória residente (RSS) cresce ao montar um histórico sintético.
+
+Uso (a partir de src/):
+    python -m benchmarks.memoria_entidades
+    python -m benchmarks.memoria_entidades --pedidos 100000,3000000
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import resource
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from models.conta import Conta
+from models.grupo_cliente import GrupoCliente
+from models.item_pedido import ItemPedido
+from models.mesa import Mesa
+from models.pedido import Pedido
+from models.prato import Prato
+from models.status_enums import StatusGrupoCliente, StatusMesa, StatusPedido
+
+PEDIDOS_PADRAO = (100_000, 1_000_000)
+AMOSTRA_POR_TIPO = 100_000
+
+
+class _MesaComDict: pass
+class _PratoComDict: pass
+class _GrupoComDict: pass
+class _ContaComDict: pass
+class _PedidoComDict: pass
+class _ItemComDict: pass
+
+
+LAYOUTS: Dict[str, Dict[str, type]] = {
+    "__dict__": {"Mesa": _MesaComDict, "Prato": _PratoComDict, "GrupoCliente": _GrupoComDict,
+                 "Conta": _ContaComDict, "Pedido": _PedidoComDict, "ItemPedido": _ItemComDict},
+    "__slots__": {"Mesa": Mesa, "Prato": Prato, "GrupoCliente": GrupoCliente,
+                  "Conta": Conta, "Pedido": Pedido, "ItemPedido": ItemPedido},
+}
+
+
+def _novo(cls: type, **atributos) -> object:
+    # como a carga do disco: sem __init__, só os atributos
+    obj = cls.__new__(cls)
+    for nome, valor in atributos.items():
+        object.__setattr__(obj, nome, valor)
+    return obj
+
+
+def _fabricas(classes: Dict[str, type]) -> Dict[str, Callable[[int], object]]:
+    agora = datetime.now()
+    mesa = _novo(classes["Mesa"], _id_mesa=1, _capacidade=4, _status=StatusMesa.LIVRE,
+                 _grupo_cliente=None, _conta=None, _garcom_responsavel=None)
+    prato = _novo(classes["Prato"], _id_prato=1, _nome="Prato 1", _preco=42.5, _descricao="")
+    grupo = _novo(classes["GrupoCliente"], _id_grupo=1, _numero_pessoas=2, _status=StatusGrupoCliente.SAIU)
+    return {
+        "Mesa": lambda i: _novo(classes["Mesa"], _id_mesa=i, _capacidade=4, _status=StatusMesa.LIVRE,
+                                _grupo_cliente=None, _conta=None, _garcom_responsavel=None),
+        "Prato": lambda i: _novo(classes["Prato"], _id_prato=i, _nome="Prato", _preco=42.5, _descricao=""),
+        "GrupoCliente": lambda i: _novo(classes["GrupoCliente"], _id_grupo=i, _numero_pessoas=2,
+                                        _status=StatusGrupoCliente.SAIU),
+        "Conta": lambda i: _novo(classes["Conta"], _id_conta=i, _grupo_cliente=grupo, _mesa=mesa,
+                                 _pedidos=[], _aberta=False),
+        "Pedido": lambda i: _novo(classes["Pedido"], _id_pedido=i, _mesa=mesa, _garcom=None,
+                                  _grupo_cliente=grupo, _data_hora=agora, _status=StatusPedido.ENTREGUE,
+                                  _itens=[]),
+        "ItemPedido": lambda i: _novo(classes["ItemPedido"], _prato=prato, _quantidade=1,
+                                      _observacao="", _subtotal_centavos=4250),
+    }
+
+
+def _medir_alocado(construir: Callable[[], object]) -> Tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = construir()
+    total = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return total, resultado
+
+
+def bytes_por_entidade(layout: str, quantidade: int = AMOSTRA_POR_TIPO) -> Dict[str, float]:
+    fabricas = _fabricas(LAYOUTS[layout])
+    medidas = {}
+    for tipo, fabrica in fabricas.items():
+        lista: List[object] = [None] * quantidade
+        def construir():
+            for i in range(quantidade):
+                lista[i] = fabrica(i + 1)
+            return lista
+        total, _ = _medir_alocado(construir)
+        medidas[tipo] = total / quantidade
+        del lista
+    return medidas
+
+
+def montar_historico(layout: str, qtd_pedidos: int, semente: int = 42) -> List[object]:
+    """Histórico como o PedidoDAO guarda: contas com pedidos, pedidos com 1 a 4 itens."""
+    classes = LAYOUTS[layout]
+    aleatorio = random.Random(semente)
+    agora = datetime.now()
+    mesas = [_novo(classes["Mesa"], _id_mesa=i, _capacidade=4, _status=StatusMesa.LIVRE,
+                   _grupo_cliente=None, _conta=None, _garcom_responsavel=None) for i in range(1, 21)]
+    pratos = [_novo(classes["Prato"], _id_prato=i, _nome=f"Prato {i}", _preco=10 + i * 2.5, _descricao="")
+              for i in range(1, 31)]
+    historico: List[object] = []
+    conta = grupo = None
+    for n in range(qtd_pedidos):
+        if n % 3 == 0:
+            grupo = _novo(classes["GrupoCliente"], _id_grupo=n // 3 + 1, _numero_pessoas=aleatorio.randint(1, 6),
+                          _status=StatusGrupoCliente.SAIU)
+            conta = _novo(classes["Conta"], _id_conta=n // 3 + 1, _grupo_cliente=grupo,
+                          _mesa=aleatorio.choice(mesas), _pedidos=[], _aberta=False)
+            historico.append(conta)
+        itens = []
+        for _ in range(aleatorio.randint(1, 4)):
+            prato, qtd = aleatorio.choice(pratos), aleatorio.randint(1, 3)
+            itens.append(_novo(classes["ItemPedido"], _prato=prato, _quantidade=qtd, _observacao="",
+                               _subtotal_centavos=round(prato._preco * 100) * qtd))
+        pedido = _novo(classes["Pedido"], _id_pedido=n + 1, _mesa=conta._mesa, _garcom=None,
+                       _grupo_cliente=grupo, _data_hora=agora, _status=StatusPedido.ENTREGUE, _itens=itens)
+        conta._pedidos.append(pedido)
+    return historico
+
+
+def _rss_atual() -> int:
+    # /proc só existe no Linux; fora dele fica o pico do processo (ru_maxrss, em KiB)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _rss_filho(layout: str, qtd_pedidos: int, fila) -> None:
+    gc.collect()
+    inicio = _rss_atual()
+    historico = montar_historico(layout, qtd_pedidos)
+    fila.put((_rss_atual() - inicio, len(historico)))
+
+
+# processo novo por medida: o RSS do pai já inclui o que as medidas anteriores alocaram
+def crescimento_rss(layout: str, qtd_pedidos: int) -> int:
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_rss_filho, args=(layout, qtd_pedidos, fila))
+    processo.start()
+    crescimento, _ = fila.get()
+    processo.join()
+    return crescimento
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", default=",".join(str(p) for p in PEDIDOS_PADRAO),
+                        help="tamanhos de histórico (pedidos) separados por vírgula")
+    args = parser.parse_args()
+
+    print(f"bytes por entidade (média de {AMOSTRA_POR_TIPO} instâncias)")
+    print(f"{'entidade':>12} {'__dict__':>9} {'__slots__':>10} {'redução':>8}")
+    antes, depois = bytes_por_entidade("__dict__"), bytes_por_entidade("__slots__")
+    for tipo in antes:
+        print(f"{tipo:>12} {antes[tipo]:>9.0f} {depois[tipo]:>10.0f} {1 - depois[tipo] / antes[tipo]:>8.0%}")
+
+    print()
+    print("histórico: RSS de um processo novo antes e depois de montar (contas, pedidos e itens)")
+    print(f"{'pedidos':>10} {'__dict__ (MiB)':>15} {'__slots__ (MiB)':>16} {'redução':>8}")
+    for qtd in (int(p) for p in args.pedidos.split(",")):
+        antes, depois = (crescimento_rss(layout, qtd) for layout in LAYOUTS)
+        print(f"{qtd:>10} {antes / 2**20:>15.1f} {depois / 2**20:>16.1f} {1 - depois / antes:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Compara as políticas de alocação da fila de espera (FIFO, gulosa e ótima).
+
+Simula um salão por algumas horas, minuto a minuto: grupos chegam, esperam na fila,
+são alocados a cada minuto pela política e saem depois de um tempo de refeição. Mede
+pessoas sentadas por hora, espera média e o tempo gasto planejando. Depois mede só o
+tempo de planejamento em filas grandes (1 mil grupos ou mais).
+
+Uso (a partir de src/):
+    python -m benchmarks.motor_alocacao
+    python -m benchmarks.motor_alocacao --horas 8 --filas 1000,10000,100000
+"""
+import argparse
+import heapq
+import random
+import time
+from typing import Dict, List, Tuple
+
+from controllers.motor_alocacao import (
+    ObjetivoAlocacao, PoliticaAlocacao, PoliticaFifo, PoliticaGulosa, PoliticaOtima,
+)
+from models.grupo_cliente import GrupoCliente
+from models.mesa import Mesa
+
+FILAS_PADRAO = (1_000, 10_000, 100_000)
+# tamanho do grupo -> peso (casais e grupos de 4 são a maioria)
+TAMANHOS = {1: 10, 2: 30, 3: 15, 4: 25, 5: 8, 6: 7, 7: 3, 8: 2}
+CAPACIDADES = (2, 2, 4, 4, 4, 6, 8)
+
+
+def politicas() -> Dict[str, PoliticaAlocacao]:
+    return {
+        "fifo": PoliticaFifo(),
+        "gulosa": PoliticaGulosa(),
+        "otima": PoliticaOtima(),
+        "otima-desperdicio": PoliticaOtima(ObjetivoAlocacao.MENOS_DESPERDICIO),
+        "otima-limite-10": PoliticaOtima(limite_ultrapassagem=10),
+    }
+
+
+def gerar_mesas(quantidade: int) -> List[Mesa]:
+    return [Mesa(i + 1, CAPACIDADES[i % len(CAPACIDADES)]) for i in range(quantidade)]
+
+
+def gerar_grupos(quantidade: int, aleatorio: random.Random) -> List[GrupoCliente]:
+    tamanhos = aleatorio.choices(list(TAMANHOS), weights=list(TAMANHOS.values()), k=quantidade)
+    return [GrupoCliente(i + 1, t) for i, t in enumerate(tamanhos)]
+
+
+def simular(politica: PoliticaAlocacao, horas: int, qtd_mesas: int, chegadas_por_hora: float,
+            semente: int = 42) -> Tuple[float, float, float]:
+    """Devolve (pessoas sentadas por hora, espera média em minutos, segundos planejando)."""
+    aleatorio = random.Random(semente)
+    mesas = gerar_mesas(qtd_mesas)
+    livres = {m.id_mesa: m for m in mesas}
+    saidas: List[Tuple[int, int]] = []  # heap de (minuto da saída, id da mesa)
+    fila: List[GrupoCliente] = []
+    chegada: Dict[int, int] = {}
+    sentadas = espera_total = grupos_sentados = 0
+    tempo_planejando = 0.0
+    proximo_id = 1
+
+    for minuto in range(horas * 60):
+        while saidas and saidas[0][0] <= minuto:
+            _, id_mesa = heapq.heappop(saidas)
+            livres[id_mesa] = mesas[id_mesa - 1]
+        # chegadas de Poisson: número de chegadas no minuto
+        for _ in range(_poisson(aleatorio, chegadas_por_hora / 60)):
+            tamanho = aleatorio.choices(list(TAMANHOS), weights=list(TAMANHOS.values()))[0]
+            fila.append(GrupoCliente(proximo_id, tamanho))
+            chegada[proximo_id] = minuto
+            proximo_id += 1
+
+        inicio = time.perf_counter()
+        plano = politica.planejar(fila, list(livres.values()))
+        tempo_planejando += time.perf_counter() - inicio
+
+        sentados = set()
+        for grupo, mesa in plano:
+            del livres[mesa.id_mesa]
+            heapq.heappush(saidas, (minuto + aleatorio.randint(40, 90), mesa.id_mesa))
+            sentados.add(grupo.id_grupo)
+            sentadas += grupo.numero_pessoas
+            espera_total += minuto - chegada.pop(grupo.id_grupo)
+        grupos_sentados += len(sentados)
+        if sentados:
+            fila = [g for g in fila if g.id_grupo not in sentados]
+
+    return sentadas / horas, espera_total / max(grupos_sentados, 1), tempo_planejando
+
+
+def _poisson(aleatorio: random.Random, media: float) -> int:
+    # inversão simples; a média por minuto é pequena
+    limite, k, p = pow(2.718281828459045, -media), 0, aleatorio.random()
+    while p > limite:
+        k += 1
+        p *= aleatorio.random()
+    return k
+
+
+def medir_planejamento(politica: PoliticaAlocacao, fila: List[GrupoCliente], mesas: List[Mesa],
+                       repeticoes: int = 5) -> Tuple[float, int]:
+    melhor, plano = float("inf"), []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        plano = politica.planejar(fila, mesas)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, sum(g.numero_pessoas for g, _ in plano)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horas", type=int, default=6, help="duração da simulação")
+    parser.add_argument("--mesas", type=int, default=40, help="quantidade de mesas do salão")
+    parser.add_argument("--chegadas", type=float, default=90.0,
+                        help="grupos por hora (acima da capacidade do salão, para a fila crescer)")
+    parser.add_argument("--filas", default=",".join(str(f) for f in FILAS_PADRAO),
+                        help="tamanhos de fila para medir só o planejamento, separados por vírgula")
+    args = parser.parse_args()
+
+    print(f"simulação: {args.horas} h, {args.mesas} mesas, {args.chegadas:.0f} grupos/h")
+    print(f"{'política':>18} {'pessoas/h':>10} {'espera (min)':>13} {'planejando (s)':>15}")
+    for nome, politica in politicas().items():
+        por_hora, espera, tempo = simular(politica, args.horas, args.mesas, args.chegadas)
+        print(f"{nome:>18} {por_hora:>10.1f} {espera:>13.1f} {tempo:>15.3f}")
+
+    print()
+    print(f"planejamento com {args.mesas} mesas livres (melhor de 5)")
+    print(f"{'grupos':>10} {'política':>18} {'pessoas':>8} {'tempo (ms)':>11}")
+    mesas = gerar_mesas(args.mesas)
+    for qtd in (int(f) for f in args.filas.split(",")):
+        fila = gerar_grupos(qtd, random.Random(qtd))
+        for nome, politica in politicas().items():
+            tempo, pessoas = medir_planejamento(politica, fila, mesas)
+            print(f"{qtd:>10} {nome:>18} {pessoas:>8} {tempo * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
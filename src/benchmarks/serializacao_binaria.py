@@ -0,0 +1,89 @@
+"""Compara o pickle do grafo inteiro (formato antigo dos .pkl) com o formato binário.
+
+Uso (a partir de src/):
+    python -m benchmarks.serializacao_binaria
+    python -m benchmarks.serializacao_binaria --tamanhos 10000,100000
+"""
+import argparse
+import gc
+import pickle
+import random
+import time
+from typing import Dict, List, Tuple
+
+from models.mesa import Mesa
+from models.garcom import Garcom
+from models.grupo_cliente import GrupoCliente
+from models.pedido import Pedido
+from models.prato import Prato
+from models.status_enums import StatusPedido
+from persistence.codec_binario import codificar, decodificar, empacotar_registros, desempacotar_registros
+from persistence.mapa_identidade import MapaIdentidade
+
+TAMANHOS_PADRAO = (10_000, 100_000, 1_000_000)
+
+
+def gerar_historico(qtd_pedidos: int, semente: int = 42) -> Dict[int, Pedido]:
+    aleatorio = random.Random(semente)
+    mesas = [Mesa(i, aleatorio.choice((2, 4, 6))) for i in range(1, 21)]
+    garcons = [Garcom(100 + i, f"Garcom {i}", 1500.0) for i in range(1, 6)]
+    pratos = [Prato(i, f"Prato {i}", 10 + i * 2.5, f"Descrição do prato {i}.") for i in range(1, 31)]
+    grupos: List[GrupoCliente] = []
+
+    Pedido._proximo_id = 1
+    pedidos: Dict[int, Pedido] = {}
+    for n in range(qtd_pedidos):
+        if n % 3 == 0:
+            grupos.append(GrupoCliente(len(grupos) + 1, aleatorio.randint(1, 6)))
+        pedido = Pedido(aleatorio.choice(mesas), aleatorio.choice(garcons), grupos[-1])
+        for _ in range(aleatorio.randint(1, 4)):
+            pedido.adicionar_item(aleatorio.choice(pratos), aleatorio.randint(1, 3))
+        pedido._status = StatusPedido.ENTREGUE
+        pedidos[pedido.id_pedido] = pedido
+    return pedidos
+
+
+def _medir(funcao) -> Tuple[float, object]:
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_pickle(pedidos: Dict[int, Pedido]) -> Tuple[int, float, float]:
+    t_dump, dados = _medir(lambda: pickle.dumps(pedidos))
+    t_load, _ = _medir(lambda: pickle.loads(dados))
+    return len(dados), t_dump, t_load
+
+
+def medir_binario(pedidos: Dict[int, Pedido]) -> Tuple[int, float, float]:
+    t_dump, dados = _medir(
+        lambda: empacotar_registros([(key, codificar(p)) for key, p in pedidos.items()])
+    )
+
+    def carregar():
+        # as referências (mesa, garçom, grupo) viram reservas num mapa local, como na carga dos DAOs
+        local = MapaIdentidade()
+        return {key: decodificar(r, local.resolver) for key, r in desempacotar_registros(dados)}
+
+    t_load, _ = _medir(carregar)
+    return len(dados), t_dump, t_load
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS_PADRAO),
+                        help="quantidades de pedidos separadas por vírgula")
+    args = parser.parse_args()
+
+    print(f"{'pedidos':>10} {'formato':>8} {'tamanho (MiB)':>14} {'dump (s)':>9} {'load (s)':>9}")
+    for qtd in (int(t) for t in args.tamanhos.split(",")):
+        pedidos = gerar_historico(qtd)
+        for nome, medir in (("pickle", medir_pickle), ("binario", medir_binario)):
+            tamanho, t_dump, t_load = medir(pedidos)
+            print(f"{qtd:>10} {nome:>8} {tamanho / 2**20:>14.2f} {t_dump:>9.3f} {t_load:>9.3f}")
+        del pedidos
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Coleções devolvidas pelos modelos: visões somente leitura contra cópias defensivas.
+
+Antes, Pedido.itens, Conta.pedidos, Cozinheiro.pedidos_em_preparo, a fila de espera
+e Cardapio.pratos devolviam uma lista nova a cada leitura. Agora devolvem a própria
+tupla (ou uma tupla guardada até a próxima mudança). O modo "cópia" reproduz o
+comportamento antigo fazendo list() de cada coleção lida.
+
+Um refresh do painel lê o que o dashboard e a tela de conta leem: a fila, os pedidos
+em preparo de cada cozinheiro e, para cada conta aberta, os pedidos e os itens de
+cada pedido. Mede os bytes alocados só pelas leituras de coleções (tracemalloc, com
+as coleções lidas retidas para não serem reaproveitadas) e o tempo por refresh.
+
+Uso (a partir de src/):
+    python -m benchmarks.visoes_somente_leitura
+    python -m benchmarks.visoes_somente_leitura --contas 50 --refreshes 2000
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+from models.conta import Conta
+from models.cozinheiro import Cozinheiro
+from models.fila_de_espera import FilaDeEspera
+from models.garcom import Garcom
+from models.grupo_cliente import GrupoCliente
+from models.mesa import Mesa
+from models.pedido import Pedido
+from models.prato import Prato
+
+Leitura = Callable[[Sequence], Sequence]
+
+MODOS = {
+    "cópia": list,            # o .copy() de antes
+    "visão": lambda c: c,     # a coleção como o modelo devolve
+}
+
+
+def montar_salao(qtd_contas: int, semente: int = 42) -> Tuple[List[Conta], List[Cozinheiro], FilaDeEspera]:
+    aleatorio = random.Random(semente)
+    pratos = [Prato(i, f"Prato {i}", 10 + i * 2.5, "") for i in range(1, 31)]
+    garcom = Garcom(101, "Garcom 1", 1500.0)
+    cozinheiros = [Cozinheiro(200 + i, f"Cozinheiro {i}", 2500.0) for i in range(1, 6)]
+    contas: List[Conta] = []
+    for i in range(1, qtd_contas + 1):
+        mesa, grupo = Mesa(i, 4), GrupoCliente(i, aleatorio.randint(1, 4))
+        conta = Conta(i, grupo, mesa)
+        for _ in range(aleatorio.randint(1, 5)):
+            pedido = Pedido(mesa, garcom, grupo)
+            for _ in range(aleatorio.randint(1, 4)):
+                pedido.adicionar_item(aleatorio.choice(pratos), aleatorio.randint(1, 3))
+            conta.adicionar_pedido(pedido)
+        contas.append(conta)
+    for n, conta in enumerate(contas):
+        # um pedido por conta em preparo, distribuído entre os cozinheiros
+        conta.pedidos[0].confirmar()
+        cozinheiros[n % len(cozinheiros)].iniciar_preparo_pedido(conta.pedidos[0])
+    fila = FilaDeEspera()
+    for i in range(qtd_contas, qtd_contas + 30):
+        fila.adicionar_grupo(GrupoCliente(i, aleatorio.randint(1, 8)))
+    return contas, cozinheiros, fila
+
+
+def refresh(contas: Iterable[Conta], cozinheiros: Iterable[Cozinheiro], fila: FilaDeEspera,
+            ler: Leitura, retidas: List[Sequence]) -> int:
+    """Um refresh do painel; devolve quantos itens foram lidos (para o trabalho não sumir)."""
+    lidos = 0
+    grupos = ler(fila.grupos)
+    retidas.append(grupos)
+    lidos += sum(g.numero_pessoas for g in grupos)
+    for cozinheiro in cozinheiros:
+        pedidos = ler(cozinheiro.pedidos_em_preparo)
+        retidas.append(pedidos)
+        lidos += len(pedidos)
+    for conta in contas:
+        pedidos = ler(conta.pedidos)
+        retidas.append(pedidos)
+        for pedido in pedidos:
+            itens = ler(pedido.itens)
+            retidas.append(itens)
+            lidos += sum(item.quantidade for item in itens)
+    return lidos
+
+
+def bytes_por_refresh(salao, ler: Leitura, refreshes: int) -> Tuple[float, int]:
+    """(bytes alocados por refresh, coleções lidas por refresh)"""
+    retidas: List[Sequence] = []
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    for _ in range(refreshes):
+        refresh(*salao, ler, retidas)
+    # a própria lista de retidas não conta
+    total = tracemalloc.get_traced_memory()[0] - inicio - sys.getsizeof(retidas)
+    tracemalloc.stop()
+    return total / refreshes, len(retidas) // refreshes
+
+
+def tempo_por_refresh(salao, ler: Leitura, refreshes: int) -> float:
+    descarte: List[Sequence] = []
+    melhor = float("inf")
+    for _ in range(5):
+        gc.collect()
+        inicio = time.perf_counter()
+        for _ in range(refreshes):
+            refresh(*salao, ler, descarte)
+            descarte.clear()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / refreshes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contas", default="10,50,200", help="contas abertas no salão, separadas por vírgula")
+    parser.add_argument("--refreshes", type=int, default=1000, help="refreshes do painel por medida")
+    args = parser.parse_args()
+
+    print(f"refresh do painel (média de {args.refreshes} refreshes)")
+    print(f"{'contas':>7} {'coleções':>9} {'modo':>6} {'bytes/refresh':>14} {'µs/refresh':>11}")
+    for qtd in (int(c) for c in args.contas.split(",")):
+        salao = montar_salao(qtd)
+        for modo, ler in MODOS.items():
+            alocado, colecoes = bytes_por_refresh(salao, ler, args.refreshes)
+            tempo = tempo_por_refresh(salao, ler, args.refreshes)
+            print(f"{qtd:>7} {colecoes:>9} {modo:>6} {alocado:>14.0f} {tempo * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from models.conta import Conta
 from models.grupo_cliente import GrupoCliente
 from models.mesa import Mesa
+from persistence.carga_preguicosa import CargaPreguicosa
 from persistence.conta_dao import ContaDAO
+from persistence.unidade_de_trabalho import transacao_atual
 
 
 class ContaController:
     def __init__(self):
-        self._dao = ContaDAO()
+        # as contas (abertas e o histórico das fechadas) só carregam quando alguém precisa delas
+        # ou em pre_carregar(); o ContaDAO lê c.mesa.id_mesa, então as mesas vêm antes
+        self._carga = CargaPreguicosa(ContaDAO, tipos=("Conta",))
+        # id da mesa -> conta aberta nela; a busca mais frequente da aplicação não depende do histórico.
+        # Montado na primeira busca, não aqui: na carga paralela as mesas podem ainda ser reservas vazias
+        self._abertas_por_mesa: Optional[Dict[int, Conta]] = None
+
+    @property
+    def _dao(self) -> ContaDAO:
+        return self._carga.obter()
+
+    # adianta a carga numa thread de fundo (a janela abre sem esperar pelo histórico)
+    def pre_carregar(self) -> None:
+        self._carga.iniciar()
+
+    @property
+    def carregado(self) -> bool:
+        return self._carga.pronta
+
+    def _indice(self) -> Dict[int, Conta]:
+        if self._abertas_por_mesa is None:
+            self._abertas_por_mesa = {c.mesa.id_mesa: c for c in self._dao.listar_abertas()}
+        return self._abertas_por_mesa
+
+    def _indexar_aberta(self, id_mesa: int, conta: Optional[Conta]) -> None:
+        anterior = self._indice().get(id_mesa)
+        self._definir_aberta(id_mesa, conta)
+        transacao = transacao_atual()
+        if transacao is not None:
+            # se a ação falhar, o DAO volta a conta e o índice volta junto
+            transacao.ao_desfazer(lambda: self._definir_aberta(id_mesa, anterior), self._dao)
+
+    def _definir_aberta(self, id_mesa: int, conta: Optional[Conta]) -> None:
+        if conta is None:
+            self._indice().pop(id_mesa, None)
+        else:
+            self._indice()[id_mesa] = conta
 
     def _gerar_id_conta(self) -> int:
         return self._dao.get_proximo_id()
@@ -28,6 +66,7 @@ class ContaController:
             pass
 
         self._dao.add(novo_id, nova_conta)
+        self._indexar_aberta(mesa.id_mesa, nova_conta)
         return nova_conta
 
     def fechar_conta(self, conta: Conta) -> None:
@@ -35,17 +74,32 @@ class ContaController:
             raise TypeError("Objeto fornecido não é uma Conta válida.")
         conta.fechar()
         self._dao.update(conta.id_conta, conta)
+        if self._indice().get(conta.mesa.id_mesa) is conta:
+            self._indexar_aberta(conta.mesa.id_mesa, None)
 
     def atualizar_conta(self, conta: Conta) -> None:
         if not isinstance(conta, Conta):
             raise TypeError("Objeto fornecido não é uma Conta válida.")
         self._dao.update(conta.id_conta, conta)
 
+    # a conta entra na transação atual antes de ser mexida; num rollback ela volta ao que foi gravado
+    def acompanhar_conta(self, conta: Conta) -> None:
+        self._dao.acompanhar(conta.id_conta)
+
     def encontrar_conta_por_mesa(self, numero_mesa: int) -> Optional[Conta]:
-        for conta in self._dao.get_all():
-            if conta.esta_aberta and conta.mesa.id_mesa == numero_mesa:
-                return conta
-        return None
+        return self._indice().get(numero_mesa)
 
     def listar_contas(self) -> List[Conta]:
         return self._dao.get_all()
+
+    def listar_contas_fechadas(self) -> List[Conta]:
+        return self._dao.listar_fechadas()
+
+    def listar_contas_abertas(self) -> List[Conta]:
+        return self._dao.listar_abertas()
+
+    def arquivar_contas(self, contas: List[Conta]) -> None:
+        self._dao.arquivar([c.id_conta for c in contas])
+
+    def arquivo_morto(self):
+        return self._dao.arquivo_morto()
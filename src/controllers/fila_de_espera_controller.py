@@ -3,6 +3,7 @@ from models.fila_de_espera import FilaDeEspera
 from models.grupo_cliente import GrupoCliente
 
 from persistence.fila_de_espera_dao import FilaDeEsperaDAO
+from persistence.unidade_de_trabalho import transacao_atual
 from controllers.grupo_cliente_controller import ClienteController 
 
 class FilaController:
@@ -29,29 +30,35 @@ class FilaController:
     def adicionar_grupo(self, grupo: GrupoCliente) -> None:
         self._fila_de_espera.adicionar_grupo(grupo)
         self._dao.adicionar_id(grupo.id_grupo)
+        transacao = transacao_atual()
+        if transacao is not None:
+            transacao.ao_desfazer(lambda: self._retirar_se_na_fila(grupo), self._dao)
 
+    def _retirar_se_na_fila(self, grupo: GrupoCliente) -> None:
+        if grupo in self._fila_de_espera:
+            self._fila_de_espera.remover(grupo)
+
+    # a fila em memória e o DAO guardam a mesma ordem (a de chegada); o DAO só registra a saída
     def chamar_proximo_grupo(self, capacidade_disponivel: int) -> Optional[GrupoCliente]:
-        
-        grupos_persistidos = self._cliente_controller._dao._grupos 
-        
-        id_proximo = self._dao.chamar_proximo_id(capacidade_disponivel, grupos_persistidos)
-        
-        if id_proximo > 0:
-            for i, grupo in enumerate(self._fila_de_espera.to_list()):
-                if grupo.id_grupo == id_proximo:
-                    return self._fila_de_espera._fila.pop(i) 
-        
-        return None
+        grupo = self._fila_de_espera.proximo_que_cabe(capacidade_disponivel)
+        if grupo:
+            self.remover(grupo)
+        return grupo
 
     def remover(self, grupo: GrupoCliente) -> None:
+        sequencia = self._fila_de_espera.sequencia_de(grupo)
         self._fila_de_espera.remover(grupo)
         self._dao.remover_id(grupo.id_grupo)
+        transacao = transacao_atual()
+        if transacao is not None:
+            # se a ação falhar, o grupo volta para a mesma posição da fila
+            transacao.ao_desfazer(lambda: self._fila_de_espera.restaurar(grupo, sequencia), self._dao)
 
     def esta_vazia(self) -> bool:
         return len(self._fila_de_espera) == 0
     
-    def listar(self) -> List[GrupoCliente]:
-        return self._fila_de_espera.to_list()
+    def listar(self) -> Tuple[GrupoCliente, ...]:
+        return self._fila_de_espera.grupos
     
     def listar_para_view(self) -> List[Dict[str, object]]:
         out: List[Dict[str, object]] = []
@@ -1,12 +1,67 @@
-from typing import List, Optional, Dict, Any
+import heapq
+from typing import List, Optional, Dict, Any, Tuple
 from models.funcionario import Funcionario
 from models.garcom import Garcom
 from models.cozinheiro import Cozinheiro
+from models.pedido import Pedido
 from persistence.funcionario_dao import FuncionarioDAO
+from persistence.snapshot import tirar_snapshot
+from persistence.unidade_de_trabalho import transacao_atual
 
 class FuncionarioController:
+    LIMITE_MESAS_POR_GARCOM = 4
+
     def __init__(self):
         self._dao = FuncionarioDAO()
+        # heaps de (carga, id) para achar o garçom com menos mesas e o cozinheiro com menos
+        # pedidos; _cargas guarda a carga indexada de cada um e as entradas que não batem com
+        # ela são descartadas quando chegam ao topo
+        self._heap_garcons: List[Tuple[int, int]] = []
+        self._heap_cozinheiros: List[Tuple[int, int]] = []
+        self._cargas: Dict[int, int] = {}
+        for f in self._dao.get_all():
+            self._sincronizar_carga(f.id_funcionario)
+
+    @staticmethod
+    def _carga(func: Funcionario) -> int:
+        return func.qtd_mesas if isinstance(func, Garcom) else func.qtd_pedidos_em_preparo
+
+    def _sincronizar_carga(self, id_funcionario: int) -> None:
+        func = self._dao.get(id_funcionario)
+        if not isinstance(func, (Garcom, Cozinheiro)):
+            self._cargas.pop(id_funcionario, None)
+            return
+        carga = self._carga(func)
+        if self._cargas.get(id_funcionario) == carga:
+            return
+        self._cargas[id_funcionario] = carga
+        heap = self._heap_garcons if isinstance(func, Garcom) else self._heap_cozinheiros
+        heapq.heappush(heap, (carga, id_funcionario))
+        if len(heap) > 2 * len(self._cargas) + 8:
+            # muitas entradas velhas acumuladas embaixo do topo: refaz o heap só com as válidas
+            heap[:] = sorted({(c, i) for c, i in heap if self._cargas.get(i) == c})
+
+    def _atualizar_carga(self, id_funcionario: int) -> None:
+        self._sincronizar_carga(id_funcionario)
+        transacao = transacao_atual()
+        if transacao is not None:
+            # se a ação falhar, o funcionário volta ao estado gravado e o heap acompanha
+            transacao.ao_desfazer(lambda: self._sincronizar_carga(id_funcionario), self._dao)
+
+    # funcionário de menor carga (empate: menor id), descartando entradas velhas do topo
+    def _menos_carregado(self, heap: List[Tuple[int, int]], tipo: type) -> Optional[Funcionario]:
+        while heap:
+            carga, id_funcionario = heap[0]
+            func = self._dao.get(id_funcionario)
+            if self._cargas.get(id_funcionario) == carga and isinstance(func, tipo):
+                if self._carga(func) == carga:
+                    return func
+                # carga mudou sem passar por atualizar_funcionario: reindexa e continua
+                heapq.heappop(heap)
+                self._sincronizar_carga(id_funcionario)
+                continue
+            heapq.heappop(heap)
+        return None
 
     def _gerar_id(self) -> int:
         return self._dao.get_proximo_id() 
@@ -15,6 +70,7 @@ class FuncionarioController:
         novo_id = self._gerar_id()
         novo_garcom = Garcom(id_funcionario=novo_id, nome=nome, salario_base=salario_base)
         self._dao.add(novo_id, novo_garcom) 
+        self._atualizar_carga(novo_id)
         
         return novo_garcom
 
@@ -22,6 +78,7 @@ class FuncionarioController:
         novo_id = self._gerar_id()
         novo_cozinheiro = Cozinheiro(id_funcionario=novo_id, nome=nome, salario_base=salario_base)
         self._dao.add(novo_id, novo_cozinheiro)
+        self._atualizar_carga(novo_id)
         
         return novo_cozinheiro
 
@@ -30,36 +87,49 @@ class FuncionarioController:
         if not func:
             raise ValueError(f"Funcionário com ID {id_funcionario} não encontrado.")
 
-        if isinstance(func, Cozinheiro) and func.pedidos_em_preparo:
+        if isinstance(func, Cozinheiro) and func.qtd_pedidos_em_preparo:
             raise ValueError(f"Não é possível demitir o Cozinheiro {func.nome}, pois ele tem pedidos em preparo.")
         
-        if isinstance(func, Garcom) and func.mesas_atendidas:
+        if isinstance(func, Garcom) and func.qtd_mesas:
             raise ValueError(f"Não é possível demitir o Garçom {func.nome}, pois ele está atendendo mesas.")
 
 
         self._dao.remove(id_funcionario)
+        self._atualizar_carga(id_funcionario)
         return func
 
     def listar_funcionarios(self) -> List[Funcionario]:
         return self._dao.get_all()
 
     def encontrar_garcom_disponivel(self) -> Optional[Garcom]:
-        garcons = [f for f in self.listar_funcionarios() if isinstance(f, Garcom)]
-        if not garcons: return None
-        
-        garcom_livre = min(garcons, key=lambda g: len(g.mesas_atendidas))
-        if len(garcom_livre.mesas_atendidas) < 4:
+        garcom_livre = self._menos_carregado(self._heap_garcons, Garcom)
+        if garcom_livre and garcom_livre.qtd_mesas < self.LIMITE_MESAS_POR_GARCOM:
             return garcom_livre
         return None
 
     def encontrar_cozinheiro_disponivel(self) -> Optional[Cozinheiro]:
-        cozinheiros = [f for f in self.listar_funcionarios() if isinstance(f, Cozinheiro)]
-        if not cozinheiros: return None
-        return min(cozinheiros, key=lambda c: len(c.pedidos_em_preparo))
+        return self._menos_carregado(self._heap_cozinheiros, Cozinheiro)
+
+    def encontrar_cozinheiro_do_pedido(self, pedido: Pedido) -> Optional[Cozinheiro]:
+        if pedido.id_cozinheiro is not None:
+            func = self._dao.get(pedido.id_cozinheiro)
+            if isinstance(func, Cozinheiro) and func.esta_preparando(pedido):
+                return func
+            return None
+        # pedidos postos em preparo antes de guardarem o cozinheiro: procura na equipe
+        for func in self._dao.listar_por_tipo(Cozinheiro):
+            if func.esta_preparando(pedido):
+                return func
+        return None
     
     def encontrar_funcionario_por_id(self, id_funcionario: int) -> Optional[Funcionario]:
         return self._dao.get(id_funcionario)
 
+    # chamado depois de mudar as mesas de um garçom ou os pedidos de um cozinheiro
+    def atualizar_funcionario(self, func: Funcionario) -> None:
+        self._dao.update(func.id_funcionario, func)
+        self._atualizar_carga(func.id_funcionario)
+
     def atualizar_nome(self, id_funcionario: int, novo_nome: str) -> Funcionario:
         func = self.encontrar_funcionario_por_id(id_funcionario)
         if not func:
@@ -80,13 +150,12 @@ class FuncionarioController:
 
     def listar_garcons_para_view(self) -> List[Dict[str, object]]:
         out: List[Dict[str, object]] = []
-        for f in self.listar_funcionarios():
-            if isinstance(f, Garcom):
-                out.append({
-                    "id": f.id_funcionario,
-                    "nome": f.nome,
-                    "mesas": len(f.mesas_atendidas),
-                })
+        for f in self._dao.listar_por_tipo(Garcom):
+            out.append({
+                "id": f.id_funcionario,
+                "nome": f.nome,
+                "mesas": f.qtd_mesas,
+            })
         return out
     
     def listar_funcionarios_para_view_gui(self) -> List[List[Any]]:
@@ -98,11 +167,11 @@ class FuncionarioController:
             
             if isinstance(f, Garcom):
                 papel = "Garçom"
-                info_extra = f"{len(f.mesas_atendidas)} mesas"
+                info_extra = f"{f.qtd_mesas} mesas"
                 gorjetas = f"R$ {f.gorjetas:.2f}"
             elif isinstance(f, Cozinheiro):
                 papel = "Cozinheiro"
-                info_extra = f"{len(f.pedidos_em_preparo)} pds em prep."
+                info_extra = f"{f.qtd_pedidos_em_preparo} pds em prep."
             
             dados_formatados.append([
                 f.id_funcionario,
@@ -115,21 +184,24 @@ class FuncionarioController:
 
         dados_formatados.sort(key=lambda x: x[0])
         return dados_formatados
+    # lê um snapshot, não os objetos em uso: pode rodar fora da thread do atendimento
     def gerar_relatorio_garcons(self) -> List[Dict[str, Any]]:
+        funcionarios = tirar_snapshot(self._dao).objetos(self._dao)
 
         dados = []
-        for f in self.listar_funcionarios():
-            if isinstance(f, Garcom):
-                qtd_mesas = len(f.mesas_atendidas)
-                total_gorjetas = f.gorjetas
-                media = (total_gorjetas / qtd_mesas) if qtd_mesas > 0 else 0.0
-                
-                dados.append({
-                    "id": f.id_funcionario,
-                    "nome": f.nome,
-                    "mesas": qtd_mesas,
-                    "total_gorjetas": total_gorjetas,
-                    "media_por_mesa": media
-                })
+        for _, f in sorted(funcionarios.items()):
+            if not isinstance(f, Garcom):
+                continue
+            qtd_mesas = f.qtd_mesas
+            total_gorjetas = f.gorjetas
+            media = (total_gorjetas / qtd_mesas) if qtd_mesas > 0 else 0.0
+            
+            dados.append({
+                "id": f.id_funcionario,
+                "nome": f.nome,
+                "mesas": qtd_mesas,
+                "total_gorjetas": total_gorjetas,
+                "media_por_mesa": media
+            })
         dados.sort(key=lambda x: x["total_gorjetas"], reverse=True)
         return dados
\ No newline at end of file
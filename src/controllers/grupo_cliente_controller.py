@@ -26,4 +26,7 @@ class ClienteController:
         self._dao.update(grupo.id_grupo, grupo)
         
     def remover_grupo(self, id_grupo: int) -> None:
-        self._dao.remove(id_grupo)
\ No newline at end of file
+        self._dao.remove(id_grupo)
+
+    def arquivar_grupos(self, grupos: List[GrupoCliente]) -> None:
+        self._dao.arquivar([g.id_grupo for g in grupos])
\ No newline at end of file
@@ -1,13 +1,49 @@
+import bisect
+import heapq
 from typing import List, Optional, Dict
 from models.mesa import Mesa
 from models.grupo_cliente import GrupoCliente
 from models.garcom import Garcom
 from models.status_enums import StatusMesa
 from persistence.mesa_dao import MesaDAO 
+from persistence.unidade_de_trabalho import transacao_atual
 
 class MesaController:
     def __init__(self):
         self._mesa_dao = MesaDAO()
+        # mesas livres por capacidade: capacidades em ordem (bisect) e um heap de ids em cada uma.
+        # _livres diz em que capacidade cada mesa livre está; entradas que saíram dele só são
+        # tiradas dos heaps quando chegam ao topo
+        self._capacidades: List[int] = []
+        self._livres_por_capacidade: Dict[int, List[int]] = {}
+        self._livres: Dict[int, int] = {}
+        for mesa in self._mesa_dao.get_all():
+            self._sincronizar_livre(mesa.id_mesa)
+
+    def _sincronizar_livre(self, id_mesa: int) -> None:
+        mesa = self._mesa_dao.get(id_mesa)
+        if mesa is None or mesa.status != StatusMesa.LIVRE:
+            self._livres.pop(id_mesa, None)
+            return
+        capacidade = mesa.capacidade
+        if self._livres.get(id_mesa) == capacidade:
+            return
+        self._livres[id_mesa] = capacidade
+        if capacidade not in self._livres_por_capacidade:
+            bisect.insort(self._capacidades, capacidade)
+            self._livres_por_capacidade[capacidade] = []
+        heap = self._livres_por_capacidade[capacidade]
+        heapq.heappush(heap, id_mesa)
+        if len(heap) > 2 * len(self._livres) + 8:
+            # muitas entradas velhas acumuladas embaixo do topo: refaz o heap só com as válidas
+            heap[:] = sorted({i for i in heap if self._livres.get(i) == capacidade})
+
+    def _atualizar_livre(self, id_mesa: int) -> None:
+        self._sincronizar_livre(id_mesa)
+        transacao = transacao_atual()
+        if transacao is not None:
+            # se a ação falhar, a mesa volta ao estado gravado e o índice acompanha
+            transacao.ao_desfazer(lambda: self._sincronizar_livre(id_mesa), self._mesa_dao)
 
     def listar_mesas(self) -> List[Mesa]:
         return list(self._mesa_dao.get_all())
@@ -15,15 +51,19 @@ class MesaController:
     def encontrar_mesa_por_numero(self, numero_mesa: int) -> Optional[Mesa]:
         return self._mesa_dao.get(numero_mesa)
 
+    # menor mesa livre que comporta o grupo; empate decidido pelo menor número
     def encontrar_mesa_livre(self, qtd_pessoas: int) -> Optional[Mesa]:
-        melhor: Optional[Mesa] = None
-        for m in self.listar_mesas(): 
-            if m.status == StatusMesa.LIVRE and m.capacidade >= qtd_pessoas:
-                if (melhor is None or
-                    m.capacidade < melhor.capacidade or
-                    (m.capacidade == melhor.capacidade and m.id_mesa < melhor.id_mesa)):
-                    melhor = m
-        return melhor
+        for i in range(bisect.bisect_left(self._capacidades, qtd_pessoas), len(self._capacidades)):
+            capacidade = self._capacidades[i]
+            heap = self._livres_por_capacidade[capacidade]
+            while heap and self._livres.get(heap[0]) != capacidade:
+                heapq.heappop(heap)
+            if heap:
+                return self._mesa_dao.get(heap[0])
+        return None
+
+    def listar_mesas_livres(self) -> List[Mesa]:
+        return [self._mesa_dao.get(id_mesa) for id_mesa in sorted(self._livres)]
 
     def ocupar_mesa(self, numero_mesa: int, grupo: GrupoCliente) -> Mesa:
         mesa = self.encontrar_mesa_por_numero(numero_mesa)
@@ -33,6 +73,7 @@ class MesaController:
         mesa.ocupar(grupo)
         
         self._mesa_dao.update(numero_mesa, mesa) 
+        self._atualizar_livre(numero_mesa)
         
         return mesa
 
@@ -43,6 +84,7 @@ class MesaController:
         
         mesa.liberar() 
         self._mesa_dao.update(numero_mesa, mesa) 
+        self._atualizar_livre(numero_mesa)
         return mesa
 
     def limpar_mesa(self, numero_mesa: int) -> Mesa:
@@ -52,6 +94,7 @@ class MesaController:
         
         mesa.limpar() 
         self._mesa_dao.update(numero_mesa, mesa) 
+        self._atualizar_livre(numero_mesa)
         return mesa
 
     def designar_garcom(self, mesa: Mesa, garcom: Garcom) -> None:
@@ -75,6 +118,7 @@ class MesaController:
 
         nova = Mesa(id_mesa=id_mesa, capacidade=capacidade)
         self._mesa_dao.add(id_mesa, nova)
+        self._atualizar_livre(id_mesa)
         return nova
 
     def mesa_para_dict(self, mesa: Mesa) -> Dict[str, object]:
@@ -98,6 +142,7 @@ class MesaController:
             raise ValueError(f"Não é possível remover a Mesa {id_mesa} pois ela está ocupada ou suja.")
             
         self._mesa_dao.remove(id_mesa)
+        self._atualizar_livre(id_mesa)
 
     def atualizar_mesa(self, id_mesa: int, nova_capacidade: int) -> None:
         mesa = self.encontrar_mesa_por_numero(id_mesa)
@@ -108,4 +153,5 @@ class MesaController:
             
         if nova_capacidade <= 0:
             raise ValueError("A capacidade deve ser positiva.")
-        self._mesa_dao.update(id_mesa, mesa)
\ No newline at end of file
+        self._mesa_dao.update(id_mesa, mesa)
+        self._atualizar_livre(id_mesa)
\ No newline at end of file
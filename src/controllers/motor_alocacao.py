@@ -0,0 +1,177 @@
+import bisect
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from models.grupo_cliente import GrupoCliente
+from models.mesa import Mesa
+
+# par (grupo, mesa) que a política decidiu sentar, na ordem da fila
+Alocacao = Tuple[GrupoCliente, Mesa]
+
+
+class PoliticaAlocacao(ABC):
+    """Decide quais grupos da fila vão para quais mesas livres numa rodada de alocação.
+
+    Só planeja: recebe a fila (em ordem de chegada) e as mesas livres e devolve os
+    pares; quem ocupa as mesas e tira os grupos da fila é o RestauranteController.
+
+    continuar_apos_falha diz o que fazer com um grupo que não pode ser sentado (não
+    cabe em nenhuma mesa no planejamento, ou a ocupação falha na execução do plano):
+    True pula o grupo e segue com o resto; False encerra a rodada ali."""
+
+    continuar_apos_falha = True
+
+    @abstractmethod
+    def planejar(self, fila: Sequence[GrupoCliente], mesas_livres: Sequence[Mesa]) -> List[Alocacao]:
+        pass
+
+
+def _mesas_ordenadas(mesas_livres: Sequence[Mesa]) -> List[Tuple[int, int, Mesa]]:
+    return sorted((m.capacidade, m.id_mesa, m) for m in mesas_livres)
+
+
+class PoliticaFifo(PoliticaAlocacao):
+    """Ordem de chegada estrita: cada grupo vai para a menor mesa que o comporta e a
+    rodada para no primeiro grupo que não cabe em nenhuma (ninguém passa na frente)."""
+
+    continuar_apos_falha = False
+
+    def planejar(self, fila: Sequence[GrupoCliente], mesas_livres: Sequence[Mesa]) -> List[Alocacao]:
+        livres = _mesas_ordenadas(mesas_livres)
+        plano: List[Alocacao] = []
+        for grupo in fila:
+            if not livres:
+                break
+            i = bisect.bisect_left(livres, (grupo.numero_pessoas,))
+            if i == len(livres):
+                if self.continuar_apos_falha:
+                    continue
+                break
+            plano.append((grupo, livres.pop(i)[2]))
+        return plano
+
+
+class PoliticaGulosa(PoliticaFifo):
+    """Como a FIFO, mas quem não cabe é pulado e a fila continua sendo percorrida."""
+
+    continuar_apos_falha = True
+
+
+class ObjetivoAlocacao(Enum):
+    MAIS_PESSOAS = "Mais pessoas sentadas"          # empate: menos lugares vazios
+    MENOS_DESPERDICIO = "Menos lugares desperdiçados"  # senta o máximo de grupos, com o mínimo de lugares vazios
+
+
+class PoliticaOtima(PoliticaAlocacao):
+    """Emparelhamento ótimo entre a fila e as mesas livres.
+
+    Um grupo cabe em qualquer mesa de capacidade maior ou igual, então o problema só
+    depende de quantos grupos há de cada tamanho e quantas mesas há de cada capacidade:
+    vira um fluxo de custo mínimo num grafo tamanhos -> capacidades com poucas dezenas de
+    nós, qualquer que seja o tamanho da fila. Dentro de um mesmo tamanho, sentam os grupos
+    mais antigos; dentro de uma mesma capacidade, as mesas de menor número.
+
+    limite_ultrapassagem restringe a rodada aos primeiros limite + 1 grupos da fila: um
+    grupo que fica esperando é passado por no máximo esse número de grupos de trás
+    nessa rodada. None considera a fila inteira."""
+
+    def __init__(self, objetivo: ObjetivoAlocacao = ObjetivoAlocacao.MAIS_PESSOAS,
+                 limite_ultrapassagem: Optional[int] = None):
+        if limite_ultrapassagem is not None and limite_ultrapassagem < 0:
+            raise ValueError("O limite de ultrapassagem não pode ser negativo.")
+        self._objetivo = objetivo
+        self._limite = limite_ultrapassagem
+
+    def planejar(self, fila: Sequence[GrupoCliente], mesas_livres: Sequence[Mesa]) -> List[Alocacao]:
+        if self._limite is not None:
+            fila = fila[:self._limite + 1]
+        if not fila or not mesas_livres:
+            return []
+
+        grupos_por_tamanho: Dict[int, List[int]] = {}
+        for posicao, grupo in enumerate(fila):
+            grupos_por_tamanho.setdefault(grupo.numero_pessoas, []).append(posicao)
+        mesas_por_capacidade: Dict[int, List[Mesa]] = {}
+        for capacidade, _, mesa in _mesas_ordenadas(mesas_livres):
+            mesas_por_capacidade.setdefault(capacidade, []).append(mesa)
+
+        fluxo = self._resolver(
+            {t: len(p) for t, p in grupos_por_tamanho.items()},
+            {c: len(m) for c, m in mesas_por_capacidade.items()},
+        )
+
+        plano: List[Tuple[int, Mesa]] = []
+        for (tamanho, capacidade), quantidade in fluxo.items():
+            posicoes, mesas = grupos_por_tamanho[tamanho], mesas_por_capacidade[capacidade]
+            for _ in range(quantidade):
+                plano.append((posicoes.pop(0), mesas.pop(0)))
+        plano.sort(key=lambda par: par[0])
+        return [(fila[posicao], mesa) for posicao, mesa in plano]
+
+    def _custo(self, tamanho: int, capacidade: int, peso: int) -> int:
+        # o termo com peso domina; os lugares vazios só desempatam
+        ganho = tamanho if self._objetivo is ObjetivoAlocacao.MAIS_PESSOAS else 1
+        return -ganho * peso + (capacidade - tamanho)
+
+    def _resolver(self, grupos: Dict[int, int], mesas: Dict[int, int]) -> Dict[Tuple[int, int], int]:
+        """Fluxo de custo mínimo por caminhos mínimos sucessivos (Bellman-Ford, há custos
+        negativos). Para quando o caminho mais barato deixa de diminuir o custo."""
+        tamanhos, capacidades = sorted(grupos), sorted(mesas)
+        # mais que qualquer soma possível de lugares vazios
+        peso = sum(c * q for c, q in mesas.items()) + 1
+
+        origem, destino = 0, 1 + len(tamanhos) + len(capacidades)
+        no_tamanho = {t: 1 + i for i, t in enumerate(tamanhos)}
+        no_capacidade = {c: 1 + len(tamanhos) + i for i, c in enumerate(capacidades)}
+        # arestas como listas [destino, capacidade residual, custo, índice da reversa]
+        adjacencia: List[List[list]] = [[] for _ in range(destino + 1)]
+
+        def ligar(u: int, v: int, limite: int, custo: int) -> list:
+            ida, volta = [v, limite, custo, len(adjacencia[v])], [u, 0, -custo, len(adjacencia[u])]
+            adjacencia[u].append(ida)
+            adjacencia[v].append(volta)
+            return ida
+
+        for t in tamanhos:
+            ligar(origem, no_tamanho[t], grupos[t], 0)
+        arestas_meio: Dict[Tuple[int, int], list] = {}
+        for t in tamanhos:
+            for c in capacidades[bisect.bisect_left(capacidades, t):]:
+                arestas_meio[(t, c)] = ligar(no_tamanho[t], no_capacidade[c], grupos[t], self._custo(t, c, peso))
+        for c in capacidades:
+            ligar(no_capacidade[c], destino, mesas[c], 0)
+
+        while True:
+            distancia: List[Optional[int]] = [None] * (destino + 1)
+            anterior: List[Optional[Tuple[int, list]]] = [None] * (destino + 1)
+            distancia[origem] = 0
+            for _ in range(destino):
+                mudou = False
+                for u in range(destino + 1):
+                    if distancia[u] is None:
+                        continue
+                    for aresta in adjacencia[u]:
+                        v, residual, custo, _ = aresta
+                        if residual > 0 and (distancia[v] is None or distancia[u] + custo < distancia[v]):
+                            distancia[v] = distancia[u] + custo
+                            anterior[v] = (u, aresta)
+                            mudou = True
+                if not mudou:
+                    break
+            if distancia[destino] is None or distancia[destino] >= 0:
+                break
+
+            gargalo, v = None, destino
+            while v != origem:
+                u, aresta = anterior[v]
+                gargalo = aresta[1] if gargalo is None else min(gargalo, aresta[1])
+                v = u
+            v = destino
+            while v != origem:
+                u, aresta = anterior[v]
+                aresta[1] -= gargalo
+                adjacencia[v][aresta[3]][1] += gargalo
+                v = u
+
+        return {par: grupos[par[0]] - aresta[1] for par, aresta in arestas_meio.items() if aresta[1] < grupos[par[0]]}
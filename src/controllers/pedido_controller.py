@@ -1,6 +1,9 @@
-from typing import List, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Tuple
+import heapq
 from collections import Counter
 
+import numpy as np
+
 from controllers.conta_controller import ContaController
 from controllers.cardapio_controller import CardapioController
 
@@ -14,6 +17,13 @@ from models.conta import Conta
 from models.status_enums import StatusPedido
 
 from persistence.pedido_dao import PedidoDAO
+from persistence.armazenamento import criar_livro_itens
+from persistence.carga_preguicosa import CargaPreguicosa
+from persistence.arquivo_morto import carregar_arquivados
+from persistence.dia_de_servico import dia_de_servico
+from persistence.janelas_de_vendas import JanelaDeTempo, Totais
+from persistence.livro_itens import COLUNAS, Linha, LivroDeItens
+from persistence.unidade_de_trabalho import uow
 
 
 class PedidoController:
@@ -21,11 +31,44 @@ class PedidoController:
         self,
         conta_controller: ContaController,
         cardapio_controller: CardapioController,
+        pedido_dao: Optional[PedidoDAO] = None,
+        livro_itens: Optional[LivroDeItens] = None,
     ) -> None:
         self._contas = conta_controller
         self._cardapio = cardapio_controller
-        self._pedido_dao = PedidoDAO()
+        # o histórico de pedidos só carrega quando alguém precisa dele ou em pre_carregar();
+        # um DAO que já vem pronto é usado como está
+        self._carga = CargaPreguicosa(
+            lambda: self._carregar(pedido_dao, livro_itens),
+            tipos=("Pedido",) if pedido_dao is None else (),
+        )
+
+    # itens vendidos em colunas NumPy, para os relatórios; na primeira execução o livro é
+    # montado a partir dos pedidos que já existem (em uso e no arquivo morto). Carrega junto
+    # com os pedidos, antes de qualquer um mudar, para nenhuma venda entrar duas vezes
+    def _carregar(self, pedido_dao: Optional[PedidoDAO],
+                  livro: Optional[LivroDeItens]) -> Tuple[PedidoDAO, LivroDeItens]:
+        pedido_dao = pedido_dao if pedido_dao is not None else PedidoDAO()
+        livro = livro if livro is not None else criar_livro_itens()
+        if not livro.existe():
+            self._reconstruir_livro(pedido_dao, livro)
+        return pedido_dao, livro
+
+    @property
+    def _pedido_dao(self) -> PedidoDAO:
+        return self._carga.obter()[0]
 
+    @property
+    def _livro(self) -> LivroDeItens:
+        return self._carga.obter()[1]
+
+    # adianta a carga numa thread de fundo (a janela abre sem esperar pelo histórico)
+    def pre_carregar(self) -> None:
+        self._carga.iniciar()
+
+    @property
+    def carregado(self) -> bool:
+        return self._carga.pronta
 
     def _pedido_dict(self, p: Pedido) -> dict:
         linhas = [str(it) for it in p.itens]  
@@ -40,45 +83,54 @@ class PedidoController:
     def _find_pedido_by_status(
         self, conta: Conta, status: StatusPedido
     ) -> Optional[Pedido]:
-        for p in reversed(conta.pedidos):
-            if p.status == status:
-                return p
-        return None
+        return conta.pedido_com_status(status)
 
     def encontrar_pedido_por_id(self, id_pedido: int) -> Optional[Pedido]:
         return self._pedido_dao.get(id_pedido)
 
+    def atualizar_pedido(self, pedido: Pedido) -> None:
+        self._pedido_dao.update(pedido.id_pedido, pedido)
+        conta = self._contas.encontrar_conta_por_mesa(pedido.mesa.id_mesa)
+        if conta:
+            self._contas.atualizar_conta(conta)
+
     def criar_novo_pedido(
         self, mesa: Mesa, garcom: Garcom, grupo_cliente: GrupoCliente
     ) -> Pedido:
-        novo_pedido = Pedido(mesa=mesa, garcom=garcom, grupo_cliente=grupo_cliente)
+        novo_pedido = Pedido(
+            mesa=mesa, garcom=garcom, grupo_cliente=grupo_cliente,
+            id_pedido=self._pedido_dao.get_proximo_id(),
+        )
         self._pedido_dao.add(novo_pedido.id_pedido, novo_pedido)
         return novo_pedido
 
     def adicionar_item_a_conta(
         self, conta: Conta, prato: Prato, quantidade: int, observacao: str = ""
     ) -> None:
-        pedido_alvo = next(
-            (p for p in conta.pedidos if p.status == StatusPedido.ABERTO),
-            None,
-        )
+        # valida antes de criar o pedido: um item recusado não pode deixar pedido vazio na conta
+        if not isinstance(quantidade, int) or quantidade <= 0:
+            raise ValueError("A quantidade de um item deve ser um número inteiro positivo.")
 
-        if not pedido_alvo:
-            if not conta.mesa.garcom_responsavel:
-                raise ValueError(
-                    f"A Mesa {conta.mesa.id_mesa} não tem garçom designado."
-                )
+        with uow():
+            self._contas.acompanhar_conta(conta)
+            pedido_alvo = conta.pedido_com_status(StatusPedido.ABERTO, mais_recente=False)
 
-            pedido_alvo = self.criar_novo_pedido(
-                mesa=conta.mesa,
-                garcom=conta.mesa.garcom_responsavel,
-                grupo_cliente=conta.grupo_cliente,
-            )
-            conta.adicionar_pedido(pedido_alvo)
+            if not pedido_alvo:
+                if not conta.mesa.garcom_responsavel:
+                    raise ValueError(
+                        f"A Mesa {conta.mesa.id_mesa} não tem garçom designado."
+                    )
 
-        pedido_alvo.adicionar_item(prato=prato, quantidade=quantidade)
-        self._pedido_dao.update(pedido_alvo.id_pedido, pedido_alvo)
-        self._contas.atualizar_conta(conta)
+                pedido_alvo = self.criar_novo_pedido(
+                    mesa=conta.mesa,
+                    garcom=conta.mesa.garcom_responsavel,
+                    grupo_cliente=conta.grupo_cliente,
+                )
+                conta.adicionar_pedido(pedido_alvo)
+
+            pedido_alvo.adicionar_item(prato=prato, quantidade=quantidade)
+            self._pedido_dao.update(pedido_alvo.id_pedido, pedido_alvo)
+            self._contas.atualizar_conta(conta)
 
     def realizar_pedido(self, mesa_id: int, prato_id: int, quantidade: int) -> Conta:
         conta = self._contas.encontrar_conta_por_mesa(mesa_id)
@@ -104,8 +156,52 @@ class PedidoController:
         ped.confirmar()
         self._pedido_dao.update(ped.id_pedido, ped)
         self._contas.atualizar_conta(conta)
+        # o item conta como vendido na confirmação (depois dela o pedido não recebe mais itens)
+        self._livro.registrar(
+            self._linhas_do_livro(ped, conta.id_conta),
+            {it.prato.id_prato: it.prato.nome for it in ped.itens},
+        )
         return ped
 
+    @staticmethod
+    def _linhas_do_livro(pedido: Pedido, id_conta: int) -> List[Linha]:
+        # o instante da linha é a hora do pedido; é por ela que as janelas de tempo agrupam
+        id_garcom = pedido.garcom.id_funcionario if pedido.garcom is not None else 0
+        instante = pedido.data_hora.timestamp()
+        return [
+            (pedido.id_pedido, it.prato.id_prato, it.quantidade, it.subtotal_centavos // it.quantidade,
+             instante, id_garcom, pedido.mesa.id_mesa, id_conta)
+            for it in pedido.itens
+        ]
+
+    # pedidos que já saíram da anotação (os abertos e os cancelados não entram no livro)
+    def _vendidos(self, pedidos: Iterable[Pedido], conta_do_pedido: Dict[int, int]) -> Dict[str, np.ndarray]:
+        linhas = [
+            linha for p in pedidos if p.status not in (StatusPedido.ABERTO, StatusPedido.CANCELADO)
+            for linha in self._linhas_do_livro(p, conta_do_pedido.get(p.id_pedido, 0))
+        ]
+        registros = np.array(linhas, dtype=list(COLUNAS))
+        return {nome: registros[nome] for nome, _ in COLUNAS}
+
+    def _reconstruir_livro(self, pedido_dao: PedidoDAO, livro: LivroDeItens) -> None:
+        arquivo_pedidos, arquivo_contas = pedido_dao.arquivo_morto(), self._contas.arquivo_morto()
+
+        def importar(dia: Optional[str], pedidos: List[Pedido], contas: Iterable[Conta]) -> None:
+            conta_do_pedido = {p.id_pedido: c.id_conta for c in contas for p in c.pedidos}
+            nomes = {it.prato.id_prato: it.prato.nome for p in pedidos for it in p.itens}
+            livro.importar(dia, self._vendidos(pedidos, conta_do_pedido), nomes)
+
+        com_dia = set()
+        for dia in arquivo_pedidos.dias():
+            pedidos, contas = carregar_arquivados(arquivo_pedidos, arquivo_contas, dias=[dia])
+            com_dia.update(pedidos)
+            importar(dia, list(pedidos.values()), contas.values())
+        # registros arquivados antes da separação por dia: os que o arquivo inteiro tem e nenhum dia tem
+        pedidos, contas = carregar_arquivados(arquivo_pedidos, arquivo_contas)
+        importar(None, [p for k, p in pedidos.items() if k not in com_dia], contas.values())
+        # os pedidos em uso são do dia aberto
+        importar(dia_de_servico.atual(), pedido_dao.get_all(), self._contas.listar_contas())
+
     def marcar_pedido_pronto(self, mesa_id: int) -> Pedido:
         conta = self._contas.encontrar_conta_por_mesa(mesa_id)
         if not conta:
@@ -134,12 +230,56 @@ class PedidoController:
         self._contas.atualizar_conta(conta)
         return ped
 
-    def get_estatisticas_pratos(self) -> Dict[Prato, int]:
-        contagem_pratos: Counter = Counter()
-        for pedido in self._pedido_dao.get_all():
-            for item in pedido.itens:
-                contagem_pratos[item.prato] += item.quantidade
-        return contagem_pratos
+    def arquivar_pedidos(self, pedidos: List[Pedido]) -> None:
+        self._pedido_dao.arquivar([p.id_pedido for p in pedidos])
+
+    # histórico que já saiu do DAO (só leitura; lido do disco a cada chamada).
+    # com dias, só as pastas desses dias de serviço são abertas
+    def listar_pedidos_arquivados(self, dias: Optional[List[str]] = None) -> List[Pedido]:
+        (arquivados,) = carregar_arquivados(self._pedido_dao.arquivo_morto(), dias=dias)
+        return list(arquivados.values())
+
+    # dias de serviço com histórico, mais o dia aberto
+    def listar_dias_de_servico(self) -> List[str]:
+        return sorted(set(self._pedido_dao.arquivo_morto().dias()) | {dia_de_servico.atual()})
+
+    # com janela, só as vendas daquele período (dos baldes por minuto, sem reler o histórico)
+    def get_estatisticas_pratos(self, dias: Optional[List[str]] = None,
+                                janela: Optional[JanelaDeTempo] = None) -> Dict[Prato, int]:
+        # contadores por prato mantidos pelo livro de itens a cada venda, sem montar nenhum
+        # pedido; o livro é só de leitura aqui, então o relatório pode rodar fora da thread do atendimento
+        nomes = self._livro.nomes_dos_pratos()
+        return Counter({
+            self._prato_vendido(id_prato, nomes): qtd
+            for id_prato, qtd in self._vendas_por_prato(dias, janela).items()
+        })
+
+    # os k pratos mais vendidos, do mais para o menos vendido
+    def pratos_mais_vendidos(self, k: int, dias: Optional[List[str]] = None,
+                             janela: Optional[JanelaDeTempo] = None) -> List[Tuple[Prato, int]]:
+        nomes = self._livro.nomes_dos_pratos()
+        if janela is None:
+            mais_vendidos = self._livro.mais_vendidos(k, dias)
+        else:
+            vendas = self._vendas_por_prato(dias, janela)
+            mais_vendidos = [(i, vendas[i]) for i in heapq.nsmallest(k, vendas, key=lambda i: (-vendas[i], i))]
+        return [(self._prato_vendido(id_prato, nomes), qtd) for id_prato, qtd in mais_vendidos]
+
+    def _vendas_por_prato(self, dias: Optional[List[str]], janela: Optional[JanelaDeTempo]) -> Dict[int, int]:
+        if janela is None:
+            return self._livro.vendas_por_prato(dias)
+        return {id_prato: itens for id_prato, (itens, _, _) in self._livro.vendas_na_janela(janela)["prato_id"].items()}
+
+    # vendas da janela por prato, garçom e mesa: {"prato_id"/"garcom_id"/"mesa_id": {id: (itens, receita em centavos, pedidos)}}
+    def vendas_na_janela(self, janela: JanelaDeTempo) -> Dict[str, Dict[int, Totais]]:
+        return self._livro.vendas_na_janela(janela)
+
+    # pratos que já saíram do cardápio aparecem com o nome que tinham na venda
+    def _prato_vendido(self, id_prato: int, nomes: Dict[int, str]) -> Prato:
+        prato = self._cardapio.buscar_prato_por_id(id_prato)
+        if prato is None:
+            prato = Prato(id_prato, nomes.get(id_prato, f"Prato {id_prato}"), 0.0, "")
+        return prato
 
     def conta_para_view(self, conta: Conta) -> dict:
         itens = []
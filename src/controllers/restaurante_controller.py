@@ -9,13 +9,22 @@ from controllers.funcionario_controller import FuncionarioController
 from controllers.cardapio_controller import CardapioController
 from controllers.grupo_cliente_controller import ClienteController
 from controllers.pedido_controller import PedidoController
+from controllers.motor_alocacao import PoliticaAlocacao, PoliticaFifo, PoliticaGulosa
 
-from models.status_enums import StatusMesa
+from models.status_enums import StatusMesa, StatusPedido, StatusGrupoCliente
 from models.mesa import Mesa
 from models.grupo_cliente import GrupoCliente
 from models.garcom import Garcom
 from models.cozinheiro import Cozinheiro
 from models.conta import Conta
+from models.prato import Prato
+from models.excecoes import DiaComAtendimentoAbertoError
+
+from persistence.dia_de_servico import dia_de_servico
+from persistence.janelas_de_vendas import JanelaDeTempo
+from persistence.unidade_de_trabalho import uow
+
+PERIODO_TUDO = "Tudo"
 
 class RestauranteController:
     def __init__(self,
@@ -35,107 +44,159 @@ class RestauranteController:
         self._cardapio = cardapio_controller
         self._cliente = cliente_controller
 
+        # contas e pedidos carregam depois da abertura (pre_carregar); o que ficou de
+        # atendimentos anteriores sai da memória quando eles terminam (concluir_carga)
+        self._carga_concluida = False
+
+    def pre_carregar(self) -> None:
+        self._conta.pre_carregar()
+        self._pedido_controller.pre_carregar()
+
+    # chamado pela GUI enquanto a pré-carga roda, na thread dela (o arquivamento grava);
+    # True quando contas e pedidos já carregaram
+    def concluir_carga(self) -> bool:
+        if not self._carga_concluida and self._conta.carregado and self._pedido_controller.carregado:
+            self.arquivar_historico()
+            self._carga_concluida = True
+        return self._carga_concluida
+
     def get_cardapio_data(self) -> List[Dict[str, object]]:
         return self._cardapio.listar_pratos_para_view()
     
 
-    def auto_alocar_grupos(self, greedy: bool = False) -> List[str]:
-        msgs: List[str] = []
-        snapshot = self._fila.listar() 
+    # greedy escolhe entre as políticas antigas (FIFO estrita ou gulosa); outra política
+    # (por exemplo PoliticaOtima) pode ser passada direto. Se um grupo do plano não puder
+    # ser sentado, é a política que diz se a rodada segue (continuar_apos_falha)
+    def auto_alocar_grupos(self, greedy: bool = False, politica: Optional[PoliticaAlocacao] = None) -> List[str]:
+        if politica is None:
+            politica = PoliticaGulosa() if greedy else PoliticaFifo()
+        with uow():
+            msgs: List[str] = []
+            plano = politica.planejar(self._fila.listar(), self._mesa.listar_mesas_livres())
         
-        for grupo in snapshot:
-            mesa = self._mesa.encontrar_mesa_livre(grupo.numero_pessoas)
+            for grupo, mesa in plano:
+                garcom = None
+                try:
+                    garcom = self._func.encontrar_garcom_disponivel()
+                    if garcom:
+                        try:
+                            self._mesa.designar_garcom(mesa, garcom)
+                            self._func.atualizar_funcionario(garcom)
+                        except ValueError:
+
+                            pass
+                except Exception as e_garcom:
+                    msgs.append(f"[AVISO] Erro ao buscar garçom: {e_garcom}")
+                    garcom = None 
+                try:
+                    self._mesa.ocupar_mesa(mesa.id_mesa, grupo)
+                    self._cliente.atualizar_grupo(grupo)
+                    conta = self._conta.abrir_nova_conta(grupo, mesa)
+                except Exception as e_alocar:
+                    msgs.append(f"[AVISO] Falha ao auto-alocar: {e_alocar}")
+                    if not politica.continuar_apos_falha:
+                        break
+                    continue
             
+                self._fila.remover(grupo)
+            
+                nome_garcom = garcom.nome if garcom else "N/A"
+                msgs.append(f"[ALOCADO] G{grupo.id_grupo} -> Mesa {mesa.id_mesa} ({nome_garcom})")
+
+            return msgs
+
+    def receber_clientes(self, qtd: int) -> str:
+        with uow():
+            grupo = self._cliente.criar_grupo(qtd)
+            mesa = self._mesa.encontrar_mesa_livre(grupo.numero_pessoas)
             if not mesa:
-                if not greedy: break
-                else: continue
+                self._fila.adicionar_grupo(grupo)
+                return f"[FILA] Grupo {grupo.id_grupo} ({qtd} pessoas) adicionado à fila."
             garcom = None
             try:
                 garcom = self._func.encontrar_garcom_disponivel()
                 if garcom:
-                    try:
-                        self._mesa.designar_garcom(mesa, garcom)
-                    except ValueError:
-
-                        pass
+                    self._mesa.designar_garcom(mesa, garcom)
+                    self._func.atualizar_funcionario(garcom)
             except Exception as e_garcom:
-                msgs.append(f"[AVISO] Erro ao buscar garçom: {e_garcom}")
-                garcom = None 
-            try:
-                self._mesa.ocupar_mesa(mesa.id_mesa, grupo)
-                conta = self._conta.abrir_nova_conta(grupo, mesa)
-            except Exception as e_alocar:
-                msgs.append(f"[AVISO] Falha ao auto-alocar: {e_alocar}")
-                if not greedy: break
-                else: continue
-            
-            self._fila.remover(grupo)
-            
-            nome_garcom = garcom.nome if garcom else "N/A"
-            msgs.append(f"[ALOCADO] G{grupo.id_grupo} -> Mesa {mesa.id_mesa} ({nome_garcom})")
-
-        return msgs
-
-    def receber_clientes(self, qtd: int) -> str:
-        grupo = self._cliente.criar_grupo(qtd)
-        mesa = self._mesa.encontrar_mesa_livre(grupo.numero_pessoas)
-        if not mesa:
-            self._fila.adicionar_grupo(grupo)
-            return f"[FILA] Grupo {grupo.id_grupo} ({qtd} pessoas) adicionado à fila."
-        garcom = None
-        try:
-            garcom = self._func.encontrar_garcom_disponivel()
-            if garcom:
-                self._mesa.designar_garcom(mesa, garcom)
-        except Exception as e_garcom:
-            pass 
-        self._mesa.ocupar_mesa(mesa.id_mesa, grupo)
-        conta = self._conta.abrir_nova_conta(grupo, mesa)
-        return (f"[ALOCADO] Grupo {grupo.id_grupo} ({grupo.numero_pessoas}) -> Mesa {mesa.id_mesa} "
-                f"(Garçom: {garcom.nome if garcom else '-'}) | Conta #{conta.id_conta}")
+                pass 
+            self._mesa.ocupar_mesa(mesa.id_mesa, grupo)
+            self._cliente.atualizar_grupo(grupo)
+            conta = self._conta.abrir_nova_conta(grupo, mesa)
+            return (f"[ALOCADO] Grupo {grupo.id_grupo} ({grupo.numero_pessoas}) -> Mesa {mesa.id_mesa} "
+                    f"(Garçom: {garcom.nome if garcom else '-'}) | Conta #{conta.id_conta}")
 
 
     def finalizar_atendimento(self, mesa_id: int, gorjeta: float = 0.0) -> Dict[str, Any]:
-        conta = self._conta.encontrar_conta_por_mesa(mesa_id)
-        if not conta:
-            raise ValueError(f"Não há conta aberta na mesa {mesa_id}.")
-
-        garcom_responsavel = conta.mesa.garcom_responsavel
-        if garcom_responsavel and gorjeta > 0:
-            garcom_responsavel.adicionar_gorjeta(gorjeta)
+        with uow():
+            conta = self._conta.encontrar_conta_por_mesa(mesa_id)
+            if not conta:
+                raise ValueError(f"Não há conta aberta na mesa {mesa_id}.")
+
+            garcom_responsavel = conta.mesa.garcom_responsavel
+            if garcom_responsavel and gorjeta > 0:
+                garcom_responsavel.adicionar_gorjeta(gorjeta)
+                self._func.atualizar_funcionario(garcom_responsavel)
         
-        extrato_data = self._pedido_controller.conta_para_view(conta)
+            extrato_data = self._pedido_controller.conta_para_view(conta)
 
-        self._conta.fechar_conta(conta)
+            self._conta.fechar_conta(conta)
 
-        self._mesa.liberar_mesa(mesa_id)
+            self._mesa.liberar_mesa(mesa_id)
+            self._cliente.atualizar_grupo(conta.grupo_cliente)
 
-        return extrato_data
+            return extrato_data
 
 
     def limpar_mesa(self, mesa_id: int) -> str:
-
-        mesa = self._mesa.encontrar_mesa_por_numero(mesa_id)
+        with uow():
+            mesa = self._mesa.encontrar_mesa_por_numero(mesa_id)
         
-        if mesa and mesa.garcom_responsavel:
-            garcom_id = mesa.garcom_responsavel.id_funcionario
-            garcom_real = self._func.encontrar_funcionario_por_id(garcom_id)
-            
-            if garcom_real and isinstance(garcom_real, Garcom):
-                mesas_para_manter = [m for m in garcom_real.mesas_atendidas if m.id_mesa != mesa_id]
-                
-                while len(garcom_real.mesas_atendidas) > 0:
-                    m = garcom_real.mesas_atendidas[0]
-                    garcom_real.remover_mesa(m)
-                
-                for m in mesas_para_manter:
-                    garcom_real.adicionar_mesa(m)
-                
-                self._func.atualizar_nome(garcom_id, garcom_real.nome)
-
-        self._mesa.limpar_mesa(mesa_id)
+            if mesa and mesa.garcom_responsavel:
+                garcom_id = mesa.garcom_responsavel.id_funcionario
+                garcom_real = self._func.encontrar_funcionario_por_id(garcom_id)
             
-        return f"Mesa {mesa_id} limpa e está livre. (Use 'Auto Alocar' para preencher)"
+                if garcom_real and isinstance(garcom_real, Garcom) and garcom_real.atende(mesa):
+                    garcom_real.remover_mesa(mesa)
+                    self._func.atualizar_funcionario(garcom_real)
+
+            self._mesa.limpar_mesa(mesa_id)
+            self.arquivar_historico()
+
+            return f"Mesa {mesa_id} limpa e está livre. (Use 'Auto Alocar' para preencher)"
+
+    # move para o arquivo morto as contas encerradas de vez (fechadas, mesa já limpa, grupo
+    # saiu, pedidos entregues ou cancelados), junto com os pedidos e o grupo delas
+    def arquivar_historico(self) -> int:
+        finalizados = (StatusPedido.ENTREGUE, StatusPedido.CANCELADO)
+        contas = [
+            c for c in self._conta.listar_contas_fechadas()
+            if c.mesa.conta is not c
+            and c.grupo_cliente.status == StatusGrupoCliente.SAIU
+            and c.todos_os_pedidos_em(finalizados)
+        ]
+        if not contas:
+            return 0
+        with uow():
+            self._pedido_controller.arquivar_pedidos([p for c in contas for p in c.pedidos])
+            self._cliente.arquivar_grupos([c.grupo_cliente for c in contas])
+            self._conta.arquivar_contas(contas)
+        return len(contas)
+
+    def dia_de_servico_atual(self) -> str:
+        return dia_de_servico.atual()
+
+    # encerra o dia de serviço: o histórico do dia vai para a pasta dele no arquivo morto,
+    # que fica só leitura, e o que for arquivado daqui em diante vai para o dia novo
+    def fechar_dia(self) -> str:
+        if self._conta.listar_contas_abertas():
+            raise DiaComAtendimentoAbertoError("Há contas abertas. Finalize os atendimentos antes de fechar o dia.")
+        if any(m.status != StatusMesa.LIVRE for m in self._mesa.listar_mesas()):
+            raise DiaComAtendimentoAbertoError("Há mesas ocupadas ou sujas. Limpe as mesas antes de fechar o dia.")
+        self.arquivar_historico()
+        fechado = dia_de_servico.atual()
+        novo = dia_de_servico.fechar()
+        return f"Dia {fechado} fechado. Dia de serviço aberto: {novo}."
 
 
     def listar_equipe(self) -> List[Dict[str, object]]:
@@ -153,11 +214,11 @@ class RestauranteController:
             }
             if isinstance(f, Garcom):
                 dados_func["papel"] = "Garçom"
-                dados_func["mesas"] = len(f.mesas_atendidas)
+                dados_func["mesas"] = f.qtd_mesas
                 dados_func["gorjetas"] = f.gorjetas 
             elif isinstance(f, Cozinheiro):
                 dados_func["papel"] = "Cozinheiro"
-                dados_func["pedidos_preparo"] = len(f.pedidos_em_preparo)
+                dados_func["pedidos_preparo"] = f.qtd_pedidos_em_preparo
                                 
             lista_para_view.append(dados_func)
 
@@ -175,61 +236,94 @@ class RestauranteController:
     def adicionar_mesa(self, id_mesa: int, capacidade: int) -> Mesa:
         return self._mesa.cadastrar_mesa(id_mesa, capacidade)
 
-    def ver_prato_mais_pedido(self) -> Dict[str, Any]:
-        estatisticas = self._pedido_controller.get_estatisticas_pratos()
+    # períodos que a tela de estatísticas oferece; "Tudo" é o histórico inteiro
+    def periodos_de_vendas(self) -> List[str]:
+        return [PERIODO_TUDO] + [janela.value for janela in JanelaDeTempo]
+
+    @staticmethod
+    def _janela(periodo: Optional[str]) -> Optional[JanelaDeTempo]:
+        return None if periodo in (None, PERIODO_TUDO) else JanelaDeTempo(periodo)
+
+    # quantidade vendida de cada prato no período (um de periodos_de_vendas(); None é tudo)
+    def estatisticas_pratos(self, periodo: Optional[str] = None) -> Dict[Prato, int]:
+        return self._pedido_controller.get_estatisticas_pratos(janela=self._janela(periodo))
+
+    def ver_prato_mais_pedido(self, periodo: Optional[str] = None) -> Dict[str, Any]:
+        mais_vendidos = self._pedido_controller.pratos_mais_vendidos(1, janela=self._janela(periodo))
         
-        if not estatisticas:
+        if not mais_vendidos:
             return {"prato_nome": "N/A", "quantidade": 0}
 
-        prato_mais_pedido = max(estatisticas, key=estatisticas.get)
-        quantidade = estatisticas[prato_mais_pedido]
+        prato_mais_pedido, quantidade = mais_vendidos[0]
 
         return {
             "prato_nome": prato_mais_pedido.nome,
             "quantidade": quantidade
         }
     
+    # itens, receita e pedidos de uma janela de tempo, com o garçom e a mesa que mais
+    # faturaram nela; vem dos baldes por minuto do livro de itens
+    def resumo_vendas(self, periodo: str) -> Dict[str, Any]:
+        vendas = self._pedido_controller.vendas_na_janela(JanelaDeTempo(periodo))
+        # todo pedido tem uma mesa só, então somar por mesa não conta nada duas vezes
+        por_mesa = vendas["mesa_id"].values()
+        resumo: Dict[str, Any] = {
+            "itens": sum(t[0] for t in por_mesa),
+            "receita": sum(t[1] for t in por_mesa) / 100,
+            "pedidos": sum(t[2] for t in por_mesa),
+            "garcom_destaque": "N/A",
+            "mesa_destaque": "N/A",
+        }
+        # id 0 é pedido sem garçom
+        por_garcom = {i: t for i, t in vendas["garcom_id"].items() if i != 0}
+        if por_garcom:
+            id_garcom = max(por_garcom, key=lambda i: por_garcom[i][1])
+            garcom = self._func.encontrar_funcionario_por_id(id_garcom)
+            resumo["garcom_destaque"] = garcom.nome if garcom is not None else f"Garçom {id_garcom}"
+        if vendas["mesa_id"]:
+            id_mesa = max(vendas["mesa_id"], key=lambda i: vendas["mesa_id"][i][1])
+            resumo["mesa_destaque"] = f"Mesa {id_mesa}"
+        return resumo
+
     def confirmar_pedido_na_cozinha(self, mesa_id: int) -> str:
-        pedido = self._pedido_controller.confirmar_pedido(mesa_id) 
+        with uow():
+            pedido = self._pedido_controller.confirmar_pedido(mesa_id) 
 
-        cozinheiro = self._func.encontrar_cozinheiro_disponivel()
+            cozinheiro = self._func.encontrar_cozinheiro_disponivel()
         
-        if cozinheiro:
-            cozinheiro.iniciar_preparo_pedido(pedido) 
-            msg_coz = f"Assumido por Cozinheiro {cozinheiro.nome}"
-        else:
-            msg_coz = "Nenhum cozinheiro disponível. Pedido aguardando."
+            if cozinheiro:
+                cozinheiro.iniciar_preparo_pedido(pedido) 
+                self._pedido_controller.atualizar_pedido(pedido)
+                self._func.atualizar_funcionario(cozinheiro)
+                msg_coz = f"Assumido por Cozinheiro {cozinheiro.nome}"
+            else:
+                msg_coz = "Nenhum cozinheiro disponível. Pedido aguardando."
             
-        return f"Pedido {pedido.id_pedido} confirmado e enviado. {msg_coz}"
+            return f"Pedido {pedido.id_pedido} confirmado e enviado. {msg_coz}"
     
     def marcar_pedido_pronto(self, mesa_id: int) -> str:
-
-        conta = self._conta.encontrar_conta_por_mesa(mesa_id)
-        if not conta: raise ValueError("Mesa sem conta.")
+        with uow():
+            conta = self._conta.encontrar_conta_por_mesa(mesa_id)
+            if not conta: raise ValueError("Mesa sem conta.")
         
-        pedido_alvo = None
-        for p in conta.pedidos:
-            if p.status.name == "EM_PREPARO": 
-                pedido_alvo = p
-                break
+            pedido_alvo = conta.pedido_com_status(StatusPedido.EM_PREPARO, mais_recente=False)
         
-        if not pedido_alvo:
-            raise ValueError("Nenhum pedido 'Em Preparo' encontrado nesta mesa.")
-
-        cozinheiro_resp = None
-        for func in self._func.listar_funcionarios():
-            if isinstance(func, Cozinheiro) and pedido_alvo in func.pedidos_em_preparo:
-                cozinheiro_resp = func
-                break
+            if not pedido_alvo:
+                raise ValueError("Nenhum pedido 'Em Preparo' encontrado nesta mesa.")
+
+            cozinheiro_resp = self._func.encontrar_cozinheiro_do_pedido(pedido_alvo)
         
-        if not cozinheiro_resp:
-            pedido_alvo.finalizar_preparo()
-            msg = "Pedido finalizado."
-        else:
-            cozinheiro_resp.finalizar_preparo_pedido(pedido_alvo)
-            msg = f"Cozinheiro {cozinheiro_resp.nome} finalizou o prato."
-
-        return f"Pedido {pedido_alvo.id_pedido} PRONTO. {msg}"
+            if not cozinheiro_resp:
+                pedido_alvo.finalizar_preparo()
+                msg = "Pedido finalizado."
+            else:
+                cozinheiro_resp.finalizar_preparo_pedido(pedido_alvo)
+                self._func.atualizar_funcionario(cozinheiro_resp)
+                msg = f"Cozinheiro {cozinheiro_resp.nome} finalizou o prato."
+
+            self._pedido_controller.atualizar_pedido(pedido_alvo)
+
+            return f"Pedido {pedido_alvo.id_pedido} PRONTO. {msg}"
 
     def renomear_funcionario(self, id_func: int, novo_nome: str) -> str:
         func_atualizado = self._func.atualizar_nome(id_func, novo_nome)
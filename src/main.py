@@ -1,7 +1,18 @@
+import sys
+
 from application import build_app_gui, run_gui
 
 def main() -> None:
-    app_parts = build_app_gui()
+    backend = "sqlite" if "--sqlite" in sys.argv else "pickle"
+    durabilidade = next(
+        (arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--durabilidade=")), "batched"
+    )
+    app_parts = build_app_gui(backend=backend, durabilidade=durabilidade)
+    # --carga: tempo de carga de cada DAO no terminal
+    if "--carga" in sys.argv:
+        for datasource, (registros, ms) in app_parts["tempos_de_carga"].items():
+            print(f"[CARGA] '{datasource}': {registros} registros em {ms:.1f} ms")
+        print(f"[CARGA] dados prontos em {app_parts['dados_prontos_ms']:.1f} ms")
     try:
         run_gui(app_parts)
     except Exception as e:
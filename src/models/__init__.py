@@ -1,4 +1,5 @@
 from .status_enums import StatusMesa, StatusGrupoCliente, StatusPedido
+from .rastreavel import Rastreavel
 from .funcionario import Funcionario
 from .garcom import Garcom
 from .cozinheiro import Cozinheiro
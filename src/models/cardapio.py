@@ -1,14 +1,14 @@
-from typing import List, Optional
+from typing import Optional, Tuple
 from .prato import Prato 
 
 class Cardapio:
 
     def __init__(self):
-        self._pratos: List[Prato] = []
+        self._pratos: Tuple[Prato, ...] = ()
 
     @property
-    def pratos(self) -> List[Prato]:
-        return self._pratos.copy()
+    def pratos(self) -> Tuple[Prato, ...]:
+        return self._pratos
 
     def adicionar_prato(self, prato: Prato) -> None:
         if not isinstance(prato, Prato):
@@ -17,7 +17,7 @@ class Cardapio:
         if any(p.id_prato == prato.id_prato for p in self._pratos):
             raise ValueError(f"Já existe um prato cadastrado com o ID {prato.id_prato}.")
         
-        self._pratos.append(prato)
+        self._pratos += (prato,)
 
     def buscar_prato_por_id(self, id_prato: int) -> Optional[Prato]:
 
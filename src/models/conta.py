@@ -1,12 +1,21 @@
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
 from models.excecoes import ContaJaFechadaError
+from .status_enums import StatusPedido
+from .rastreavel import Rastreavel
 if TYPE_CHECKING:
     from .grupo_cliente import GrupoCliente
     from .pedido import Pedido
     from .mesa import Mesa
 
-class Conta:
+class Conta(Rastreavel):
+    __slots__ = ("_id_conta", "_grupo_cliente", "_mesa", "_pedidos", "_aberta", "_por_status", "_total_centavos")
+
+    # _por_status: status -> {id do pedido: pedido}; montado sob demanda a partir de _pedidos
+    # (None nas contas carregadas do disco) e mantido pelas transições do Pedido.
+    # _total_centavos: soma dos pedidos, mantida por adicionar_pedido e pelos itens novos dos pedidos
+    _PADROES = {**Rastreavel._PADROES, "_por_status": None, "_total_centavos": None}
+
     def __init__(self, id_conta: int, grupo_cliente: GrupoCliente, mesa: Mesa):
         from .grupo_cliente import GrupoCliente
         from .mesa import Mesa
@@ -21,7 +30,10 @@ class Conta:
         self._id_conta: int = id_conta
         self._grupo_cliente: GrupoCliente = grupo_cliente
         self._mesa: Mesa = mesa
-        self._pedidos: List[Pedido] = []
+        # tupla: quem lê recebe a própria coleção, sem cópia; incluir (raro) refaz a tupla
+        self._pedidos: Tuple[Pedido, ...] = ()
+        self._por_status = {}
+        self._total_centavos = 0
         self._aberta: bool = True
 
     @property
@@ -31,10 +43,60 @@ class Conta:
     @property
     def mesa(self) -> Mesa: return self._mesa
     @property
-    def pedidos(self) -> List[Pedido]: return self._pedidos.copy()
+    def pedidos(self) -> Tuple[Pedido, ...]: return self._pedidos
+    @property
+    def qtd_pedidos(self) -> int: return len(self._pedidos)
     @property
     def esta_aberta(self) -> bool: return self._aberta
 
+    def _indice(self) -> Dict[StatusPedido, Dict[int, Pedido]]:
+        if self._por_status is None:
+            self._por_status = {}
+            for pedido in self._pedidos:
+                pedido._conta = self
+                self._por_status.setdefault(pedido.status, {})[pedido.id_pedido] = pedido
+        return self._por_status
+
+    # avisado pelo Pedido a cada transição de status
+    def _pedido_mudou_status(self, pedido: Pedido, anterior: StatusPedido) -> None:
+        if self._por_status is None:
+            return
+        balde = self._por_status.get(anterior)
+        if balde is not None:
+            balde.pop(pedido.id_pedido, None)
+        self._por_status.setdefault(pedido.status, {})[pedido.id_pedido] = pedido
+
+    # avisado pelo Pedido quando ele ganha um item
+    def _total_mudou(self, diferenca_centavos: int) -> None:
+        if self._total_centavos is not None:
+            self._total_centavos += diferenca_centavos
+
+    def __setstate__(self, estado: Any) -> None:
+        super().__setstate__(estado)
+        # pickles antigos guardavam os pedidos numa lista
+        if isinstance(self._pedidos, list):
+            self._pedidos = tuple(self._pedidos)
+
+    def _apos_restaurar(self) -> None:
+        self._por_status = None
+        self._total_centavos = None
+
+    # pedido com o status, sem percorrer a conta; mais_recente escolhe entre o último e o
+    # primeiro a chegar nesse status
+    def pedido_com_status(self, status: StatusPedido, mais_recente: bool = True) -> Optional[Pedido]:
+        balde = self._indice().get(status)
+        if not balde:
+            return None
+        return next(reversed(balde.values())) if mais_recente else next(iter(balde.values()))
+
+    def pedidos_com_status(self, status: StatusPedido) -> List[Pedido]:
+        return list(self._indice().get(status, {}).values())
+
+    # True se todos os pedidos da conta estão em algum dos status
+    def todos_os_pedidos_em(self, status: Iterable[StatusPedido]) -> bool:
+        indice = self._indice()
+        return sum(len(indice.get(s, ())) for s in set(status)) == len(self._pedidos)
+
     def adicionar_pedido(self, pedido: Pedido) -> None:
         from .pedido import Pedido
 
@@ -43,12 +105,25 @@ class Conta:
         if not self.esta_aberta:
             raise ContaJaFechadaError(f"Não é possível adicionar pedidos à conta {self.id_conta}, pois ela está fechada.")
         
-        self._pedidos.append(pedido)
+        self._pedidos += (pedido,)
+        pedido._conta = self
+        self._indice().setdefault(pedido.status, {})[pedido.id_pedido] = pedido
+        self._total_mudou(pedido.total_centavos)
+        self._marcar_alterado()
+
+    @property
+    def total_centavos(self) -> int:
+        if self._total_centavos is None:
+            # o índice liga os pedidos à conta, para que avisem dos próximos itens
+            self._indice()
+            self._total_centavos = sum(p.total_centavos for p in self._pedidos)
+        return self._total_centavos
 
     def calcular_total(self) -> float: 
-        return sum(p.calcular_subtotal_pedido() for p in self._pedidos)
+        return self.total_centavos / 100
 
     def fechar(self) -> None:
         if not self.esta_aberta:
             raise ContaJaFechadaError(f"A conta {self.id_conta} já se encontra fechada.")
-        self._aberta = False
\ No newline at end of file
+        self._aberta = False
+        self._marcar_alterado()
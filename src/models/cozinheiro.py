@@ -1,43 +1,70 @@
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Dict, Tuple, TYPE_CHECKING
 from .funcionario import Funcionario
 from .pedido import Pedido
 from .status_enums import StatusPedido
 
 class Cozinheiro(Funcionario):
+    # _pedidos_visao: tupla com os pedidos em preparo, refeita só depois de uma mudança
+    _PADROES = {**Funcionario._PADROES, "_pedidos_visao": None}
+
     def __init__(self, id_funcionario: int, nome: str, salario_base: float):
         super().__init__(id_funcionario, nome, salario_base)
-        self._pedidos_em_preparo: List[Pedido] = []
+        # id do pedido -> pedido, na ordem em que entraram em preparo
+        self._pedidos_em_preparo: Dict[int, Pedido] = {}
+
+    # registros antigos (pickle) trazem uma lista; vira dicionário no primeiro uso, quando
+    # os pedidos referenciados já foram carregados
+    def _pedidos(self) -> Dict[int, Pedido]:
+        if isinstance(self._pedidos_em_preparo, list):
+            self._pedidos_em_preparo = {p.id_pedido: p for p in self._pedidos_em_preparo}
+        return self._pedidos_em_preparo
+
+    @property
+    def pedidos_em_preparo(self) -> Tuple[Pedido, ...]:
+        if self._pedidos_visao is None:
+            self._pedidos_visao = tuple(self._pedidos().values())
+        return self._pedidos_visao
+
+    def _apos_restaurar(self) -> None:
+        self._pedidos_visao = None
 
     @property
-    def pedidos_em_preparo(self) -> List[Pedido]:
-        return self._pedidos_em_preparo.copy()
+    def qtd_pedidos_em_preparo(self) -> int:
+        return len(self._pedidos_em_preparo)
+
+    def esta_preparando(self, pedido: Pedido) -> bool:
+        return self._pedidos().get(pedido.id_pedido) is pedido
 
     def iniciar_preparo_pedido(self, pedido: Pedido) -> None: 
         if not isinstance(pedido, Pedido):
             raise TypeError("Apenas objetos da classe Pedido podem ser preparados.")
         
-        if pedido in self._pedidos_em_preparo:
+        if self.esta_preparando(pedido):
             raise ValueError(f"O Cozinheiro {self.nome} já está preparando o Pedido {pedido.id_pedido}.")
 
-        pedido.iniciar_preparo()
-        self._pedidos_em_preparo.append(pedido)
+        pedido.iniciar_preparo(self.id_funcionario)
+        self._pedidos()[pedido.id_pedido] = pedido
+        self._pedidos_visao = None
+        self._marcar_alterado()
 
     def finalizar_preparo_pedido(self, pedido: Pedido) -> None: 
         if not isinstance(pedido, Pedido):
             raise TypeError("Apenas objetos da classe Pedido podem ser finalizados.")
 
-        if pedido not in self._pedidos_em_preparo:
+        if not self.esta_preparando(pedido):
             raise ValueError(f"O Cozinheiro {self.nome} não está preparando o Pedido {pedido.id_pedido}.")
 
         pedido.finalizar_preparo()
-        self._pedidos_em_preparo.remove(pedido)
+        del self._pedidos()[pedido.id_pedido]
+        self._pedidos_visao = None
+        self._marcar_alterado()
 
     def calcular_pagamento(self) -> float: 
         return self.salario_base
     
     def exibir_dados(self) -> str: 
         info_base = super().exibir_dados()
-        pedidos_str = ", ".join(str(p.id_pedido) for p in self._pedidos_em_preparo)
+        pedidos_str = ", ".join(str(id_pedido) for id_pedido in self._pedidos())
         info_pedidos = f"\nPedidos em Preparo: [{pedidos_str}]"
         return f"--- Cozinheiro ---\n{info_base}{info_pedidos}"
\ No newline at end of file
@@ -18,6 +18,9 @@ class GrupoNaoCabeNaMesaError(ErroDeRegraDeNegocio):
 class EntidadeNaoEncontradaError(ErroDeRegraDeNegocio):
     pass
 
+class DiaComAtendimentoAbertoError(ErroDeRegraDeNegocio):
+    pass
+
 # erros de status/fluxo
 
 class ErroDeStatusInvalido(ErroRestauranteBase):
@@ -1,46 +1,108 @@
-from typing import List, Optional, Iterator
-from .grupo_cliente import GrupoCliente 
+from typing import Dict, List, Optional, Iterator, Tuple
+from .grupo_cliente import GrupoCliente
 
 class FilaDeEspera:
+    """Fila de espera em ordem de chegada, com um balde por tamanho de grupo.
+
+    Cada grupo recebe um número de sequência global ao entrar. Os baldes (tamanho ->
+    grupos daquele tamanho) também ficam em ordem de chegada, então o mais antigo que
+    cabe numa capacidade é o de menor sequência entre os primeiros de cada balde que
+    cabe: custa no máximo um passo por tamanho de grupo, não por grupo na fila."""
+
     def __init__(self):
-        self._fila: List[GrupoCliente] = []
+        self._sequencia = 0
+        # id do grupo -> (sequência, grupo), na ordem da fila
+        self._fila: Dict[int, Tuple[int, GrupoCliente]] = {}
+        # tamanho do grupo -> {id do grupo: sequência}, cada balde em ordem de chegada
+        self._por_tamanho: Dict[int, Dict[int, int]] = {}
+        # tupla com os grupos em ordem, refeita só depois de uma mudança
+        self._visao: Optional[Tuple[GrupoCliente, ...]] = None
 
-    def adicionar_grupo(self, grupo: GrupoCliente) -> None: 
+    def adicionar_grupo(self, grupo: GrupoCliente) -> None:
         from .grupo_cliente import GrupoCliente
         if not isinstance(grupo, GrupoCliente):
             raise TypeError("Apenas objetos da classe GrupoCliente podem ser adicionados à fila.")
-        if grupo in self._fila:
+        if grupo.id_grupo in self._fila:
             raise ValueError(f"O Grupo {grupo.id_grupo} já se encontra na fila de espera.")
-            
-        self._fila.append(grupo)
+
+        self._sequencia += 1
+        self._inserir(grupo, self._sequencia)
+
+    def _inserir(self, grupo: GrupoCliente, sequencia: int) -> None:
+        self._visao = None
+        self._fila[grupo.id_grupo] = (sequencia, grupo)
+        self._por_tamanho.setdefault(grupo.numero_pessoas, {})[grupo.id_grupo] = sequencia
+
+    # devolve à fila, na posição original, um grupo que tinha saído (usado no rollback)
+    def restaurar(self, grupo: GrupoCliente, sequencia: int) -> None:
+        if grupo.id_grupo in self._fila:
+            return
+        self._inserir(grupo, sequencia)
+        if sequencia < self._sequencia:
+            # entrou no fim dos dicionários; reordena só o que foi afetado
+            self._fila = dict(sorted(self._fila.items(), key=lambda item: item[1][0]))
+            balde = self._por_tamanho[grupo.numero_pessoas]
+            self._por_tamanho[grupo.numero_pessoas] = dict(sorted(balde.items(), key=lambda item: item[1]))
+
+    def sequencia_de(self, grupo: GrupoCliente) -> Optional[int]:
+        entrada = self._fila.get(grupo.id_grupo)
+        return entrada[0] if entrada else None
 
     def remover(self, grupo: GrupoCliente) -> None:
         if not isinstance(grupo, GrupoCliente):
             raise TypeError("Apenas um objeto GrupoCliente pode ser removido da fila.")
-        if grupo in self._fila:
-            self._fila.remove(grupo)
+        if grupo.id_grupo in self._fila:
+            self._retirar(grupo.id_grupo)
         else:
             raise ValueError(f"O Grupo {grupo.id_grupo} não foi encontrado na fila de espera.")
 
-    def chamar_proximo_grupo(self, capacidade_disponivel: int) -> Optional[GrupoCliente]:
+    def _retirar(self, id_grupo: int) -> GrupoCliente:
+        self._visao = None
+        _, grupo = self._fila.pop(id_grupo)
+        balde = self._por_tamanho[grupo.numero_pessoas]
+        del balde[id_grupo]
+        if not balde:
+            del self._por_tamanho[grupo.numero_pessoas]
+        return grupo
 
+    # o mais antigo da fila que cabe na capacidade, sem tirá-lo da fila
+    def proximo_que_cabe(self, capacidade_disponivel: int) -> Optional[GrupoCliente]:
         if not isinstance(capacidade_disponivel, int) or capacidade_disponivel <= 0:
             raise ValueError("A capacidade disponível deve ser um número inteiro positivo.")
-        for i, grupo in enumerate(self._fila):
-            if grupo.numero_pessoas <= capacidade_disponivel:
-                return self._fila.pop(i)
-        return None
+        escolhido = None
+        for tamanho, balde in self._por_tamanho.items():
+            if tamanho > capacidade_disponivel:
+                continue
+            id_grupo, sequencia = next(iter(balde.items()))
+            if escolhido is None or sequencia < escolhido[1]:
+                escolhido = (id_grupo, sequencia)
+        return self._fila[escolhido[0]][1] if escolhido else None
+
+    def chamar_proximo_grupo(self, capacidade_disponivel: int) -> Optional[GrupoCliente]:
+        grupo = self.proximo_que_cabe(capacidade_disponivel)
+        if grupo:
+            self._retirar(grupo.id_grupo)
+        return grupo
 
     def __len__(self) -> int:
         return len(self._fila)
 
+    def __contains__(self, grupo: GrupoCliente) -> bool:
+        return grupo.id_grupo in self._fila
+
     def __iter__(self) -> Iterator[GrupoCliente]:
-        return iter(self._fila)
+        return (grupo for _, grupo in self._fila.values())
+
+    @property
+    def grupos(self) -> Tuple[GrupoCliente, ...]:
+        if self._visao is None:
+            self._visao = tuple(self)
+        return self._visao
 
     def to_list(self) -> List[GrupoCliente]:
-        return self._fila.copy()
+        return list(self.grupos)
 
     def __str__(self) -> str:
         if not self._fila:
             return "Fila vazia"
-        return " -> ".join(f"G{g.id_grupo}({g.numero_pessoas})" for g in self._fila)
\ No newline at end of file
+        return " -> ".join(f"G{g.id_grupo}({g.numero_pessoas})" for g in self)
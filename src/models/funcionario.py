@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from .rastreavel import Rastreavel
 
-class Funcionario(ABC):
+class Funcionario(Rastreavel, ABC):
     def __init__(self, id_funcionario: int, nome: str, salario_base: float):
         if not isinstance(id_funcionario, int) or id_funcionario <= 0:
             raise ValueError("O ID do funcionário deve ser um número inteiro positivo.")
@@ -21,6 +22,7 @@ class Funcionario(ABC):
         if not isinstance(novo_nome, str) or not novo_nome.strip():
             raise ValueError("O nome do funcionário não pode ser vazio.")
         self.__nome = novo_nome.strip().title()
+        self._marcar_alterado()
 
     @property
     def salario_base(self) -> float:
@@ -33,6 +35,7 @@ class Funcionario(ABC):
         if novo_salario < 0:
             raise ValueError("O salário base não pode ser negativo.")
         self.__salario_base = float(novo_salario)
+        self._marcar_alterado()
 
     def exibir_dados(self) -> str:
         info_base = (
@@ -1,20 +1,43 @@
 # models/garcom.py
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Dict, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from .mesa import Mesa
 from .funcionario import Funcionario
 from models.excecoes import GarcomNoLimiteError
 
 class Garcom(Funcionario):
+    # _mesas_visao: tupla com as mesas, refeita só depois de uma mudança
+    _PADROES = {**Funcionario._PADROES, "_mesas_visao": None}
+
     def __init__(self, id_funcionario: int, nome: str, salario_base: float):
         super().__init__(id_funcionario, nome, salario_base)
         self._gorjetas: float = 0.0
-        self._mesas_atendidas: List[Mesa] = []
+        # id da mesa -> mesa, na ordem em que foram atribuídas
+        self._mesas_atendidas: Dict[int, Mesa] = {}
+
+    # registros antigos (pickle) trazem uma lista; vira dicionário no primeiro uso, quando
+    # as mesas referenciadas já foram carregadas
+    def _mesas(self) -> Dict[int, Mesa]:
+        if isinstance(self._mesas_atendidas, list):
+            self._mesas_atendidas = {m.id_mesa: m for m in self._mesas_atendidas}
+        return self._mesas_atendidas
+
+    @property
+    def mesas_atendidas(self) -> Tuple[Mesa, ...]:
+        if self._mesas_visao is None:
+            self._mesas_visao = tuple(self._mesas().values())
+        return self._mesas_visao
+
+    def _apos_restaurar(self) -> None:
+        self._mesas_visao = None
 
     @property
-    def mesas_atendidas(self) -> List[Mesa]:
-        return self._mesas_atendidas.copy()
+    def qtd_mesas(self) -> int:
+        return len(self._mesas_atendidas)
+
+    def atende(self, mesa: Mesa) -> bool:
+        return self._mesas().get(mesa.id_mesa) is mesa
     
     @property
     def gorjetas(self) -> float:
@@ -24,6 +47,7 @@ class Garcom(Funcionario):
         if not isinstance(valor, (int, float)) or valor < 0:
             raise ValueError("O valor da gorjeta deve ser um número não negativo.")
         self._gorjetas += valor
+        self._marcar_alterado()
 
     def adicionar_mesa(self, mesa: Mesa) -> None:
         from .mesa import Mesa 
@@ -34,10 +58,12 @@ class Garcom(Funcionario):
         if len(self._mesas_atendidas) >= 4:
             raise GarcomNoLimiteError(f"O Garçom {self.nome} já atingiu o limite de 4 mesas.")
             
-        if mesa in self._mesas_atendidas:
+        if self.atende(mesa):
             raise ValueError(f"O Garçom {self.nome} já está atendendo a Mesa {mesa.id_mesa}.")
 
-        self._mesas_atendidas.append(mesa)
+        self._mesas()[mesa.id_mesa] = mesa
+        self._mesas_visao = None
+        self._marcar_alterado()
 
     def remover_mesa(self, mesa: Mesa) -> None:
         from .mesa import Mesa
@@ -45,10 +71,12 @@ class Garcom(Funcionario):
         if not isinstance(mesa, Mesa):
             raise TypeError("Apenas objetos da classe Mesa podem ser removidos.")
 
-        if mesa not in self._mesas_atendidas:
+        if not self.atende(mesa):
             raise ValueError(f"O Garçom {self.nome} não está atendendo a Mesa {mesa.id_mesa}.")
             
-        self._mesas_atendidas.remove(mesa)
+        del self._mesas()[mesa.id_mesa]
+        self._mesas_visao = None
+        self._marcar_alterado()
 
     def calcular_pagamento(self) -> float:
         return self.salario_base + self._gorjetas
@@ -57,7 +85,7 @@ class Garcom(Funcionario):
         info_base = super().exibir_dados()
         info_especifica = f"\nGorjetas: R${self._gorjetas:.2f}"
         
-        mesas_str = ", ".join(str(m.id_mesa) for m in self._mesas_atendidas)
+        mesas_str = ", ".join(str(id_mesa) for id_mesa in self._mesas())
         info_mesas = f"\nMesas Atendidas: [{mesas_str}]"
         
         return f"--- Garçom ---\n{info_base}{info_especifica}{info_mesas}"
\ No newline at end of file
@@ -1,6 +1,9 @@
 from models.status_enums import StatusGrupoCliente
+from .rastreavel import Rastreavel
+
+class GrupoCliente(Rastreavel):
+    __slots__ = ("_id_grupo", "_numero_pessoas", "_status")
 
-class GrupoCliente:
     def __init__(self, id_grupo: int, numero_pessoas: int):
         if not isinstance(id_grupo, int) or id_grupo <= 0:
             raise ValueError("O ID do grupo deve ser um número inteiro positivo.")
@@ -27,6 +30,7 @@ class GrupoCliente:
         if not isinstance(novo_status, StatusGrupoCliente):
             raise TypeError("O status deve ser um membro válido de StatusGrupoCliente.")
         self._status = novo_status
+        self._marcar_alterado()
 
     def sentar(self) -> None: 
         if self.status != StatusGrupoCliente.ESPERANDO:
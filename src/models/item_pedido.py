@@ -1,10 +1,13 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .prato import Prato
 
 class ItemPedido:    
+    # milhões de itens no histórico: sem __dict__
+    __slots__ = ("_prato", "_quantidade", "_observacao", "_subtotal_centavos")
+
     def __init__(self, prato: Prato, quantidade: int, observacao: str = ""):
         from .prato import Prato
 
@@ -20,6 +23,7 @@ class ItemPedido:
         self._prato: Prato = prato
         self._quantidade: int = quantidade
         self._observacao: str = observacao.strip() 
+        self._subtotal_centavos = round(prato.preco * 100) * quantidade
 
     @property
     def prato(self) -> Prato:
@@ -33,8 +37,22 @@ class ItemPedido:
     def observacao(self) -> str:
         return self._observacao
 
+    # estado dos pickles antigos (o __dict__) ou de slots ((None, slots)); o subtotal é refeito
+    def __setstate__(self, estado: Any) -> None:
+        if isinstance(estado, tuple):
+            estado = {**(estado[0] or {}), **(estado[1] or {})}
+        self._prato = estado["_prato"]
+        self._quantidade = estado["_quantidade"]
+        self._observacao = estado.get("_observacao", "")
+        self._subtotal_centavos = round(self._prato.preco * 100) * self._quantidade
+
+    # preço x quantidade em centavos, fixado quando o item é criado
+    @property
+    def subtotal_centavos(self) -> int:
+        return self._subtotal_centavos
+
     def calcular_subtotal(self) -> float:
-        return self.prato.preco * self.quantidade
+        return self.subtotal_centavos / 100
 
     def __str__(self) -> str:
         obs = f" (Obs: {self.observacao})" if self.observacao else ""
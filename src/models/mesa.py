@@ -3,11 +3,14 @@ from typing import Optional, TYPE_CHECKING
 from .status_enums import StatusMesa
 from .grupo_cliente import GrupoCliente
 from .conta import Conta
+from .rastreavel import Rastreavel
 if TYPE_CHECKING:
     from .garcom import Garcom
 from models.excecoes import StatusMesaInvalidoError, GrupoNaoCabeNaMesaError
 
-class Mesa:
+class Mesa(Rastreavel):
+    __slots__ = ("_id_mesa", "_capacidade", "_status", "_grupo_cliente", "_conta", "_garcom_responsavel")
+
     def __init__(self, id_mesa: int, capacidade: int):
         if not isinstance(id_mesa, int) or id_mesa <= 0:
             raise ValueError("O ID da mesa deve ser um número inteiro positivo.")
@@ -39,6 +42,7 @@ class Mesa:
         if not isinstance(nova_conta, (Conta, type(None))):
             raise TypeError("O valor atribuído à conta deve ser um objeto Conta ou None.")
         self._conta = nova_conta
+        self._marcar_alterado()
 
     @garcom_responsavel.setter
     def garcom_responsavel(self, garcom: Optional[Garcom]):
@@ -46,6 +50,7 @@ class Mesa:
         if not isinstance(garcom, (Garcom, type(None))):
             raise TypeError("O responsável deve ser um objeto Garcom ou None.")
         self._garcom_responsavel = garcom
+        self._marcar_alterado()
 
     @property
     def capacidade(self) -> int:
@@ -56,6 +61,7 @@ class Mesa:
         if not isinstance(nova_capacidade, int) or nova_capacidade <= 0:
             raise ValueError("A capacidade deve ser um número inteiro positivo.")
         self._capacidade = nova_capacidade
+        self._marcar_alterado()
     
     def ocupar(self, grupo: GrupoCliente) -> None:
         from .grupo_cliente import GrupoCliente
@@ -68,6 +74,7 @@ class Mesa:
         
         self._status = StatusMesa.OCUPADA
         self._grupo_cliente = grupo
+        self._marcar_alterado()
         grupo.sentar()
 
     def liberar(self) -> None:
@@ -78,12 +85,14 @@ class Mesa:
             self._grupo_cliente.sair()
         self._status = StatusMesa.SUJA
         self._grupo_cliente = None
+        self._marcar_alterado()
 
     def limpar(self) -> None:
         if self.status != StatusMesa.SUJA:
             raise StatusMesaInvalidoError(f"Apenas uma mesa suja pode ser limpa (status atual: {self.status.value}).")
         
         self._status = StatusMesa.LIVRE
+        self._marcar_alterado()
         self.conta = None
         self.garcom_responsavel = None
         
@@ -1,20 +1,33 @@
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Any, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 from .item_pedido import ItemPedido
 from .status_enums import StatusPedido
 from models.excecoes import StatusPedidoInvalidoError
+from .rastreavel import Rastreavel
 
 if TYPE_CHECKING:
+    from .conta import Conta
     from .mesa import Mesa
     from .garcom import Garcom
     from .grupo_cliente import GrupoCliente
 
 
-class Pedido:
+class Pedido(Rastreavel):
+    __slots__ = ("_id_pedido", "_mesa", "_garcom", "_grupo_cliente", "_data_hora", "_status", "_itens",
+                 "_id_cozinheiro", "_conta", "_total_centavos")
+
     _proximo_id = 1
+    # _id_cozinheiro: quem assumiu o preparo (só o id, para não amarrar o pedido ao funcionário);
+    # registros antigos, gravados antes do campo existir, não o têm.
+    # _conta: conta que indexa o pedido por status; só em memória, ligada por
+    # Conta.adicionar_pedido ou quando a conta monta o índice.
+    # _total_centavos: soma dos itens; None até a primeira leitura nos pedidos vindos do disco.
+    # _grupo_cliente: o construtor nunca guardou o grupo; só registros que o trazem o têm
+    _PADROES = {**Rastreavel._PADROES, "_id_cozinheiro": None, "_conta": None,
+                "_total_centavos": None, "_grupo_cliente": None}
 
-    def __init__(self, mesa: Mesa, garcom: Garcom, grupo_cliente: GrupoCliente):
+    def __init__(self, mesa: Mesa, garcom: Garcom, grupo_cliente: GrupoCliente, id_pedido: Optional[int] = None):
         from .mesa import Mesa
         from .garcom import Garcom
         from .grupo_cliente import GrupoCliente
@@ -26,24 +39,34 @@ class Pedido:
         if not isinstance(grupo_cliente, GrupoCliente):
             raise TypeError("O pedido deve estar associado a um objeto GrupoCliente válido.")
 
-        self._id_pedido: int = Pedido._proximo_id
+        # o id vem do gerador persistente; o contador da classe fica para quem cria pedidos soltos
+        if id_pedido is None:
+            id_pedido = Pedido._proximo_id
+            Pedido._proximo_id += 1
+        self._id_pedido: int = id_pedido
         self._mesa: Mesa = mesa
         self._garcom: Garcom = garcom
         self._grupo_cliente: grupo_cliente
         self._data_hora: datetime = datetime.now()
         self._status: StatusPedido = StatusPedido.ABERTO
-        self._itens: List[ItemPedido] = []
-        
-        Pedido._proximo_id += 1
+        # tupla: quem lê recebe a própria coleção, sem cópia e sem poder alterá-la
+        self._itens: Tuple[ItemPedido, ...] = ()
+        self._total_centavos = 0
 
     @property
     def id_pedido(self) -> int: return self._id_pedido
     @property
     def mesa(self) -> Mesa: return self._mesa
     @property
+    def garcom(self) -> Optional[Garcom]: return self._garcom
+    @property
+    def data_hora(self) -> datetime: return self._data_hora
+    @property
     def status(self) -> StatusPedido: return self._status
     @property
-    def itens(self) -> List[ItemPedido]: return self._itens.copy()
+    def id_cozinheiro(self) -> Optional[int]: return self._id_cozinheiro
+    @property
+    def itens(self) -> Tuple[ItemPedido, ...]: return self._itens
 
     def adicionar_item(self, prato: Prato, quantidade: int, observacao: str = "") -> None:
 
@@ -51,32 +74,62 @@ class Pedido:
             raise ValueError(f"Não é possível adicionar itens ao Pedido {self.id_pedido}, pois seu status é '{self.status.value}'.")
         
         novo_item = ItemPedido(prato, quantidade, observacao)
-        self._itens.append(novo_item)
+        self._itens += (novo_item,)
+        if self._total_centavos is not None:
+            self._total_centavos += novo_item.subtotal_centavos
+        if self._conta is not None:
+            self._conta._total_mudou(novo_item.subtotal_centavos)
+        self._marcar_alterado()
+
+    @property
+    def total_centavos(self) -> int:
+        if self._total_centavos is None:
+            self._total_centavos = sum(item.subtotal_centavos for item in self._itens)
+        return self._total_centavos
 
     def calcular_subtotal_pedido(self) -> float:
-        return sum(item.calcular_subtotal() for item in self._itens)
+        return self.total_centavos / 100
 
     def confirmar(self) -> None:
         if self.status != StatusPedido.ABERTO:
             raise StatusPedidoInvalidoError(f"Apenas um pedido 'Aberto' pode ser confirmado (status atual: '{self.status.value}').")
-        if not self.itens:
+        if not self._itens:
             raise ValueError("Não é possível confirmar um pedido vazio.")
-        self._status = StatusPedido.CONFIRMADO
+        self._mudar_status(StatusPedido.CONFIRMADO)
 
-    def iniciar_preparo(self) -> None:
+    def iniciar_preparo(self, id_cozinheiro: Optional[int] = None) -> None:
         if self.status != StatusPedido.CONFIRMADO:
             raise StatusPedidoInvalidoError(f"Apenas um pedido 'Confirmado' pode iniciar o preparo (status atual: '{self.status.value}').")
-        self._status = StatusPedido.EM_PREPARO
+        self._id_cozinheiro = id_cozinheiro
+        self._mudar_status(StatusPedido.EM_PREPARO)
 
     def finalizar_preparo(self) -> None:
         if self.status != StatusPedido.EM_PREPARO:
             raise StatusPedidoInvalidoError(f"Apenas um pedido 'Em Preparo' pode ser finalizado (status atual: '{self.status.value}').")
-        self._status = StatusPedido.PRONTO
+        self._mudar_status(StatusPedido.PRONTO)
 
     def entregar_pedido(self) -> None:
         if self.status != StatusPedido.PRONTO:
             raise StatusPedidoInvalidoError(f"Apenas um pedido 'Pronto' pode ser entregue (status atual: '{self.status.value}').")
-        self._status = StatusPedido.ENTREGUE
+        self._mudar_status(StatusPedido.ENTREGUE)
+
+    def _mudar_status(self, novo: StatusPedido) -> None:
+        anterior, self._status = self._status, novo
+        self._marcar_alterado()
+        if self._conta is not None:
+            self._conta._pedido_mudou_status(self, anterior)
+
+    def __setstate__(self, estado: Any) -> None:
+        super().__setstate__(estado)
+        # pickles antigos guardavam os itens numa lista
+        if isinstance(self._itens, list):
+            self._itens = tuple(self._itens)
+
+    def _apos_restaurar(self) -> None:
+        # status e itens podem ter voltado atrás: índice e totais são refeitos na próxima consulta
+        self._total_centavos = None
+        if self._conta is not None:
+            self._conta._apos_restaurar()
 
     def __str__(self) -> str:
         return (f"Pedido ID: {self.id_pedido} (Mesa: {self.mesa.id_mesa}) | "
@@ -1,4 +1,9 @@
-class Prato:
+from .rastreavel import Rastreavel
+
+
+class Prato(Rastreavel):
+    __slots__ = ("_id_prato", "_nome", "_preco", "_descricao")
+
     def __init__(self, id_prato: int, nome: str, preco: float, descricao: str):
         if not isinstance(id_prato, int) or id_prato <= 0:
             raise ValueError("O ID do prato deve ser um número inteiro positivo.")
@@ -21,6 +26,7 @@ class Prato:
         if not isinstance(novo_nome, str) or not novo_nome.strip():
             raise ValueError("O nome do prato não pode ser vazio.")
         self._nome = novo_nome.strip().title() 
+        self._marcar_alterado()
     
     @property
     def preco(self) -> float:
@@ -33,6 +39,7 @@ class Prato:
         if novo_preco < 0:
             raise ValueError("O preço do prato não pode ser negativo.")
         self._preco = float(novo_preco)
+        self._marcar_alterado()
 
     @property
     def descricao(self) -> str:
@@ -43,6 +50,7 @@ class Prato:
         if not isinstance(nova_descricao, str):
             raise TypeError("A descrição deve ser um texto (string).")
         self._descricao = nova_descricao.strip()
+        self._marcar_alterado()
     
     def __str__(self):
         return f"{self.id_prato}. {self.nome} - R$ {self.preco:.2f}"
\ No newline at end of file
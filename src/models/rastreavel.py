@@ -0,0 +1,59 @@
+from typing import Any, Callable, Dict, Optional
+
+
+class Rastreavel:
+    """Marca a entidade como alterada desde a última gravação.
+
+    Setters e transições de estado chamam _marcar_alterado(); a persistência usa
+    esta_alterado para pular a gravação de quem não mudou e marcar_gravado()
+    depois de gravar.
+
+    As entidades do histórico usam __slots__. Objetos criados sem passar pelo
+    __init__ (carga do disco, reservas do mapa de identidade) podem ter slots
+    nunca atribuídos: esses leem o valor de _PADROES da classe, e por isso um
+    objeto carregado já nasce como gravado."""
+
+    __slots__ = ("_alterado",)
+
+    _PADROES: Dict[str, Any] = {"_alterado": False}
+
+    # instalado pela persistência (mapa de identidade): recebe uma reserva lida antes de o DAO
+    # dono carregar, carrega o dono e diz se ela ganhou o estado
+    _carregar_reserva: Optional[Callable[[Any], bool]] = None
+
+    # só é chamado quando a busca normal falha (slot nunca atribuído)
+    def __getattr__(self, nome: str) -> Any:
+        try:
+            return type(self)._PADROES[nome]
+        except KeyError:
+            pass
+        carregar = Rastreavel._carregar_reserva
+        if carregar is not None and not nome.startswith("__") and carregar(self):
+            return getattr(self, nome)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nome}'")
+
+    # aceita tanto o estado dos pickles antigos (o __dict__) quanto o de classes com slots ((dict, slots))
+    def __setstate__(self, estado: Any) -> None:
+        if isinstance(estado, tuple):
+            dicionario, slots = estado
+            estado = {**(dicionario or {}), **(slots or {})}
+        for nome, valor in estado.items():
+            try:
+                object.__setattr__(self, nome, valor)
+            except AttributeError:
+                pass  # atributo que a classe não tem mais
+
+    @property
+    def esta_alterado(self) -> bool:
+        return self._alterado
+
+    def _marcar_alterado(self) -> None:
+        self._alterado = True
+
+    def marcar_gravado(self) -> None:
+        self._alterado = False
+
+    # chamado quando um rollback devolve o estado gravado à instância; quem guarda
+    # estado derivado (índices) o descarta aqui
+    def _apos_restaurar(self) -> None:
+        pass
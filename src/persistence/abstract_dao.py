@@ -1,35 +1,193 @@
-import pickle
+import operator
+import os
+import time
 from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+
+from .armazenamento import criar_armazenamento, criar_arquivo_morto
+from .gerador_ids import gerador_ids
+from .mapa_identidade import mapa_identidade, transplantar
+from .serializacao import serializar, desserializar, precisa_atualizar
+from .unidade_de_trabalho import transacao_atual, trava_de_gravacao
+from models.rastreavel import Rastreavel
+
+_COMPARADORES = {'=': operator.eq, '>=': operator.ge, '<=': operator.le}
+
+# datasource -> (registros, ms) da carga de cada DAO; build_app_gui devolve e o main mostra com --carga
+tempos_de_carga: Dict[str, Tuple[int, float]] = {}
 
 class DAO(ABC):
     @abstractmethod
     def __init__(self, datasource=''):
         self.__datasource = datasource
+        inicio = time.perf_counter()
+        self.__colunas = self._colunas_indexadas()
+        # o backend (journal em pickle ou SQLite) é escolhido em configurar_armazenamento()
+        self.__armazenamento = criar_armazenamento(datasource, self._converter_dados, self.__colunas)
+        self.__arquivo = None
+        # última versão gravada de cada entidade; é para ela que um rollback volta
+        self.__registros = self.__armazenamento.carregar()
+        # True quando um snapshot aponta para o dicionário atual: a próxima gravação troca por uma cópia
+        self.__registros_congelados = False
         self.__cache = {} #é aqui que vai ficar a lista que estava no controlador. Nesse exemplo estamos usando um dicionario
-        try:
-            self.__load()
-        except FileNotFoundError:
-            self.__dump()
+        # cada entidade carregada vira a instância única compartilhada com os outros DAOs
+        for key, dados in self.__registros.items():
+            self.__cache[key] = mapa_identidade.incorporar(desserializar(dados))
+        # registros ainda em pickle são regravados no formato binário
+        pendentes = self.__armazenamento.pendentes_de_indice()
+        pendentes += [key for key, dados in self.__registros.items() if precisa_atualizar(dados)]
+        if pendentes:
+            self._gravar(pendentes)
+        tempos_de_carga[datasource] = (len(self.__cache), (time.perf_counter() - inicio) * 1000)
+
+    # ponto de extensão para os DAOs que ainda encontram arquivos no formato antigo
+    def _converter_dados(self, dados):
+        if not isinstance(dados, dict):
+            raise ValueError(f"Formato de arquivo inválido em '{self.__datasource}'.")
+        return dict(dados)
+
+    # colunas usadas nas buscas dos controllers: nome -> função que extrai o valor do objeto
+    def _colunas_indexadas(self):
+        return {}
+
+    # filtros: [(coluna, operador, valor)]; ordem: colunas (ou 'chave') para ordenar o resultado
+    def _buscar(self, filtros=(), ordem=(), limite=None):
+        chaves = self.__armazenamento.buscar(filtros, ordem, limite)
+        if chaves is not None:
+            return [self.__cache[k] for k in chaves if k in self.__cache]
+
+        # backend sem índice: varre o cache
+        encontrados = [
+            (k, obj) for k, obj in self.__cache.items()
+            if all(_COMPARADORES[op](self.__colunas[col](obj), valor) for col, op, valor in filtros)
+        ]
+        if ordem:
+            encontrados.sort(key=lambda par: tuple(
+                par[0] if col == 'chave' else self.__colunas[col](par[1]) for col in ordem
+            ))
+        if limite is not None:
+            encontrados = encontrados[:limite]
+        return [obj for _, obj in encontrados]
+
+    def fechar(self):
+        self.__armazenamento.fechar()
+
+    # segmentos comprimidos com o histórico que já saiu do DAO; só são lidos sob demanda
+    def arquivo_morto(self):
+        if self.__arquivo is None:
+            self.__arquivo = criar_arquivo_morto(os.path.splitext(os.path.basename(self.__datasource))[0])
+        return self.__arquivo
 
-    def __dump(self):
-        pickle.dump(self.__cache, open(self.__datasource, 'wb'))
+    # deixa o gerador de ids acima das chaves já usadas; se o tipo ainda não está no arquivo
+    # do gerador, o arquivo morto também conta, mas só é lido quando um id novo for pedido
+    def _reservar_ids(self, tipo, minimo=0):
+        gerador_ids.garantir_acima(tipo, max(max(self.__cache, default=minimo), minimo))
+        if not gerador_ids.conhece(tipo):
+            arquivo = self.arquivo_morto()
+            gerador_ids.garantir_acima_sob_demanda(tipo, lambda: max((key for key, _ in arquivo.ler()), default=0))
 
-    def __load(self):
-        self.__cache = pickle.load(open(self.__datasource,'rb'))
+    # move as entradas para o arquivo morto: primeiro grava lá, depois tira do DAO
+    def arquivar(self, chaves):
+        registros = [
+            (key, serializar(self.__cache[key], referenciar_todas=True))
+            for key in chaves if key in self.__cache
+        ]
+        self.arquivo_morto().anexar(registros)
+        for key, _ in registros:
+            self.remove(key)
 
-    #esse método precisa chamar o self.__dump()
+    # dentro de uma unidade de trabalho a gravação fica para o commit; fora dela, é imediata
+    def __persistir(self, key, anterior):
+        transacao = transacao_atual()
+        if transacao is not None:
+            transacao.registrar(self, key, self.__registros.get(key), anterior)
+        else:
+            self._gravar([key])
+
+    # grava o estado atual das chaves num lote só (chave fora do cache = removida)
+    def _gravar(self, chaves):
+        self._aplicar(self._preparar(chaves))
+
+    # serializa o lote sem gravar nada; o commit prepara todos os DAOs antes de gravar o primeiro
+    def _preparar(self, chaves):
+        lote = []
+        for key in chaves:
+            obj = self.__cache.get(key)
+            if obj is None:
+                if key in self.__registros:
+                    lote.append(('remove', key, None, {}))
+            else:
+                valores = {col: extrair(obj) for col, extrair in self.__colunas.items()}
+                lote.append(('update', key, serializar(obj), valores))
+        return lote
+
+    def _aplicar(self, lote):
+        if not lote:
+            return
+        with trava_de_gravacao:
+            self.__armazenamento.gravar_lote(lote)
+            if self.__registros_congelados:
+                self.__registros = dict(self.__registros)
+                self.__registros_congelados = False
+            for op, key, dados, _ in lote:
+                if op == 'remove':
+                    del self.__registros[key]
+                else:
+                    self.__registros[key] = dados
+                    if isinstance(self.__cache[key], Rastreavel):
+                        self.__cache[key].marcar_gravado()
+
+    # registros gravados (chave -> bytes) para um snapshot; o DAO não mexe mais neste dicionário
+    def congelar(self):
+        with trava_de_gravacao:
+            self.__registros_congelados = True
+            return self.__registros
+
+    # volta a entrada para a última versão gravada, na mesma instância que os outros objetos referenciam
+    def _desfazer(self, key, registro_anterior, anterior):
+        atual = self.__cache.get(key)
+        if registro_anterior is None:
+            self.__cache.pop(key, None)
+            if atual is not None:
+                mapa_identidade.remover(atual)
+            return
+        restaurado = desserializar(registro_anterior)
+        if anterior is not None and (hasattr(anterior, '__dict__') or hasattr(type(anterior), '__slots__')):
+            transplantar(anterior, restaurado)
+            restaurado = anterior
+        if atual is not None and atual is not restaurado:
+            mapa_identidade.remover(atual)
+        self.__cache[key] = restaurado
+        mapa_identidade.registrar(restaurado)
+        if isinstance(restaurado, Rastreavel):
+            restaurado.marcar_gravado()
+            restaurado._apos_restaurar()
+
+    #esse método precisa gravar no armazenamento
     def add(self, key, obj):
+        anterior = self.__cache.get(key)
         self.__cache[key] = obj
-        self.__dump()  #atualiza o arquivo depois de add novo amigo
+        mapa_identidade.registrar(obj)
+        self.__persistir(key, anterior)  #grava só o registro novo depois de add novo amigo
+
+    # entra na unidade de trabalho atual sem gravar nada: se ela falhar, a entidade volta ao
+    # último estado gravado mesmo que o caso de uso não tenha chegado ao update dela
+    def acompanhar(self, key):
+        transacao = transacao_atual()
+        if transacao is not None and key in self.__cache:
+            transacao.registrar(self, key, self.__registros.get(key), self.__cache[key])
 
-    #cuidado: esse update só funciona se o objeto com essa chave já existe
+    # só atualiza o que já existe; chave desconhecida é erro (use add), senão a mudança se perde calada
     def update(self, key, obj):
-        try:
-            if(self.__cache[key] != None):
-                self.__cache[key] = obj #atualiza a entrada
-                self.__dump()  #atualiza o arquivo
-        except KeyError:
-            pass  # implementar aqui o tratamento da exceção
+        if key not in self.__cache:
+            raise KeyError(f"Registro {key!r} não existe em '{self.__datasource}'.")
+        anterior = self.__cache[key]
+        # mesma instância e nada mudou desde a última gravação: não há o que gravar
+        if obj is anterior and isinstance(obj, Rastreavel) and not obj.esta_alterado:
+            return
+        self.__cache[key] = obj #atualiza a entrada
+        mapa_identidade.registrar(obj)
+        self.__persistir(key, anterior)  #grava a entrada atualizada
 
     def get(self, key):
         try:
@@ -37,11 +195,12 @@ class DAO(ABC):
         except KeyError:
             pass #implementar aqui o tratamento da exceção
 
-    # esse método precisa chamar o self.__dump()
+    # esse método precisa gravar no armazenamento
     def remove(self, key):
         try:
-            self.__cache.pop(key)
-            self.__dump() #atualiza o arquivo depois de remover um objeto
+            anterior = self.__cache.pop(key)
+            mapa_identidade.remover(anterior)
+            self.__persistir(key, anterior) #registra a remoção do objeto
         except KeyError:
             pass #implementar aqui o tratamento da exceção
 
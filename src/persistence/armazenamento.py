@@ -0,0 +1,313 @@
+import atexit
+import os
+import pickle
+import struct
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .codec_binario import empacotar_registros, desempacotar_registros, empacotar_lote, desempacotar_lote
+from .gerador_ids import gerador_ids
+from .serializacao import normalizar_legado
+
+# (coluna, operador, valor) -- operadores aceitos: '=', '>=', '<='
+Filtro = Tuple[str, str, Any]
+# (op, chave, entidade serializada ou None, valores das colunas indexadas); op é 'update' ou 'remove'
+Registro = Tuple[str, Any, Optional[bytes], Dict[str, Any]]
+
+_config: Dict[str, Any] = {
+    "backend": "pickle",
+    "caminho_sqlite": "restaurante.db",
+    "durabilidade": "sync",
+    "intervalo_ms": 50,
+    "compressao_arquivo": "zlib",
+}
+
+# 'sync': grava e faz fsync antes de devolver; 'batched': uma thread grava e faz fsync a cada
+# intervalo_ms; 'async': a thread grava assim que pode, sem fsync
+DURABILIDADES = ("sync", "batched", "async")
+
+_abertos: List["Armazenamento"] = []
+_gravador = None
+# os DAOs podem ser construídos em paralelo (build_app_gui): um gravador só para todos
+_lock_gravador = threading.Lock()
+
+
+def configurar_armazenamento(backend: str = "pickle", caminho_sqlite: str = "restaurante.db",
+                             durabilidade: str = "sync", intervalo_ms: int = 50,
+                             compressao_arquivo: str = "zlib") -> None:
+    # precisa ser chamado antes de os controllers (e seus DAOs) serem construídos
+    if backend not in ("pickle", "sqlite"):
+        raise ValueError(f"Backend de armazenamento desconhecido: '{backend}'.")
+    if durabilidade not in DURABILIDADES:
+        raise ValueError(f"Nível de durabilidade desconhecido: '{durabilidade}'.")
+    _config["backend"] = backend
+    _config["caminho_sqlite"] = caminho_sqlite
+    _config["durabilidade"] = durabilidade
+    _config["intervalo_ms"] = intervalo_ms
+    _config["compressao_arquivo"] = compressao_arquivo
+
+
+def criar_armazenamento(datasource: str, converter: Callable[[Any], Dict],
+                        colunas: Dict[str, Callable[[Any], Any]]) -> "Armazenamento":
+    global _gravador
+    sincronizar = _config["durabilidade"] != "async"
+    if _config["backend"] == "sqlite":
+        from .armazenamento_sqlite import ArmazenamentoSQLite
+        backend = ArmazenamentoSQLite(_config["caminho_sqlite"], datasource, converter, colunas, sincronizar)
+    else:
+        backend = ArmazenamentoJournal(datasource, converter, sincronizar)
+    _abertos.append(backend)
+    if _config["durabilidade"] == "sync":
+        return backend
+
+    from .gravador import GravadorEmSegundoPlano, ArmazenamentoEmSegundoPlano
+    with _lock_gravador:
+        if _gravador is None:
+            intervalo = _config["intervalo_ms"] / 1000 if _config["durabilidade"] == "batched" else 0.0
+            _gravador = GravadorEmSegundoPlano(intervalo)
+            atexit.register(encerrar_armazenamento)
+    return ArmazenamentoEmSegundoPlano(backend, _gravador)
+
+
+def criar_arquivo_morto(nome: str):
+    from .arquivo_morto import ArquivoMorto
+    return ArquivoMorto(nome, compressao=_config["compressao_arquivo"])
+
+
+def criar_livro_itens():
+    from .livro_itens import LivroDeItens
+    return LivroDeItens(sincronizar=_config["durabilidade"] != "async")
+
+
+# grava o que estiver pendente e espera as threads de persistência terminarem
+def encerrar_armazenamento() -> None:
+    global _gravador
+    # um erro de gravação do gravador sobe para quem encerra, depois de fechar o resto
+    try:
+        if _gravador is not None:
+            gravador, _gravador = _gravador, None
+            gravador.encerrar()
+    finally:
+        for armazenamento in _abertos:
+            armazenamento.fechar()
+        _abertos.clear()
+        gerador_ids.devolver_sobras()
+
+
+class Armazenamento(ABC):
+    # os backends só lidam com entidades já serializadas (chave -> bytes)
+    @abstractmethod
+    def carregar(self) -> Dict[Any, bytes]:
+        pass
+
+    # grava o lote inteiro de uma vez: ou entra tudo, ou nada
+    @abstractmethod
+    def gravar_lote(self, registros: List[Registro]) -> None:
+        pass
+
+    # devolve as chaves que satisfazem os filtros, ou None se o backend não tem índices
+    def buscar(self, filtros: Sequence[Filtro], ordem: Sequence[str],
+               limite: Optional[int]) -> Optional[List[Any]]:
+        return None
+
+    # chaves gravadas sem os valores das colunas indexadas (ex.: importadas de outro formato)
+    def pendentes_de_indice(self) -> List[Any]:
+        return []
+
+    def fechar(self) -> None:
+        pass
+
+
+class ArmazenamentoJournal(Armazenamento):
+    """Snapshot binário + journal append-only com compactação em segundo plano."""
+
+    # tamanho (em bytes) a partir do qual o journal é compactado no snapshot
+    LIMITE_JOURNAL = 256 * 1024
+
+    # cabeçalhos com a versão do formato; arquivos sem eles são os pickles antigos
+    MAGICO_SNAPSHOT = b"RSNP"
+    MAGICO_JOURNAL = b"RJNL"
+    VERSAO_ARQUIVO = 1
+    _CABECALHO = struct.Struct("<4sH")
+    # cada lote do journal: tamanho + crc32 do conteúdo, para detectar um lote truncado
+    _LOTE = struct.Struct("<II")
+
+    def __init__(self, datasource: str, converter: Callable[[Any], Dict], sincronizar: bool = False):
+        self.__datasource = datasource
+        self.__converter = converter
+        self.__sincronizar = sincronizar
+        self.__journal = os.path.splitext(datasource)[0] + '.journal'
+        self.__journal_compactando = self.__journal + '.old'
+        self.__registros: Dict[Any, bytes] = {}
+        self.__lock = threading.Lock()
+        self.__compactacao: Optional[threading.Thread] = None
+
+    def existe(self) -> bool:
+        return any(os.path.exists(c) for c in (self.__datasource, self.__journal, self.__journal_compactando))
+
+    def carregar(self) -> Dict[Any, bytes]:
+        try:
+            legado = self.__load()
+        except FileNotFoundError:
+            self.__dump()
+        except (EOFError, ValueError, struct.error, pickle.UnpicklingError):
+            print(f"[AVISO DAO] Arquivo '{self.__datasource}' vazio ou corrompido. Reiniciando dados.")
+            self.__registros = {}
+            self.__descartar_journals()
+            self.__dump()
+        else:
+            if legado:
+                # atualização em um passo: snapshot já no formato novo e journals antigos descartados
+                self.__dump()
+                self.__descartar_journals()
+        return dict(self.__registros)
+
+    # grava o snapshot completo de forma atômica (arquivo temporário + replace)
+    def __dump(self, registros=None):
+        registros = self.__registros if registros is None else registros
+        tmp = self.__datasource + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self._CABECALHO.pack(self.MAGICO_SNAPSHOT, self.VERSAO_ARQUIVO))
+            f.write(empacotar_registros(list(registros.items())))
+            if self.__sincronizar:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.__datasource)
+
+    # devolve True se algum arquivo ainda estava no formato antigo (pickle)
+    def __load(self) -> bool:
+        if not os.path.exists(self.__datasource) or os.path.getsize(self.__datasource) == 0:
+            if not os.path.exists(self.__journal):
+                raise FileNotFoundError
+            conteudo = b""
+        else:
+            with open(self.__datasource, 'rb') as f:
+                conteudo = f.read()
+        legado = False
+        if conteudo.startswith(self.MAGICO_SNAPSHOT):
+            _, versao = self._CABECALHO.unpack_from(conteudo)
+            if versao != self.VERSAO_ARQUIVO:
+                raise ValueError(f"Versão de arquivo desconhecida: {versao}.")
+            self.__registros = dict(desempacotar_registros(conteudo, self._CABECALHO.size))
+        else:
+            legado = bool(conteudo)
+            dados = pickle.loads(conteudo) if conteudo else {}
+            self.__registros = {key: normalizar_legado(obj) for key, obj in self.__converter(dados).items()}
+        # uma compactação interrompida deixa o journal antigo para trás: ele vem antes do atual
+        legado |= self.__replay_journal(self.__journal_compactando)
+        legado |= self.__replay_journal(self.__journal)
+        return legado
+
+    def __aplicar(self, op, key, dados):
+        if op == 'remove':
+            self.__registros.pop(key, None)
+        else:
+            self.__registros[key] = normalizar_legado(dados)
+
+    def __replay_journal(self, caminho) -> bool:
+        if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+            return False
+        with open(caminho, 'rb') as f:
+            cabecalho = f.read(self._CABECALHO.size)
+            if not cabecalho.startswith(self.MAGICO_JOURNAL):
+                f.seek(0)
+                self.__replay_journal_pickle(f)
+                return True
+            valido = f.tell()
+            while True:
+                lote = f.read(self._LOTE.size)
+                if len(lote) < self._LOTE.size:
+                    break
+                tamanho, crc = self._LOTE.unpack(lote)
+                conteudo = f.read(tamanho)
+                if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+                    # lote truncado por uma queda no meio da escrita: descarta a cauda inteira
+                    break
+                for op, key, dados in desempacotar_lote(conteudo):
+                    self.__aplicar(op, key, dados)
+                valido = f.tell()
+        if valido < os.path.getsize(caminho):
+            with open(caminho, 'r+b') as f:
+                f.truncate(valido)
+        return False
+
+    # journal gravado antes do formato binário: é descartado logo depois da atualização
+    def __replay_journal_pickle(self, f):
+        while True:
+            try:
+                lote = pickle.load(f)
+            except EOFError:
+                break
+            except (pickle.UnpicklingError, ValueError, AttributeError):
+                break
+            # um registro solto por entrada ou, depois das unidades de trabalho, um lote por transação
+            for op, key, obj in (lote if isinstance(lote, list) else [lote]):
+                self.__aplicar(op, key, obj)
+
+    def __descartar_journals(self):
+        for caminho in (self.__journal_compactando, self.__journal):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    # o lote vira um único registro no fim do journal: um lote truncado é descartado por inteiro
+    def gravar_lote(self, registros):
+        conteudo = empacotar_lote([(op, key, dados) for op, key, dados, _ in registros])
+        with self.__lock:
+            with open(self.__journal, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(self._CABECALHO.pack(self.MAGICO_JOURNAL, self.VERSAO_ARQUIVO))
+                f.write(self._LOTE.pack(len(conteudo), zlib.crc32(conteudo)) + conteudo)
+                if self.__sincronizar:
+                    f.flush()
+                    os.fsync(f.fileno())
+                tamanho = f.tell()
+            for op, key, dados, _ in registros:
+                if op == 'remove':
+                    self.__registros.pop(key, None)
+                else:
+                    self.__registros[key] = dados
+        if tamanho >= self.LIMITE_JOURNAL:
+            self.__compactar()
+
+    def __compactar(self):
+        with self.__lock:
+            if self.__compactacao is not None and self.__compactacao.is_alive():
+                return
+            if os.path.exists(self.__journal_compactando):
+                return
+            os.replace(self.__journal, self.__journal_compactando)
+            copia = dict(self.__registros)
+        self.__compactacao = threading.Thread(target=self.__gravar_compactacao, args=(copia,),
+                                              name=f"compactacao-{self.__datasource}")
+        self.__compactacao.start()
+
+    def __gravar_compactacao(self, copia):
+        try:
+            self.__dump(copia)
+        except OSError as e:
+            # devolve o journal antigo para a frente do atual; a próxima compactação tenta de novo
+            print(f"[AVISO DAO] Falha ao compactar '{self.__datasource}': {e}")
+            with self.__lock:
+                with open(self.__journal_compactando, 'ab') as antigo:
+                    if os.path.exists(self.__journal):
+                        with open(self.__journal, 'rb') as atual:
+                            # só os lotes: o cabeçalho do atual no meio do antigo seria lido como
+                            # um lote corrompido e a carga descartaria tudo dali em diante
+                            if atual.read(self._CABECALHO.size) != self._CABECALHO.pack(
+                                    self.MAGICO_JOURNAL, self.VERSAO_ARQUIVO):
+                                atual.seek(0)
+                            antigo.write(atual.read())
+                    if self.__sincronizar:
+                        antigo.flush()
+                        os.fsync(antigo.fileno())
+                os.replace(self.__journal_compactando, self.__journal)
+            return
+        with self.__lock:
+            os.remove(self.__journal_compactando)
+
+    # espera a compactação em andamento (se houver) terminar
+    def fechar(self):
+        if self.__compactacao is not None:
+            self.__compactacao.join()
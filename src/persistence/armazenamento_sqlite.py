@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .armazenamento import Armazenamento, ArmazenamentoJournal, Filtro
+
+_OPERADORES = {'=': '=', '>=': '>=', '<=': '<='}
+
+# uma conexão por arquivo de banco, compartilhada por todos os DAOs; o lock da conexão
+# impede que duas threads (GUI e gravador) abram transações ao mesmo tempo nela
+_conexoes: Dict[str, Tuple[sqlite3.Connection, threading.RLock]] = {}
+_lock_conexoes = threading.Lock()
+
+
+def _conectar(caminho: str, sincronizar: bool) -> Tuple[sqlite3.Connection, threading.RLock]:
+    with _lock_conexoes:
+        if caminho not in _conexoes:
+            conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            # FULL faz fsync do WAL em cada commit; NORMAL deixa isso para o checkpoint
+            conexao.execute(f"PRAGMA synchronous={'FULL' if sincronizar else 'NORMAL'}")
+            _conexoes[caminho] = (conexao, threading.RLock())
+        return _conexoes[caminho]
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    """Uma tabela por DAO: a entidade vai serializada em 'dados' e os campos
+    usados nas buscas dos controllers viram colunas indexadas."""
+
+    def __init__(self, caminho: str, datasource: str, converter: Callable[[Any], Dict],
+                 colunas: Dict[str, Callable[[Any], Any]], sincronizar: bool = False):
+        self.__datasource = datasource
+        self.__converter = converter
+        self.__tabela = os.path.splitext(os.path.basename(datasource))[0]
+        self.__colunas = dict(colunas)
+        self.__conexao, self.__lock = _conectar(caminho, sincronizar)
+        self.__ultima_ordem = 0
+        self.__pendentes: List[Any] = []
+
+    def __criar_tabela(self) -> bool:
+        existia = self.__conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.__tabela,)
+        ).fetchone() is not None
+        extras = "".join(f", {c}" for c in self.__colunas)
+        self.__conexao.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.__tabela} ("
+            f"chave INTEGER PRIMARY KEY, ordem INTEGER NOT NULL, dados BLOB NOT NULL{extras})"
+        )
+        if self.__colunas:
+            # índice composto na ordem em que o DAO declarou as colunas (ex.: aberta, id_mesa)
+            self.__conexao.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.__tabela} ON {self.__tabela} ({', '.join(self.__colunas)})"
+            )
+        return existia
+
+    def carregar(self) -> Dict[Any, bytes]:
+        with self.__lock:
+            existia = self.__criar_tabela()
+            (self.__ultima_ordem,) = self.__conexao.execute(
+                f"SELECT COALESCE(MAX(ordem), 0) FROM {self.__tabela}"
+            ).fetchone()
+            if not existia:
+                self.__importar_pickle()
+            return {
+                chave: dados for chave, dados in self.__conexao.execute(
+                    f"SELECT chave, dados FROM {self.__tabela} ORDER BY ordem"
+                )
+            }
+
+    # na primeira execução com SQLite, traz os dados que já estavam nos arquivos .pkl;
+    # as colunas indexadas ficam vazias até o DAO regravar esses registros
+    def __importar_pickle(self) -> None:
+        legado = ArmazenamentoJournal(self.__datasource, self.__converter)
+        if not legado.existe():
+            return
+        registros = [('update', key, dados, {}) for key, dados in legado.carregar().items()]
+        self.__executar_lote(registros)
+        self.__pendentes = [key for _, key, _, _ in registros]
+
+    def pendentes_de_indice(self) -> List[Any]:
+        pendentes, self.__pendentes = self.__pendentes, []
+        return pendentes
+
+    def __upsert(self, key: Any, dados: bytes, valores: Dict[str, Any]) -> None:
+        nomes = ["chave", "ordem", "dados"] + list(self.__colunas)
+        marcadores = ", ".join("?" for _ in nomes)
+        atualizacoes = ", ".join(f"{c} = excluded.{c}" for c in nomes if c not in ("chave", "ordem"))
+        self.__conexao.execute(
+            f"INSERT INTO {self.__tabela} ({', '.join(nomes)}) VALUES ({marcadores}) "
+            f"ON CONFLICT(chave) DO UPDATE SET {atualizacoes}",
+            [key, self.__proxima_ordem(), dados] + [valores.get(c) for c in self.__colunas],
+        )
+
+    def __proxima_ordem(self) -> int:
+        self.__ultima_ordem += 1
+        return self.__ultima_ordem
+
+    def __executar_lote(self, registros) -> None:
+        self.__conexao.execute("BEGIN")
+        try:
+            for op, key, dados, valores in registros:
+                if op == 'remove':
+                    self.__conexao.execute(f"DELETE FROM {self.__tabela} WHERE chave = ?", (key,))
+                else:
+                    self.__upsert(key, dados, valores)
+            self.__conexao.execute("COMMIT")
+        except Exception:
+            self.__conexao.execute("ROLLBACK")
+            raise
+
+    # o lote inteiro vai numa transação só
+    def gravar_lote(self, registros) -> None:
+        with self.__lock:
+            self.__executar_lote(registros)
+
+    def buscar(self, filtros: Sequence[Filtro], ordem: Sequence[str],
+               limite: Optional[int]) -> Optional[List[Any]]:
+        sql = f"SELECT chave FROM {self.__tabela}"
+        parametros: List[Any] = []
+        if filtros:
+            condicoes = []
+            for coluna, operador, valor in filtros:
+                if coluna not in self.__colunas:
+                    raise ValueError(f"Coluna '{coluna}' não é indexada em '{self.__tabela}'.")
+                condicoes.append(f"{coluna} {_OPERADORES[operador]} ?")
+                parametros.append(valor)
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY " + ", ".join(list(ordem) + ["ordem"])
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        with self.__lock:
+            return [chave for (chave,) in self.__conexao.execute(sql, parametros)]
@@ -0,0 +1,131 @@
+import lzma
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .codec_binario import empacotar_registros, desempacotar_registros
+from .dia_de_servico import dia_de_servico
+from .mapa_identidade import MapaIdentidade, mapa_identidade
+from .serializacao import desserializar
+
+PASTA_ARQUIVO = "arquivo_morto"
+
+# cada quadro do segmento: codec (1 byte) + tamanho (4 bytes) + registros (chave, bytes) comprimidos
+_CABECALHO = struct.Struct("<cI")
+_CODECS = {
+    b"z": (lambda dados: zlib.compress(dados, 6), zlib.decompress),
+    b"x": (lzma.compress, lzma.decompress),
+}
+_NOMES_CODECS = {"zlib": b"z", "lzma": b"x"}
+
+
+class ArquivoMorto:
+    """Segmentos append-only e comprimidos com os registros que saíram do DAO.
+
+    Os segmentos ficam numa pasta por dia de serviço (arquivo_morto/2026-10-18/) e só
+    o dia aberto recebe quadros; os dias já fechados são só leitura. Cada arquivamento
+    acrescenta um quadro ao segmento atual do dia; quando ele passa de LIMITE_SEGMENTO,
+    o próximo quadro abre um segmento novo. Nada é regravado."""
+
+    LIMITE_SEGMENTO = 4 * 1024 * 1024
+
+    def __init__(self, nome: str, pasta: str = PASTA_ARQUIVO, compressao: str = "zlib"):
+        if compressao not in _NOMES_CODECS:
+            raise ValueError(f"Compressão desconhecida: '{compressao}'.")
+        self.__nome = nome
+        self.__pasta = pasta
+        self.__codec = _NOMES_CODECS[compressao]
+
+    # dia None: segmentos gravados antes da separação por dia, direto na pasta do arquivo
+    def __segmentos(self, dia: Optional[str]) -> List[str]:
+        pasta = self.__pasta if dia is None else os.path.join(self.__pasta, dia)
+        if not os.path.isdir(pasta):
+            return []
+        prefixo = self.__nome + "-"
+        return sorted(
+            os.path.join(pasta, f) for f in os.listdir(pasta)
+            if f.startswith(prefixo) and f.endswith(".seg")
+        )
+
+    # dias de serviço que têm registros deste arquivo, do mais antigo para o mais novo
+    def dias(self) -> List[str]:
+        if not os.path.isdir(self.__pasta):
+            return []
+        return sorted(
+            d for d in os.listdir(self.__pasta)
+            if os.path.isdir(os.path.join(self.__pasta, d)) and self.__segmentos(d)
+        )
+
+    def anexar(self, registros: List[Tuple[Any, bytes]]) -> None:
+        if not registros:
+            return
+        dia = dia_de_servico.atual()
+        pasta = os.path.join(self.__pasta, dia)
+        os.makedirs(pasta, exist_ok=True)
+        segmentos = self.__segmentos(dia)
+        if segmentos and os.path.getsize(segmentos[-1]) < self.LIMITE_SEGMENTO:
+            caminho = segmentos[-1]
+        else:
+            caminho = os.path.join(pasta, f"{self.__nome}-{len(segmentos) + 1:06d}.seg")
+        comprimir, _ = _CODECS[self.__codec]
+        dados = comprimir(empacotar_registros(registros))
+        with open(caminho, "ab") as f:
+            f.write(_CABECALHO.pack(self.__codec, len(dados)) + dados)
+            f.flush()
+            # o registro só sai do DAO depois de estar garantido aqui
+            os.fsync(f.fileno())
+
+    # registros dos segmentos em ordem (sem dias: o arquivo inteiro; com dias: só as pastas
+    # desses dias); numa repetição da mesma chave vale o último
+    def ler(self, dias: Optional[Sequence[str]] = None) -> Iterator[Tuple[Any, bytes]]:
+        if dias is None:
+            segmentos = self.__segmentos(None) + [c for d in self.dias() for c in self.__segmentos(d)]
+        else:
+            segmentos = [c for d in sorted(dias) for c in self.__segmentos(d)]
+        for caminho in segmentos:
+            with open(caminho, "rb") as f:
+                while True:
+                    cabecalho = f.read(_CABECALHO.size)
+                    if len(cabecalho) < _CABECALHO.size:
+                        break
+                    codec, tamanho = _CABECALHO.unpack(cabecalho)
+                    dados = f.read(tamanho)
+                    if len(dados) < tamanho or codec not in _CODECS:
+                        # quadro truncado por uma queda no meio do arquivamento
+                        break
+                    _, descomprimir = _CODECS[codec]
+                    conteudo = descomprimir(dados)
+                    if conteudo[:1] == b"\x80":
+                        # quadro gravado antes do formato binário: lista [(chave, bytes)] em pickle
+                        yield from pickle.loads(conteudo)
+                    else:
+                        yield from desempacotar_registros(conteudo)
+
+
+def carregar_arquivados(*arquivos: ArquivoMorto, dias: Optional[Sequence[str]] = None) -> List[Dict[Any, Any]]:
+    """Lê os arquivos mortos juntos (todos os dias ou só os pedidos), sem tocar no mapa de identidade global.
+
+    Os objetos devolvidos são cópias só para leitura (relatórios): referências entre
+    registros arquivados apontam umas para as outras e as referências a entidades
+    que continuam em uso apontam para as instâncias em memória."""
+    local = MapaIdentidade()
+
+    # referências vão primeiro para o que veio do próprio arquivo, depois para o que está em memória
+    def resolver(tipo, ident, cls):
+        obj = local.obter((tipo, ident))
+        if obj is None:
+            obj = mapa_identidade.obter((tipo, ident))
+        if obj is None:
+            obj = local.resolver(tipo, ident, cls)
+        return obj
+
+    resultado: List[Dict[Any, Any]] = []
+    for arquivo in arquivos:
+        registros = dict(arquivo.ler(dias))
+        resultado.append({
+            key: local.incorporar(desserializar(dados, resolver))
+            for key, dados in registros.items()
+        })
+    return resultado
@@ -0,0 +1,68 @@
+import threading
+from typing import Callable, Generic, List, Optional, TypeVar
+
+from .mapa_identidade import mapa_identidade
+
+T = TypeVar("T")
+
+# threads de pré-carga ainda vivas; quem encerra a aplicação espera por elas antes de fechar o armazenamento
+_em_andamento: List[threading.Thread] = []
+
+
+class CargaPreguicosa(Generic[T]):
+    """Algo caro de montar (um DAO com todo o histórico) que só é montado quando alguém pede.
+
+    obter() monta na primeira chamada e devolve sempre o mesmo valor; quem chama
+    enquanto outra thread monta espera por ela. iniciar() adianta a montagem numa
+    thread de fundo, para a janela abrir antes de o histórico terminar de carregar.
+
+    Com tipos, a carga fica registrada no mapa de identidade: uma reserva desses tipos
+    (referência vinda de outro DAO) lida antes da hora dispara a carga em vez de falhar."""
+
+    def __init__(self, fabrica: Callable[[], T], tipos: tuple = ()):
+        self._fabrica = fabrica
+        self._valor: Optional[T] = None
+        self._pronta = False
+        self._lock = threading.RLock()
+        # thread que está montando; uma leitura de reserva feita pela própria montagem não entra de novo
+        self._montando: Optional[int] = None
+        for tipo in tipos:
+            mapa_identidade.registrar_carga(tipo, self.obter)
+
+    @property
+    def pronta(self) -> bool:
+        return self._pronta
+
+    def obter(self) -> Optional[T]:
+        if self._pronta:
+            return self._valor
+        if self._montando == threading.get_ident():
+            return None
+        with self._lock:
+            if not self._pronta:
+                self._montando = threading.get_ident()
+                try:
+                    self._valor = self._fabrica()
+                    self._pronta = True
+                finally:
+                    self._montando = None
+        return self._valor
+
+    def iniciar(self) -> None:
+        if self._pronta:
+            return
+        thread = threading.Thread(target=self._carregar_em_fundo, daemon=True)
+        _em_andamento.append(thread)
+        thread.start()
+
+    def _carregar_em_fundo(self) -> None:
+        try:
+            self.obter()
+        except Exception:
+            # a falha aparece de novo para quem chamar obter(), na thread de quem usa
+            pass
+
+
+def aguardar_cargas() -> None:
+    while _em_andamento:
+        _em_andamento.pop().join()
@@ -0,0 +1,365 @@
+import struct
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models.mesa import Mesa
+from models.conta import Conta
+from models.pedido import Pedido
+from models.item_pedido import ItemPedido
+from models.prato import Prato
+from models.grupo_cliente import GrupoCliente
+from models.garcom import Garcom
+from models.cozinheiro import Cozinheiro
+from models.status_enums import StatusMesa, StatusPedido, StatusGrupoCliente
+
+from .mapa_identidade import mapa_identidade
+
+# Registro binário: versão do formato (1 byte) + tipo (1 byte) + campos fixos em struct.
+# Status vão como índice do enum, valores em dinheiro como centavos inteiros e as
+# referências a outras entidades só pelo ID (0 = nenhuma). Pickle começa com 0x80, então
+# o primeiro byte separa os dois formatos.
+# Versão 2: quantidade do item em 64 bits (na 1 era 16). Registros da 1 continuam legíveis.
+VERSAO = 2
+_VERSOES_LIDAS = (1, 2)
+
+Resolver = Callable[[str, int, type], Any]
+
+_CABECALHO = struct.Struct("<BB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_MESA = struct.Struct("<IHBIII")
+_CONTA = struct.Struct("<IIIBI")
+_PEDIDO = struct.Struct("<IIIIdBH")
+_ITEM = struct.Struct("<IIq")
+_ITEM_V1 = struct.Struct("<IIH")
+_GRUPO = struct.Struct("<IHB")
+_FUNCIONARIO = struct.Struct("<Iq")
+_PRATO = struct.Struct("<II")
+_INTEIRO = struct.Struct("<q")
+_U32 = struct.Struct("<I")
+
+_STATUS_MESA = list(StatusMesa)
+_STATUS_PEDIDO = list(StatusPedido)
+_STATUS_GRUPO = list(StatusGrupoCliente)
+
+(TIPO_MESA, TIPO_CONTA, TIPO_PEDIDO, TIPO_GRUPO,
+ TIPO_GARCOM, TIPO_COZINHEIRO, TIPO_PRATO, TIPO_INTEIRO) = range(1, 9)
+
+
+def eh_binario(dados: bytes) -> bool:
+    return bool(dados) and dados[0] in _VERSOES_LIDAS
+
+
+def _centavos(valor: float) -> int:
+    return round(valor * 100)
+
+
+# ID da entidade referenciada; passa pelo mapa porque ela pode ser uma reserva ainda vazia
+def _ref(obj: Any) -> int:
+    return mapa_identidade.chave_de(obj)[1] if obj is not None else 0
+
+
+def _refs(objs: List[Any]) -> bytes:
+    return _ids([_ref(o) for o in objs])
+
+
+# coleções de referências por id (dicionário id -> objeto); registros antigos ainda trazem listas
+def _itens_da_colecao(colecao: Any) -> List[Any]:
+    return list(colecao.values()) if isinstance(colecao, dict) else colecao
+
+
+def _texto(valor: str) -> bytes:
+    dados = valor.encode("utf-8")
+    return _U16.pack(len(dados)) + dados
+
+
+def _ids(ids: List[int]) -> bytes:
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+
+class _Leitor:
+    def __init__(self, dados: bytes):
+        self._dados = memoryview(dados)
+        self._pos = _CABECALHO.size
+        self.versao = dados[0]
+
+    def ler(self, formato: struct.Struct) -> Tuple:
+        valores = formato.unpack_from(self._dados, self._pos)
+        self._pos += formato.size
+        return valores
+
+    def texto(self) -> str:
+        (tamanho,) = self.ler(_U16)
+        valor = str(self._dados[self._pos:self._pos + tamanho], "utf-8")
+        self._pos += tamanho
+        return valor
+
+    def tem_mais(self) -> bool:
+        return self._pos < len(self._dados)
+
+    def ids(self, quantidade: int) -> Tuple[int, ...]:
+        valores = struct.unpack_from(f"<{quantidade}I", self._dados, self._pos)
+        self._pos += 4 * quantidade
+        return valores
+
+
+# --- codificação -------------------------------------------------------------
+
+def _codificar_mesa(m: Mesa) -> bytes:
+    return _MESA.pack(
+        m._id_mesa, m._capacidade, _STATUS_MESA.index(m._status),
+        _ref(m._grupo_cliente), _ref(m._conta), _ref(m._garcom_responsavel),
+    )
+
+
+def _codificar_conta(c: Conta) -> bytes:
+    return _CONTA.pack(
+        c._id_conta, _ref(c._grupo_cliente), _ref(c._mesa), c._aberta, len(c._pedidos)
+    ) + _refs(c._pedidos)
+
+
+def _codificar_pedido(p: Pedido) -> bytes:
+    # o construtor de Pedido nunca guarda o grupo; registros antigos podem não ter o atributo
+    grupo = getattr(p, "_grupo_cliente", None)
+    partes = [_PEDIDO.pack(
+        p._id_pedido, _ref(p._mesa), _ref(p._garcom), _ref(grupo),
+        p._data_hora.timestamp(), _STATUS_PEDIDO.index(p._status), len(p._itens),
+    )]
+    for item in p._itens:
+        # o item guarda só o necessário do prato para o histórico (id, preço e nome); o preço
+        # é o fixado no item quando ele foi criado, não o atual do cardápio
+        prato = item._prato
+        partes.append(_ITEM.pack(prato.id_prato, item._subtotal_centavos // item._quantidade, item._quantidade))
+        partes.append(_texto(prato.nome))
+        partes.append(_texto(item._observacao))
+    # campo novo vai no fim: registros gravados antes dele terminam nos itens
+    partes.append(_U32.pack(p._id_cozinheiro or 0))
+    return b"".join(partes)
+
+
+def _codificar_grupo(g: GrupoCliente) -> bytes:
+    return _GRUPO.pack(g._id_grupo, g._numero_pessoas, _STATUS_GRUPO.index(g._status))
+
+
+def _codificar_garcom(g: Garcom) -> bytes:
+    return (_FUNCIONARIO.pack(g.id_funcionario, _centavos(g.salario_base)) + _texto(g.nome)
+            + _INTEIRO.pack(_centavos(g._gorjetas)) + _U8.pack(len(g._mesas_atendidas))
+            + _refs(_itens_da_colecao(g._mesas_atendidas)))
+
+
+def _codificar_cozinheiro(c: Cozinheiro) -> bytes:
+    return (_FUNCIONARIO.pack(c.id_funcionario, _centavos(c.salario_base)) + _texto(c.nome)
+            + _U16.pack(len(c._pedidos_em_preparo)) + _refs(_itens_da_colecao(c._pedidos_em_preparo)))
+
+
+def _codificar_prato(p: Prato) -> bytes:
+    return _PRATO.pack(p.id_prato, _centavos(p.preco)) + _texto(p.nome) + _texto(p.descricao)
+
+
+# tipo exato -> (código do tipo, função); subclasses desconhecidas continuam em pickle
+_CODIFICADORES: Dict[type, Tuple[int, Callable[[Any], bytes]]] = {
+    Mesa: (TIPO_MESA, _codificar_mesa),
+    Conta: (TIPO_CONTA, _codificar_conta),
+    Pedido: (TIPO_PEDIDO, _codificar_pedido),
+    GrupoCliente: (TIPO_GRUPO, _codificar_grupo),
+    Garcom: (TIPO_GARCOM, _codificar_garcom),
+    Cozinheiro: (TIPO_COZINHEIRO, _codificar_cozinheiro),
+    Prato: (TIPO_PRATO, _codificar_prato),
+    int: (TIPO_INTEIRO, _INTEIRO.pack),
+}
+
+
+def codificar(obj: Any) -> Optional[bytes]:
+    """Devolve o registro binário do objeto, ou None se o tipo não tem codificação."""
+    encontrado = _CODIFICADORES.get(type(obj))
+    if encontrado is None:
+        return None
+    tipo, funcao = encontrado
+    return _CABECALHO.pack(VERSAO, tipo) + funcao(obj)
+
+
+# --- decodificação -----------------------------------------------------------
+
+def _novo(cls: type) -> Any:
+    return cls.__new__(cls)
+
+
+def _decodificar_mesa(r: _Leitor, resolver: Resolver) -> Mesa:
+    id_mesa, capacidade, status, id_grupo, id_conta, id_garcom = r.ler(_MESA)
+    m = _novo(Mesa)
+    m._id_mesa = id_mesa
+    m._capacidade = capacidade
+    m._status = _STATUS_MESA[status]
+    m._grupo_cliente = resolver("GrupoCliente", id_grupo, GrupoCliente) if id_grupo else None
+    m._conta = resolver("Conta", id_conta, Conta) if id_conta else None
+    m._garcom_responsavel = resolver("Funcionario", id_garcom, Garcom) if id_garcom else None
+    return m
+
+
+def _decodificar_conta(r: _Leitor, resolver: Resolver) -> Conta:
+    id_conta, id_grupo, id_mesa, aberta, quantidade = r.ler(_CONTA)
+    c = _novo(Conta)
+    c._id_conta = id_conta
+    c._grupo_cliente = resolver("GrupoCliente", id_grupo, GrupoCliente)
+    c._mesa = resolver("Mesa", id_mesa, Mesa)
+    c._pedidos = tuple(resolver("Pedido", i, Pedido) for i in r.ids(quantidade))
+    c._aberta = bool(aberta)
+    return c
+
+
+# pratos dos itens são cópias só de leitura: itens iguais compartilham a mesma instância
+_pratos_dos_itens: Dict[Tuple[int, int, str], Prato] = {}
+
+
+def _prato_do_item(id_prato: int, centavos: int, nome: str) -> Prato:
+    chave = (id_prato, centavos, nome)
+    prato = _pratos_dos_itens.get(chave)
+    if prato is None:
+        prato = _novo(Prato)
+        prato._id_prato = id_prato
+        prato._nome = nome
+        prato._preco = centavos / 100
+        prato._descricao = ""
+        _pratos_dos_itens[chave] = prato
+    return prato
+
+
+def _decodificar_pedido(r: _Leitor, resolver: Resolver) -> Pedido:
+    id_pedido, id_mesa, id_garcom, id_grupo, data_hora, status, quantidade = r.ler(_PEDIDO)
+    p = _novo(Pedido)
+    p._id_pedido = id_pedido
+    p._mesa = resolver("Mesa", id_mesa, Mesa)
+    p._garcom = resolver("Funcionario", id_garcom, Garcom) if id_garcom else None
+    if id_grupo:
+        p._grupo_cliente = resolver("GrupoCliente", id_grupo, GrupoCliente)
+    p._data_hora = datetime.fromtimestamp(data_hora)
+    p._status = _STATUS_PEDIDO[status]
+    itens = []
+    formato_item = _ITEM if r.versao >= 2 else _ITEM_V1
+    for _ in range(quantidade):
+        id_prato, centavos, qtd = r.ler(formato_item)
+        item = _novo(ItemPedido)
+        item._prato = _prato_do_item(id_prato, centavos, r.texto())
+        item._quantidade = qtd
+        item._observacao = r.texto()
+        item._subtotal_centavos = centavos * qtd
+        itens.append(item)
+    p._itens = tuple(itens)
+    if r.tem_mais():
+        (id_cozinheiro,) = r.ler(_U32)
+        # atribuído mesmo vazio: num rollback o valor restaurado tem que sobrescrever o atual
+        p._id_cozinheiro = id_cozinheiro or None
+    return p
+
+
+def _decodificar_grupo(r: _Leitor, resolver: Resolver) -> GrupoCliente:
+    id_grupo, numero_pessoas, status = r.ler(_GRUPO)
+    g = _novo(GrupoCliente)
+    g._id_grupo = id_grupo
+    g._numero_pessoas = numero_pessoas
+    g._status = _STATUS_GRUPO[status]
+    return g
+
+
+def _preencher_funcionario(f: Any, r: _Leitor) -> None:
+    id_funcionario, salario = r.ler(_FUNCIONARIO)
+    f._Funcionario__id_funcionario = id_funcionario
+    f._Funcionario__salario_base = salario / 100
+    f._Funcionario__nome = r.texto()
+
+
+def _decodificar_garcom(r: _Leitor, resolver: Resolver) -> Garcom:
+    g = _novo(Garcom)
+    _preencher_funcionario(g, r)
+    (gorjetas,) = r.ler(_INTEIRO)
+    (quantidade,) = r.ler(_U8)
+    g._gorjetas = gorjetas / 100
+    g._mesas_atendidas = {i: resolver("Mesa", i, Mesa) for i in r.ids(quantidade)}
+    return g
+
+
+def _decodificar_cozinheiro(r: _Leitor, resolver: Resolver) -> Cozinheiro:
+    c = _novo(Cozinheiro)
+    _preencher_funcionario(c, r)
+    (quantidade,) = r.ler(_U16)
+    c._pedidos_em_preparo = {i: resolver("Pedido", i, Pedido) for i in r.ids(quantidade)}
+    return c
+
+
+def _decodificar_prato(r: _Leitor, resolver: Resolver) -> Prato:
+    id_prato, centavos = r.ler(_PRATO)
+    p = _novo(Prato)
+    p._id_prato = id_prato
+    p._preco = centavos / 100
+    p._nome = r.texto()
+    p._descricao = r.texto()
+    return p
+
+
+def _decodificar_inteiro(r: _Leitor, resolver: Resolver) -> int:
+    (valor,) = r.ler(_INTEIRO)
+    return valor
+
+
+_DECODIFICADORES: Dict[int, Callable[[_Leitor, Resolver], Any]] = {
+    TIPO_MESA: _decodificar_mesa,
+    TIPO_CONTA: _decodificar_conta,
+    TIPO_PEDIDO: _decodificar_pedido,
+    TIPO_GRUPO: _decodificar_grupo,
+    TIPO_GARCOM: _decodificar_garcom,
+    TIPO_COZINHEIRO: _decodificar_cozinheiro,
+    TIPO_PRATO: _decodificar_prato,
+    TIPO_INTEIRO: _decodificar_inteiro,
+}
+
+
+def decodificar(dados: bytes, resolver: Resolver) -> Any:
+    versao, tipo = _CABECALHO.unpack_from(dados)
+    if versao not in _VERSOES_LIDAS:
+        raise ValueError(f"Versão de registro desconhecida: {versao}.")
+    return _DECODIFICADORES[tipo](_Leitor(dados), resolver)
+
+
+# --- arquivos ----------------------------------------------------------------
+
+# sequência de registros (chave, dados) usada no snapshot e no arquivo morto
+_ENTRADA = struct.Struct("<II")
+# entrada do journal: operação (0 = update, 1 = remove), chave e tamanho dos dados
+_ENTRADA_JOURNAL = struct.Struct("<BII")
+_OPERACOES = ("update", "remove")
+
+
+def empacotar_registros(registros: List[Tuple[int, bytes]]) -> bytes:
+    return b"".join(_ENTRADA.pack(key, len(dados)) + dados for key, dados in registros)
+
+
+def desempacotar_registros(dados: bytes, inicio: int = 0) -> List[Tuple[int, bytes]]:
+    visao = memoryview(dados)
+    registros = []
+    pos = inicio
+    while pos < len(dados):
+        key, tamanho = _ENTRADA.unpack_from(visao, pos)
+        pos += _ENTRADA.size
+        registros.append((key, bytes(visao[pos:pos + tamanho])))
+        pos += tamanho
+    return registros
+
+
+def empacotar_lote(operacoes: List[Tuple[str, int, Optional[bytes]]]) -> bytes:
+    partes = []
+    for op, key, dados in operacoes:
+        dados = dados or b""
+        partes.append(_ENTRADA_JOURNAL.pack(_OPERACOES.index(op), key, len(dados)) + dados)
+    return b"".join(partes)
+
+
+def desempacotar_lote(dados: bytes) -> List[Tuple[str, int, Optional[bytes]]]:
+    visao = memoryview(dados)
+    operacoes = []
+    pos = 0
+    while pos < len(dados):
+        op, key, tamanho = _ENTRADA_JOURNAL.unpack_from(visao, pos)
+        pos += _ENTRADA_JOURNAL.size
+        operacoes.append((_OPERACOES[op], key, bytes(visao[pos:pos + tamanho]) if op == 0 else None))
+        pos += tamanho
+    return operacoes
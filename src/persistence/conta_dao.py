@@ -1,69 +1,48 @@
-import os
-import pickle
-from typing import Dict, List, Tuple, Union
+from typing import List, Union
 
 from .abstract_dao import DAO
+from .gerador_ids import gerador_ids
 from models.conta import Conta
 
-ContaData = Tuple[Dict[int, Conta], int]
-
 
 class ContaDAO(DAO):
     def __init__(self):
-        self.__datasource = "contas.pkl"
-        self._contas: Dict[int, Conta] = {}
-        self._proximo_id: int = 1
-
-        try:
-            self.__load_all()
-        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
-            self._contas.clear()
-            self._proximo_id = 1
-            self.__dump_all()
-
-    def __dump_all(self) -> None:
-        data: ContaData = (self._contas, self._proximo_id)
-        with open(self.__datasource, "wb") as f:
-            pickle.dump(data, f)
-
-    def __load_all(self) -> None:
-        if not os.path.exists(self.__datasource) or os.path.getsize(self.__datasource) == 0:
-            raise FileNotFoundError
+        super().__init__("contas.pkl")
+        self._reservar_ids("Conta")
 
-        with open(self.__datasource, "rb") as f:
-            data = pickle.load(f)
-
-        if isinstance(data, tuple) and len(data) == 2:
-            contas, prox_id = data
-            self._contas = dict(contas)
-            self._proximo_id = int(prox_id)
-        elif isinstance(data, dict):
-            self._contas = dict(data)
-            self._proximo_id = max(self._contas.keys(), default=0) + 1
-        else:
-            raise ValueError("Formato de arquivo de contas inválido.")
+    def _colunas_indexadas(self):
+        return {
+            "aberta": lambda c: c.esta_aberta,
+            "id_mesa": lambda c: c.mesa.id_mesa,
+        }
 
+    def _converter_dados(self, dados):
+        # formato antigo: (dicionário de contas, próximo id)
+        if isinstance(dados, tuple) and len(dados) == 2:
+            dados = dados[0]
+        return super()._converter_dados(dados)
 
     def add(self, key: int, obj: Conta) -> None:
-        self._contas[key] = obj
-        self._proximo_id = max(self._proximo_id, key + 1)
-        self.__dump_all()
+        super().add(key, obj)
+        gerador_ids.garantir_acima("Conta", key)
 
     def update(self, key: int, obj: Conta) -> None:
-        if key in self._contas:
-            self._contas[key] = obj
-            self.__dump_all()
+        super().update(key, obj)
 
     def get(self, key: int) -> Union[Conta, None]:
-        return self._contas.get(key)
+        return super().get(key)
 
     def remove(self, key: int) -> None:
-        if key in self._contas:
-            self._contas.pop(key)
-            self.__dump_all()
+        super().remove(key)
 
     def get_all(self) -> List[Conta]:
-        return list(self._contas.values())
+        return list(super().get_all())
+
+    def listar_fechadas(self) -> List[Conta]:
+        return self._buscar([("aberta", "=", False)])
+
+    def listar_abertas(self) -> List[Conta]:
+        return self._buscar([("aberta", "=", True)])
 
     def get_proximo_id(self) -> int:
-        return self._proximo_id
+        return gerador_ids.proximo("Conta")
@@ -0,0 +1,55 @@
+import os
+import threading
+from datetime import date
+
+
+class DiaDeServico:
+    """Dia de serviço aberto, usado para separar o arquivo morto em uma pasta por dia.
+
+    O dia só muda no fechamento explícito (fechar_dia), não à meia-noite: um turno
+    que passa da meia-noite continua no mesmo dia. Se o dia for fechado e reaberto na
+    mesma data, o novo ganha um sufixo (2026-10-18-2), para não escrever num dia já fechado."""
+
+    def __init__(self, caminho: str = "dia_de_servico.txt"):
+        self.__caminho = caminho
+        self.__lock = threading.Lock()
+        self.__atual = None
+
+    # lido na primeira chamada, para valer o diretório de trabalho do momento (como os .pkl)
+    def __carregar(self) -> str:
+        if self.__atual is None:
+            if os.path.exists(self.__caminho):
+                with open(self.__caminho, "r", encoding="utf-8") as f:
+                    self.__atual = f.read().strip()
+            if not self.__atual:
+                self.__atual = date.today().isoformat()
+                self.__gravar()
+        return self.__atual
+
+    def __gravar(self) -> None:
+        tmp = self.__caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.__atual + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.__caminho)
+
+    def atual(self) -> str:
+        with self.__lock:
+            return self.__carregar()
+
+    # fecha o dia aberto e abre o próximo; devolve o dia novo
+    def fechar(self) -> str:
+        with self.__lock:
+            atual = self.__carregar()
+            data, sufixo = atual[:10], atual[11:]
+            hoje = date.today().isoformat()
+            if hoje > data:
+                self.__atual = hoje
+            else:
+                self.__atual = f"{data}-{int(sufixo or 1) + 1}"
+            self.__gravar()
+            return self.__atual
+
+
+dia_de_servico = DiaDeServico()
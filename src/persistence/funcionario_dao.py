@@ -1,79 +1,50 @@
-import pickle
 from persistence.abstract_dao import DAO
+from persistence.gerador_ids import gerador_ids
 from models.funcionario import Funcionario
 from models.garcom import Garcom
 from models.cozinheiro import Cozinheiro
-from typing import List, Dict, Union, Tuple
-import os 
-from typing import cast 
-FuncionarioData = Tuple[Dict[int, Funcionario], int] 
+from typing import List, Union
 
 class FuncionarioDAO(DAO):
     def __init__(self):
-        self.__datasource = 'funcionarios.pkl'
-        self._funcionarios: Dict[int, Funcionario] = {}
-        self._proximo_id = 101 
-        
-        try:
-            self.__load_all()
-        except FileNotFoundError:
+        super().__init__('funcionarios.pkl')
+        if not super().get_all():
             self._setup_inicial()
-            self.__dump_all()
-        except ValueError:
-            self._setup_inicial()
-            self.__dump_all()
+        # ids de funcionário começam em 101
+        self._reservar_ids('Funcionario', minimo=100)
 
-    def __dump_all(self):
-        data: FuncionarioData = (self._funcionarios, self._proximo_id)
-        with open(self.__datasource, 'wb') as f:
-            pickle.dump(data, f)
+    def _colunas_indexadas(self):
+        return {'tipo': lambda f: type(f).__name__}
 
-    def __load_all(self):
-        if os.path.exists(self.__datasource):
-            if os.path.getsize(self.__datasource) > 0:
-                with open(self.__datasource, 'rb') as f:
-                    self._funcionarios, self._proximo_id = pickle.load(f)
-            else:
-                raise FileNotFoundError
-        else:
-            raise FileNotFoundError
+    def _converter_dados(self, dados):
+        # formato antigo: (dicionário de funcionários, próximo id)
+        if isinstance(dados, tuple) and len(dados) == 2:
+            dados = dados[0]
+        return super()._converter_dados(dados)
 
-    
     def add(self, key: int, obj: Funcionario):
-        self._funcionarios[key] = obj
-        self._proximo_id += 1 
-        self.__dump_all()
+        super().add(key, obj)
+        gerador_ids.garantir_acima('Funcionario', key)
 
     def update(self, key: int, obj: Funcionario):
-        try:
-            if self._funcionarios[key] is not None:
-                self._funcionarios[key] = obj 
-                self.__dump_all()
-        except KeyError:
-            pass 
+        super().update(key, obj)
 
     def get(self, key: int) -> Union[Funcionario, None]:
-        try:
-            return self._funcionarios[key]
-        except KeyError:
-            return None
+        return super().get(key)
 
     def remove(self, key: int):
-        try:
-            self._funcionarios.pop(key)
-            self.__dump_all() 
-        except KeyError:
-            pass 
+        super().remove(key)
 
     def get_all(self) -> List[Funcionario]:
-        return list(self._funcionarios.values())
+        return list(super().get_all())
     
+    def listar_por_tipo(self, tipo: type) -> List[Funcionario]:
+        return self._buscar([('tipo', '=', tipo.__name__)], ordem=['chave'])
+
     def get_proximo_id(self) -> int:
-        return self._proximo_id
+        return gerador_ids.proximo('Funcionario')
 
     def _setup_inicial(self):
-        self._funcionarios.clear() 
-        self._funcionarios[101] = Garcom(id_funcionario=101, nome="Carlos", salario_base=1500.0)
-        self._funcionarios[102] = Garcom(id_funcionario=102, nome="Beatriz", salario_base=1500.0)
-        self._funcionarios[103] = Cozinheiro(id_funcionario=103, nome="Ana", salario_base=1800.0)
-        self._proximo_id = 104
\ No newline at end of file
+        self.add(101, Garcom(id_funcionario=101, nome="Carlos", salario_base=1500.0))
+        self.add(102, Garcom(id_funcionario=102, nome="Beatriz", salario_base=1500.0))
+        self.add(103, Cozinheiro(id_funcionario=103, nome="Ana", salario_base=1800.0))
@@ -0,0 +1,90 @@
+import os
+import threading
+from typing import Callable, Dict
+
+
+class GeradorIds:
+    """Gerador de IDs compartilhado por todos os tipos de entidade.
+
+    Os IDs são reservados em blocos: o arquivo só guarda, por tipo, o maior ID já
+    reservado (high-water mark) e é regravado uma vez por bloco. Os IDs do bloco
+    saem da memória; numa queda, o que sobrou do bloco é pulado, nunca repetido."""
+
+    TAMANHO_BLOCO = 64
+
+    def __init__(self, caminho: str = "ids.hwm"):
+        self.__caminho = caminho
+        self.__lock = threading.Lock()
+        self.__reservados: Dict[str, int] = {}
+        self.__proximos: Dict[str, int] = {}
+        self.__pisos: Dict[str, Callable[[], int]] = {}
+        self.__carregado = False
+
+    # lido na primeira chamada, para valer o diretório de trabalho do momento (como os .pkl)
+    def __carregar(self) -> None:
+        if self.__carregado:
+            return
+        self.__carregado = True
+        if not os.path.exists(self.__caminho):
+            return
+        with open(self.__caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                tipo, _, valor = linha.strip().partition("=")
+                if tipo and valor.isdigit():
+                    self.__reservados[tipo] = int(valor)
+        self.__proximos = {tipo: hwm + 1 for tipo, hwm in self.__reservados.items()}
+
+    def __gravar(self) -> None:
+        tmp = self.__caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(f"{tipo}={hwm}\n" for tipo, hwm in sorted(self.__reservados.items()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.__caminho)
+
+    # True se o tipo já passou pelo gerador (senão os IDs existentes vêm só dos dados)
+    def conhece(self, tipo: str) -> bool:
+        with self.__lock:
+            self.__carregar()
+            return tipo in self.__reservados
+
+    def proximo(self, tipo: str) -> int:
+        with self.__lock:
+            self.__carregar()
+            if tipo in self.__pisos:
+                maior = self.__pisos.pop(tipo)()
+                if self.__proximos.get(tipo, 1) <= maior:
+                    self.__proximos[tipo] = maior + 1
+            proximo = self.__proximos.get(tipo, 1)
+            if proximo > self.__reservados.get(tipo, 0):
+                # bloco esgotado: o high-water mark vai para o disco antes de o ID sair
+                self.__reservados[tipo] = proximo + self.TAMANHO_BLOCO - 1
+                self.__gravar()
+            self.__proximos[tipo] = proximo + 1
+            return proximo
+
+    # garante que os próximos IDs do tipo fiquem acima de um ID que já existe nos dados
+    def garantir_acima(self, tipo: str, maior_existente: int) -> None:
+        with self.__lock:
+            self.__carregar()
+            if self.__proximos.get(tipo, 1) <= maior_existente:
+                self.__proximos[tipo] = maior_existente + 1
+
+    # como garantir_acima, mas o maior ID só é calculado se um ID novo do tipo for pedido
+    # (para não ler o histórico inteiro na inicialização)
+    def garantir_acima_sob_demanda(self, tipo: str, calcular_maior: Callable[[], int]) -> None:
+        with self.__lock:
+            self.__pisos[tipo] = calcular_maior
+
+    # num encerramento limpo, o resto dos blocos volta para o arquivo e não é pulado no próximo início
+    def devolver_sobras(self) -> None:
+        with self.__lock:
+            if not self.__reservados:
+                return
+            usados = {tipo: self.__proximos.get(tipo, 1) - 1 for tipo in self.__reservados}
+            if usados != self.__reservados:
+                self.__reservados = usados
+                self.__gravar()
+
+
+gerador_ids = GeradorIds()
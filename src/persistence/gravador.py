@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from .armazenamento import Armazenamento, Registro
+
+
+class GravadorEmSegundoPlano:
+    """Thread única que faz o I/O dos DAOs fora da thread da GUI.
+
+    Os lotes chegam já serializados; lotes do mesmo DAO que se acumulam entre
+    duas gravações são fundidos (vale a última versão de cada chave) e viram uma
+    única gravação por DAO. Com intervalo > 0 a thread espera esse tempo depois
+    do primeiro lote, juntando as rajadas (group commit).
+
+    Um lote que falha volta para a fila (sem passar por cima de versões mais novas
+    das mesmas chaves) e é tentado de novo, com espera crescente entre as tentativas.
+    esvaziar() e encerrar() levantam o erro se a gravação continuar falhando."""
+
+    # espera entre tentativas depois de uma falha: dobra a cada falha seguida, até o máximo
+    ESPERA_INICIAL = 0.05
+    ESPERA_MAXIMA = 2.0
+    # falhas seguidas que esvaziar() tolera antes de desistir e levantar o erro
+    TENTATIVAS_AO_ESVAZIAR = 3
+
+    def __init__(self, intervalo: float = 0.0):
+        self._intervalo = intervalo
+        self._pendentes: Dict[Armazenamento, Dict[Any, Registro]] = {}
+        self._gravando: Set[Armazenamento] = set()
+        self._cond = threading.Condition()
+        self._urgente = False
+        self._parar = False
+        # erro da última gravação, enquanto ela não for refeita com sucesso
+        self._erro: Optional[Exception] = None
+        self._falhas_seguidas = 0
+        self._thread = threading.Thread(target=self._executar, name="gravador-persistencia", daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, armazenamento: Armazenamento, registros: List[Registro]) -> None:
+        with self._cond:
+            if self._parar:
+                # gravador já encerrado: grava na hora para não perder nada
+                armazenamento.gravar_lote(registros)
+                return
+            fila = self._pendentes.setdefault(armazenamento, {})
+            for registro in registros:
+                fila[registro[1]] = registro
+            self._cond.notify_all()
+
+    # True enquanto houver algo desse backend ainda não gravado
+    def pendente(self, armazenamento: Armazenamento) -> bool:
+        with self._cond:
+            return armazenamento in self._pendentes or armazenamento in self._gravando
+
+    def _executar(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pendentes and not self._parar:
+                    self._cond.wait()
+                # encerrado com a gravação falhando: o que sobrou fica na fila e esvaziar() levanta o erro
+                if not self._pendentes or (self._parar and self._erro is not None):
+                    return
+                if self._erro is None:
+                    espera, adiantavel = self._intervalo, True
+                else:
+                    # depois de uma falha nem um esvaziar() adianta a próxima tentativa
+                    espera = min(self.ESPERA_MAXIMA, self.ESPERA_INICIAL * 2 ** (self._falhas_seguidas - 1))
+                    adiantavel = False
+                limite = time.monotonic() + espera
+                while not (adiantavel and self._urgente) and not self._parar:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                lote, self._pendentes = self._pendentes, {}
+                self._gravando = set(lote)
+            falhas: Dict[Armazenamento, Exception] = {}
+            for armazenamento, registros in lote.items():
+                try:
+                    armazenamento.gravar_lote(list(registros.values()))
+                except Exception as e:
+                    falhas[armazenamento] = e
+            with self._cond:
+                for armazenamento, erro in falhas.items():
+                    print(f"[AVISO DAO] Falha na gravação em segundo plano (nova tentativa em seguida): {erro}")
+                    # volta para a fila; o que chegou durante a tentativa para as mesmas chaves é mais novo e fica
+                    fila = self._pendentes.setdefault(armazenamento, {})
+                    for key, registro in lote[armazenamento].items():
+                        fila.setdefault(key, registro)
+                if falhas:
+                    self._erro = next(iter(falhas.values()))
+                    self._falhas_seguidas += 1
+                else:
+                    self._erro = None
+                    self._falhas_seguidas = 0
+                self._gravando = set()
+                if not self._pendentes:
+                    self._urgente = False
+                self._cond.notify_all()
+
+    # espera tudo o que já foi enfileirado chegar ao disco; se a gravação falhar
+    # TENTATIVAS_AO_ESVAZIAR vezes seguidas, levanta o erro (o que falhou continua na fila)
+    def esvaziar(self) -> None:
+        with self._cond:
+            self._urgente = True
+            self._cond.notify_all()
+            falhas_antes = self._falhas_seguidas
+            while self._pendentes or self._gravando:
+                if self._erro is not None and (
+                        self._parar or self._falhas_seguidas - falhas_antes >= self.TENTATIVAS_AO_ESVAZIAR):
+                    raise self._erro
+                self._cond.wait()
+
+    def encerrar(self) -> None:
+        try:
+            self.esvaziar()
+        finally:
+            with self._cond:
+                self._parar = True
+                self._cond.notify_all()
+            self._thread.join()
+
+
+class ArmazenamentoEmSegundoPlano(Armazenamento):
+    """Repassa as gravações de um backend para o gravador em segundo plano."""
+
+    def __init__(self, backend: Armazenamento, gravador: GravadorEmSegundoPlano):
+        self.__backend = backend
+        self.__gravador = gravador
+
+    def carregar(self):
+        return self.__backend.carregar()
+
+    def gravar_lote(self, registros):
+        self.__gravador.enfileirar(self.__backend, registros)
+
+    # com gravação pendente o índice do backend está atrasado: o DAO varre o cache
+    def buscar(self, filtros, ordem, limite) -> Optional[List[Any]]:
+        if self.__gravador.pendente(self.__backend):
+            return None
+        return self.__backend.buscar(filtros, ordem, limite)
+
+    def pendentes_de_indice(self):
+        return self.__backend.pendentes_de_indice()
+
+    def fechar(self):
+        self.__backend.fechar()
@@ -1,70 +1,34 @@
-import pickle
 from persistence.abstract_dao import DAO
+from persistence.gerador_ids import gerador_ids
 from models.grupo_cliente import GrupoCliente
-from typing import List, Dict, Union, Tuple
-import os
-
-GrupoClienteData = Tuple[Dict[int, GrupoCliente], int] 
+from typing import List, Union
 
 class GrupoClienteDAO(DAO):
     def __init__(self):
-        self.__datasource = 'grupos_clientes.pkl'
-        self._grupos: Dict[int, GrupoCliente] = {}
-        self._proximo_id = 1 
-        
-        try:
-            self.__load_all()
-        except FileNotFoundError:
-            self._grupos.clear()
-            self._proximo_id = 1
-            self.__dump_all()
-        except ValueError:
-            print(f"[AVISO DAO] Arquivo '{self.__datasource}' vazio ou corrompido. Reiniciando IDs.")
-            self._grupos.clear()
-            self._proximo_id = 1
-            self.__dump_all()
-
-    def __dump_all(self):
-        data: GrupoClienteData = (self._grupos, self._proximo_id)
-        with open(self.__datasource, 'wb') as f:
-            pickle.dump(data, f)
+        super().__init__('grupos_clientes.pkl')
+        self._reservar_ids('GrupoCliente')
 
-    def __load_all(self):
-        if os.path.exists(self.__datasource) and os.path.getsize(self.__datasource) > 0:
-            with open(self.__datasource, 'rb') as f:
-                self._grupos, self._proximo_id = pickle.load(f)
-        else:
-            raise FileNotFoundError
+    def _converter_dados(self, dados):
+        # formato antigo: (dicionário de grupos, próximo id)
+        if isinstance(dados, tuple) and len(dados) == 2:
+            dados = dados[0]
+        return super()._converter_dados(dados)
 
-    
     def add(self, key: int, obj: GrupoCliente):
-        self._grupos[key] = obj
-        self._proximo_id += 1 
-        self.__dump_all()
+        super().add(key, obj)
+        gerador_ids.garantir_acima('GrupoCliente', key)
 
     def update(self, key: int, obj: GrupoCliente):
-        try:
-            if self._grupos[key] is not None:
-                self._grupos[key] = obj 
-                self.__dump_all()
-        except KeyError:
-            pass 
+        super().update(key, obj)
 
     def get(self, key: int) -> Union[GrupoCliente, None]:
-        try:
-            return self._grupos[key]
-        except KeyError:
-            return None
+        return super().get(key)
 
     def remove(self, key: int):
-        try:
-            self._grupos.pop(key)
-            self.__dump_all() 
-        except KeyError:
-            pass 
+        super().remove(key)
 
     def get_all(self) -> List[GrupoCliente]:
-        return list(self._grupos.values())
+        return list(super().get_all())
     
     def get_proximo_id(self) -> int:
-        return self._proximo_id
\ No newline at end of file
+        return gerador_ids.proximo('GrupoCliente')
@@ -0,0 +1,148 @@
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# os anéis guardam uma semana
+MINUTOS_GUARDADOS = 7 * 24 * 60
+
+# colunas do livro de itens pelas quais as vendas são agrupadas
+DIMENSOES = ("prato_id", "garcom_id", "mesa_id")
+
+# (itens vendidos, receita em centavos, pedidos)
+Totais = Tuple[int, int, int]
+
+# balde: dimensão -> {id: [itens, receita em centavos, pedidos]}
+Balde = Dict[str, Dict[int, List[int]]]
+
+
+class JanelaDeTempo(Enum):
+    ULTIMA_HORA = "Última hora"
+    HOJE = "Hoje"                      # desde a meia-noite
+    ULTIMOS_7_DIAS = "Últimos 7 dias"
+
+
+def inicio_da_janela(janela: JanelaDeTempo, agora: Optional[float] = None) -> float:
+    agora = time.time() if agora is None else agora
+    if janela is JanelaDeTempo.ULTIMA_HORA:
+        return agora - 60 * 60
+    if janela is JanelaDeTempo.HOJE:
+        return datetime.fromtimestamp(agora).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    return agora - MINUTOS_GUARDADOS * 60
+
+
+class _Anel:
+    """Baldes de período fixo; o período p fica na posição p % tamanho e um período novo
+    reaproveita o balde de quem estava ali."""
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self.periodos: List[int] = [-1] * tamanho
+        self.baldes: List[Optional[Balde]] = [None] * tamanho
+
+    def balde(self, periodo: int) -> Balde:
+        posicao = periodo % self.tamanho
+        if self.periodos[posicao] != periodo:
+            self.periodos[posicao] = periodo
+            self.baldes[posicao] = {dimensao: {} for dimensao in DIMENSOES}
+        return self.baldes[posicao]
+
+    def somar_em(self, somas: Balde, primeiro: int, ultimo: int) -> None:
+        for periodo in range(primeiro, ultimo + 1):
+            posicao = periodo % self.tamanho
+            if self.periodos[posicao] != periodo:
+                continue
+            for dimensao, por_chave in self.baldes[posicao].items():
+                _acumular(somas[dimensao], por_chave.items())
+
+
+def _acumular(destino: Dict[int, List[int]], totais) -> None:
+    for chave, (itens, receita, pedidos) in totais:
+        acumulado = destino.get(chave)
+        if acumulado is None:
+            destino[chave] = [itens, receita, pedidos]
+        else:
+            acumulado[0] += itens
+            acumulado[1] += receita
+            acumulado[2] += pedidos
+
+
+# até aqui um dicionário agrupa mais rápido que o numpy (uma venda tem poucas linhas)
+_POUCAS_LINHAS = 256
+
+
+# (minuto, id, (itens, receita, pedidos)) de cada par minuto/id das linhas; o pedido conta
+# uma vez por prato, garçom ou mesa, não uma vez por item
+def _agrupar(minuto: np.ndarray, chave: np.ndarray, pedido: np.ndarray,
+             quantidade: np.ndarray, receita: np.ndarray) -> List[Tuple[int, int, Totais]]:
+    if len(minuto) <= _POUCAS_LINHAS:
+        grupos: Dict[Tuple[int, int], List] = {}
+        for m, id_, id_pedido, itens, valor in zip(minuto.tolist(), chave.tolist(), pedido.tolist(),
+                                                   quantidade.tolist(), receita.tolist()):
+            grupo = grupos.get((m, id_))
+            if grupo is None:
+                grupo = grupos[(m, id_)] = [0, 0, set()]
+            grupo[0] += itens
+            grupo[1] += valor
+            grupo[2].add(id_pedido)
+        return [(m, id_, (itens, valor, len(pedidos))) for (m, id_), (itens, valor, pedidos) in grupos.items()]
+    # ids de 32 bits cabem embaixo do minuto
+    combinados, grupo_da_linha = np.unique((minuto << 32) | chave, return_inverse=True)
+    itens = np.bincount(grupo_da_linha, weights=quantidade, minlength=len(combinados)).astype(np.int64)
+    valores = np.bincount(grupo_da_linha, weights=receita, minlength=len(combinados)).astype(np.int64)
+    pares = np.unique(np.stack([grupo_da_linha, pedido]), axis=1)
+    pedidos = np.bincount(pares[0], minlength=len(combinados))
+    return [(g >> 32, g & 0xFFFFFFFF, (i, v, p))
+            for g, i, v, p in zip(combinados.tolist(), itens.tolist(), valores.tolist(), pedidos.tolist())]
+
+
+class JanelasDeVendas:
+    """Vendas da última semana em baldes por minuto e por hora, em dois anéis.
+
+    Cada balde guarda, por prato, garçom e mesa, os itens vendidos, a receita e os
+    pedidos do seu minuto (ou hora). Registrar vendas mexe num balde de cada anel por
+    grupo de linhas do mesmo minuto; uma janela soma as horas inteiras dela no anel de
+    horas e só as pontas no de minutos, qualquer que seja o tamanho do histórico."""
+
+    def __init__(self):
+        self.__minutos = _Anel(MINUTOS_GUARDADOS)
+        self.__horas = _Anel(MINUTOS_GUARDADOS // 60)
+        self.__mais_recente = -1
+
+    # registros: colunas do livro de itens (pedido_id, prato_id, quantidade, preco_centavos,
+    # instante, garcom_id, mesa_id); as linhas de um pedido chegam juntas
+    def registrar(self, registros: Mapping[str, np.ndarray]) -> None:
+        minuto = (np.asarray(registros["instante"]) // 60).astype(np.int64)
+        if not len(minuto):
+            return
+        self.__mais_recente = max(self.__mais_recente, int(minuto.max()))
+        # o que já saiu do anel de minutos não entra em nenhum dos dois
+        recentes = np.flatnonzero(minuto > self.__mais_recente - MINUTOS_GUARDADOS)
+        minuto = minuto[recentes]
+        pedido = np.asarray(registros["pedido_id"])[recentes]
+        quantidade = np.asarray(registros["quantidade"])[recentes].astype(np.int64)
+        receita = quantidade * np.asarray(registros["preco_centavos"])[recentes]
+        for dimensao in DIMENSOES:
+            chave = np.asarray(registros[dimensao])[recentes].astype(np.int64)
+            for m, id_, totais in _agrupar(minuto, chave, pedido, quantidade, receita):
+                _acumular(self.__minutos.balde(m)[dimensao], ((id_, totais),))
+                _acumular(self.__horas.balde(m // 60)[dimensao], ((id_, totais),))
+
+    # dimensão -> {id: (itens, receita em centavos, pedidos)} das vendas entre desde e agora,
+    # em minutos inteiros
+    def totais(self, desde: float, agora: Optional[float] = None) -> Dict[str, Dict[int, Totais]]:
+        agora = time.time() if agora is None else agora
+        fim = int(agora // 60)
+        inicio = max(int(desde // 60), fim - MINUTOS_GUARDADOS + 1)
+        somas: Balde = {dimensao: {} for dimensao in DIMENSOES}
+        # horas que cabem inteiras na janela
+        primeira_hora, ultima_hora = -(-inicio // 60), (fim + 1) // 60 - 1
+        if primeira_hora <= ultima_hora:
+            self.__minutos.somar_em(somas, inicio, primeira_hora * 60 - 1)
+            self.__horas.somar_em(somas, primeira_hora, ultima_hora)
+            self.__minutos.somar_em(somas, (ultima_hora + 1) * 60, fim)
+        else:
+            self.__minutos.somar_em(somas, inicio, fim)
+        return {dimensao: {chave: tuple(t) for chave, t in por_chave.items()} for dimensao, por_chave in somas.items()}
@@ -0,0 +1,459 @@
+import heapq
+import os
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .dia_de_servico import dia_de_servico
+from .janelas_de_vendas import MINUTOS_GUARDADOS, JanelaDeTempo, JanelasDeVendas, Totais, inicio_da_janela
+from .unidade_de_trabalho import transacao_atual
+
+PASTA_LIVRO = "livro_itens"
+
+# colunas do livro, na ordem do registro gravado na cauda; ids desconhecidos ficam 0
+COLUNAS: Tuple[Tuple[str, str], ...] = (
+    ("pedido_id", "<i8"),
+    ("prato_id", "<i4"),
+    ("quantidade", "<i4"),
+    ("preco_centavos", "<i8"),
+    ("instante", "<f8"),  # segundos desde a época
+    ("garcom_id", "<i4"),
+    ("mesa_id", "<i4"),
+    ("conta_id", "<i4"),
+)
+_REGISTRO = np.dtype(list(COLUNAS))
+
+# uma linha do livro, com os valores na ordem de COLUNAS
+Linha = Tuple[int, int, int, int, float, int, int, int]
+
+_PREFIXO = "seg-"
+_CAUDA = ".cauda"
+_NOMES = "pratos.txt"
+_VENDAS = "vendas.txt"
+
+
+# arquivos pequenos de pares id=valor (nomes dos pratos, vendas de um dia), regravados inteiros
+def _ler_pares(caminho: str, converter: Callable[[str], object] = int) -> Dict[int, object]:
+    pares: Dict[int, object] = {}
+    if os.path.exists(caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                ident, _, valor = linha.rstrip("\n").partition("=")
+                if ident.isdigit():
+                    pares[int(ident)] = converter(valor)
+    return pares
+
+
+def _gravar_pares(caminho: str, pares: Dict[int, object]) -> None:
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        f.writelines(f"{ident}={valor}\n" for ident, valor in sorted(pares.items()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(caminho + ".tmp", caminho)
+
+
+# agrupa por uma coluna de ids e soma outra: {id: soma}. Vai bloco a bloco, sem juntar as colunas
+def _somar(blocos: Iterable[Dict[str, np.ndarray]], chave: str, valor: str) -> Dict[int, int]:
+    somas = np.zeros(0, dtype=np.int64)
+    presentes = np.zeros(0, dtype=bool)
+    for bloco in blocos:
+        ids = bloco[chave]
+        parcial = np.bincount(ids, weights=bloco[valor]).round().astype(np.int64)
+        vistos = np.bincount(ids) > 0
+        if len(parcial) > len(somas):
+            somas = np.pad(somas, (0, len(parcial) - len(somas)))
+            presentes = np.pad(presentes, (0, len(parcial) - len(presentes)))
+        somas[:len(parcial)] += parcial
+        presentes[:len(vistos)] |= vistos
+    return {int(i): int(somas[i]) for i in np.flatnonzero(presentes)}
+
+
+class RankingDeVendas:
+    """Quantidade vendida por prato, mantida em ordem decrescente a cada venda.
+
+    As quantidades só crescem: um prato que vende sobe algumas posições (o cardápio tem
+    poucas dezenas de pratos) e os k mais vendidos são as k primeiras posições, sem
+    ordenar nada na consulta. No empate, o prato de menor id fica na frente."""
+
+    def __init__(self, totais: Optional[Dict[int, int]] = None):
+        self.__totais: Dict[int, int] = dict(totais or {})
+        self.__ordem: List[int] = sorted(self.__totais, key=lambda i: (-self.__totais[i], i))
+        self.__posicao: Dict[int, int] = {ident: i for i, ident in enumerate(self.__ordem)}
+
+    def somar(self, id_prato: int, quantidade: int) -> None:
+        if id_prato not in self.__totais:
+            self.__totais[id_prato] = 0
+            self.__posicao[id_prato] = len(self.__ordem)
+            self.__ordem.append(id_prato)
+        total = self.__totais[id_prato] = self.__totais[id_prato] + quantidade
+        i = self.__posicao[id_prato]
+        while i > 0 and (self.__totais[self.__ordem[i - 1]], -self.__ordem[i - 1]) < (total, -id_prato):
+            acima = self.__ordem[i - 1]
+            self.__ordem[i], self.__posicao[acima] = acima, i
+            i -= 1
+        self.__ordem[i], self.__posicao[id_prato] = id_prato, i
+
+    # [(id do prato, quantidade)] dos k mais vendidos
+    def mais_vendidos(self, k: int) -> List[Tuple[int, int]]:
+        return [(ident, self.__totais[ident]) for ident in self.__ordem[:k]]
+
+    def totais(self) -> Dict[int, int]:
+        return dict(self.__totais)
+
+
+class _Cauda:
+    """Registros do segmento em aberto: uma array por coluna, com folga que dobra quando enche."""
+
+    def __init__(self, registros: np.ndarray):
+        self.tamanho = len(registros)
+        capacidade = max(1024, 2 * self.tamanho)
+        self.colunas = {nome: np.empty(capacidade, dtype=tipo) for nome, tipo in COLUNAS}
+        for nome, coluna in self.colunas.items():
+            coluna[:self.tamanho] = registros[nome]
+
+    def anexar(self, registros: np.ndarray) -> None:
+        fim = self.tamanho + len(registros)
+        if fim > len(self.colunas["pedido_id"]):
+            capacidade = max(fim, 2 * len(self.colunas["pedido_id"]))
+            for nome, coluna in self.colunas.items():
+                nova = np.empty(capacidade, dtype=coluna.dtype)
+                nova[:self.tamanho] = coluna[:self.tamanho]
+                self.colunas[nome] = nova
+        for nome, coluna in self.colunas.items():
+            coluna[self.tamanho:fim] = registros[nome]
+        self.tamanho = fim
+
+    # fatias das arrays atuais: quem já as pegou continua vendo só as linhas de então
+    def visao(self) -> Dict[str, np.ndarray]:
+        return {nome: coluna[:self.tamanho] for nome, coluna in self.colunas.items()}
+
+
+class LivroDeItens:
+    """Livro colunar append-only com cada item vendido (um registro por item de pedido confirmado).
+
+    Serve os relatórios: somar quantidades por prato, por garçom etc. vira um bincount
+    sobre arrays NumPy em vez de um passeio pelos objetos dos pedidos.
+
+    Fica numa pasta por dia de serviço (livro_itens/2026-10-18/), como o arquivo morto;
+    registros de antes da separação por dia ficam direto em livro_itens/. Os registros
+    novos do dia aberto vão para a cauda (seg-000003.cauda: registros de tamanho fixo,
+    acrescentados com fsync) e ficam também em memória. Quando a cauda passa de
+    LIMITE_SEGMENTO registros, ou quando o dia fecha, ela vira um segmento colunar
+    (seg-000003/, um .npy por coluna), lido depois com mmap. Nada é regravado.
+
+    A quantidade vendida por prato é mantida à parte, a cada linha nova: por dia (o dia
+    fechado grava a dele em vendas.txt) e no total, num RankingDeVendas. O relatório de
+    pratos e o prato mais vendido saem desses contadores, sem somar linha nenhuma. A
+    última semana também fica em baldes de um minuto (JanelasDeVendas), para as janelas
+    de tempo (última hora, hoje, últimos 7 dias)."""
+
+    LIMITE_SEGMENTO = 256 * 1024
+
+    def __init__(self, pasta: str = PASTA_LIVRO, sincronizar: bool = True):
+        self.__pasta = pasta
+        self.__sincronizar = sincronizar
+        self.__lock = threading.Lock()
+        # dia -> segmentos já selados, abertos com mmap (dia None: registros sem dia)
+        self.__segmentos: Dict[Optional[str], List[Dict[str, np.ndarray]]] = {}
+        self.__dia_aberto: Optional[str] = None
+        self.__numero_cauda = 0
+        self.__cauda: Optional[_Cauda] = None
+        self.__nomes: Optional[Dict[int, str]] = None
+        # dia -> {id do prato: quantidade vendida}; o do dia aberto cresce a cada linha
+        self.__vendas: Dict[Optional[str], Dict[int, int]] = {}
+        # total de todos os dias e baldes da última semana, montados na primeira consulta
+        self.__ranking: Optional[RankingDeVendas] = None
+        self.__janelas: Optional[JanelasDeVendas] = None
+
+    def existe(self) -> bool:
+        return os.path.isdir(self.__pasta)
+
+    def __pasta_do_dia(self, dia: Optional[str]) -> str:
+        return self.__pasta if dia is None else os.path.join(self.__pasta, dia)
+
+    def __numeros(self, dia: Optional[str]) -> List[int]:
+        pasta = self.__pasta_do_dia(dia)
+        if not os.path.isdir(pasta):
+            return []
+        # segmentos selados (seg-000001/) e caudas (seg-000002.cauda)
+        numeros = set()
+        for f in os.listdir(pasta):
+            numero = f[len(_PREFIXO):]
+            if numero.endswith(_CAUDA):
+                numero = numero[:-len(_CAUDA)]
+            if f.startswith(_PREFIXO) and numero.isdigit():
+                numeros.add(int(numero))
+        return sorted(numeros)
+
+    def __caminho(self, dia: Optional[str], numero: int) -> str:
+        return os.path.join(self.__pasta_do_dia(dia), f"{_PREFIXO}{numero:06d}")
+
+    # dias de serviço com registros no livro, do mais antigo para o mais novo
+    def dias(self) -> List[str]:
+        if not os.path.isdir(self.__pasta):
+            return []
+        return sorted(
+            d for d in os.listdir(self.__pasta)
+            if os.path.isdir(os.path.join(self.__pasta, d)) and not d.startswith(_PREFIXO)
+        )
+
+    @staticmethod
+    def __abrir_segmento(caminho: str) -> Dict[str, np.ndarray]:
+        return {nome: np.load(os.path.join(caminho, nome + ".npy"), mmap_mode="r") for nome, _ in COLUNAS}
+
+    @staticmethod
+    def __ler_cauda(caminho: str) -> np.ndarray:
+        if not os.path.exists(caminho):
+            return np.empty(0, dtype=_REGISTRO)
+        completos = os.path.getsize(caminho) // _REGISTRO.itemsize
+        # registro truncado por uma queda no meio da gravação
+        if completos * _REGISTRO.itemsize != os.path.getsize(caminho):
+            os.truncate(caminho, completos * _REGISTRO.itemsize)
+        return np.fromfile(caminho, dtype=_REGISTRO, count=completos)
+
+    # segmentos de um dia que não está aberto; uma cauda que sobrou (queda antes de o dia
+    # fechar) é lida como mais um segmento
+    def __segmentos_do_dia(self, dia: Optional[str]) -> List[Dict[str, np.ndarray]]:
+        if dia not in self.__segmentos:
+            segmentos = []
+            for numero in self.__numeros(dia):
+                caminho = self.__caminho(dia, numero)
+                if os.path.isdir(caminho):
+                    segmentos.append(self.__abrir_segmento(caminho))
+                elif os.path.exists(caminho + _CAUDA):
+                    registros = self.__ler_cauda(caminho + _CAUDA)
+                    segmentos.append({nome: registros[nome] for nome, _ in COLUNAS})
+            self.__segmentos[dia] = segmentos
+        return self.__segmentos[dia]
+
+    # deixa a cauda em memória no dia de serviço atual; se o dia mudou, a cauda do anterior vira segmento
+    def __garantir_aberto(self) -> None:
+        dia = dia_de_servico.atual()
+        if dia == self.__dia_aberto:
+            return
+        if self.__dia_aberto is not None:
+            if self.__cauda.tamanho:
+                self.__selar()
+            # o dia que fechou guarda as vendas dele; ninguém mais precisa somar os segmentos
+            _gravar_pares(os.path.join(self.__pasta_do_dia(self.__dia_aberto), _VENDAS),
+                          self.__vendas[self.__dia_aberto])
+        pasta = self.__pasta_do_dia(dia)
+        os.makedirs(pasta, exist_ok=True)
+        for f in os.listdir(pasta):
+            if f.endswith(".tmp"):
+                # segmento que uma queda deixou pela metade; a cauda dele continua lá
+                shutil.rmtree(os.path.join(pasta, f), ignore_errors=True)
+        selados = [n for n in self.__numeros(dia) if os.path.isdir(self.__caminho(dia, n))]
+        for n in selados:
+            # queda entre selar o segmento e apagar a cauda: o segmento já tem tudo
+            if os.path.exists(self.__caminho(dia, n) + _CAUDA):
+                os.remove(self.__caminho(dia, n) + _CAUDA)
+        self.__segmentos[dia] = [self.__abrir_segmento(self.__caminho(dia, n)) for n in selados]
+        self.__numero_cauda = max(selados, default=0) + 1
+        self.__cauda = _Cauda(self.__ler_cauda(self.__caminho(dia, self.__numero_cauda) + _CAUDA))
+        self.__dia_aberto = dia
+        # um dia só, uma vez por execução; daqui em diante o contador acompanha cada linha
+        self.__vendas[dia] = _somar(self.__segmentos[dia] + [self.__cauda.visao()], "prato_id", "quantidade")
+
+    # vendas de um dia que não está aberto: lidas do vendas.txt ou, para um dia fechado
+    # antes de os contadores existirem, somadas dos segmentos uma vez e gravadas
+    def __vendas_do_dia(self, dia: Optional[str]) -> Dict[int, int]:
+        if dia not in self.__vendas:
+            caminho = os.path.join(self.__pasta_do_dia(dia), _VENDAS)
+            if os.path.exists(caminho):
+                self.__vendas[dia] = _ler_pares(caminho)
+            else:
+                self.__vendas[dia] = _somar(self.__segmentos_do_dia(dia), "prato_id", "quantidade")
+                if os.path.isdir(self.__pasta_do_dia(dia)):
+                    _gravar_pares(caminho, self.__vendas[dia])
+        return self.__vendas[dia]
+
+    def __contar(self, dia: Optional[str], registros: np.ndarray) -> None:
+        vendas = self.__vendas[dia]
+        for id_prato, quantidade in zip(registros["prato_id"].tolist(), registros["quantidade"].tolist()):
+            vendas[id_prato] = vendas.get(id_prato, 0) + quantidade
+            if self.__ranking is not None:
+                self.__ranking.somar(id_prato, quantidade)
+        if self.__janelas is not None:
+            self.__janelas.registrar(registros)
+
+    def __gravar_segmento(self, dia: Optional[str], numero: int, colunas: Dict[str, np.ndarray]) -> None:
+        final = self.__caminho(dia, numero)
+        tmp = final + ".tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for nome, tipo in COLUNAS:
+            with open(os.path.join(tmp, nome + ".npy"), "wb") as f:
+                np.save(f, np.ascontiguousarray(colunas[nome], dtype=tipo))
+                if self.__sincronizar:
+                    f.flush()
+                    os.fsync(f.fileno())
+        os.replace(tmp, final)
+        self.__segmentos.setdefault(dia, []).append(self.__abrir_segmento(final))
+
+    def __selar(self) -> None:
+        dia, numero = self.__dia_aberto, self.__numero_cauda
+        self.__gravar_segmento(dia, numero, self.__cauda.visao())
+        os.remove(self.__caminho(dia, numero) + _CAUDA)
+        self.__numero_cauda += 1
+        self.__cauda = _Cauda(np.empty(0, dtype=_REGISTRO))
+
+    # dentro de uma unidade de trabalho as linhas só entram no commit; fora dela, na hora
+    def registrar(self, linhas: Sequence[Linha], nomes: Optional[Dict[int, str]] = None) -> None:
+        transacao = transacao_atual()
+        if transacao is not None:
+            transacao.ao_confirmar(lambda: self.anexar(linhas, nomes))
+        else:
+            self.anexar(linhas, nomes)
+
+    # acrescenta as linhas ao dia aberto; nomes: id do prato -> nome, para os relatórios
+    # mostrarem pratos que já saíram do cardápio
+    def anexar(self, linhas: Sequence[Linha], nomes: Optional[Dict[int, str]] = None) -> None:
+        if not linhas:
+            return
+        registros = np.array([tuple(linha) for linha in linhas], dtype=_REGISTRO)
+        with self.__lock:
+            self.__anexar_na_cauda(registros)
+            if nomes:
+                self.__atualizar_nomes(nomes)
+
+    def __anexar_na_cauda(self, registros: np.ndarray) -> None:
+        self.__garantir_aberto()
+        with open(self.__caminho(self.__dia_aberto, self.__numero_cauda) + _CAUDA, "ab") as f:
+            f.write(registros.tobytes())
+            if self.__sincronizar:
+                f.flush()
+                os.fsync(f.fileno())
+        self.__cauda.anexar(registros)
+        self.__contar(self.__dia_aberto, registros)
+        if self.__cauda.tamanho >= self.LIMITE_SEGMENTO:
+            self.__selar()
+
+    # grava de uma vez os registros de um dia (reconstrução a partir do histórico): os dias
+    # fechados ganham um segmento, o dia aberto vai para a cauda
+    def importar(self, dia: Optional[str], colunas: Dict[str, np.ndarray],
+                 nomes: Optional[Dict[int, str]] = None) -> None:
+        quantidade = len(colunas["pedido_id"])
+        with self.__lock:
+            os.makedirs(self.__pasta_do_dia(dia), exist_ok=True)
+            if dia is not None and dia == dia_de_servico.atual():
+                registros = np.empty(quantidade, dtype=_REGISTRO)
+                for nome, _ in COLUNAS:
+                    registros[nome] = colunas[nome]
+                if quantidade:
+                    self.__anexar_na_cauda(registros)
+            elif quantidade:
+                self.__vendas_do_dia(dia)
+                self.__gravar_segmento(dia, max(self.__numeros(dia), default=0) + 1, colunas)
+                self.__contar(dia, colunas)
+                _gravar_pares(os.path.join(self.__pasta_do_dia(dia), _VENDAS), self.__vendas[dia])
+            if nomes:
+                self.__atualizar_nomes(nomes)
+
+    def __carregar_nomes(self) -> Dict[int, str]:
+        if self.__nomes is None:
+            self.__nomes = _ler_pares(os.path.join(self.__pasta, _NOMES), str)
+        return self.__nomes
+
+    def __atualizar_nomes(self, nomes: Dict[int, str]) -> None:
+        atuais = self.__carregar_nomes()
+        if all(atuais.get(ident) == nome for ident, nome in nomes.items()):
+            return
+        atuais.update(nomes)
+        os.makedirs(self.__pasta, exist_ok=True)
+        _gravar_pares(os.path.join(self.__pasta, _NOMES), atuais)
+
+    def nomes_dos_pratos(self) -> Dict[int, str]:
+        with self.__lock:
+            return dict(self.__carregar_nomes())
+
+    # blocos de colunas (um por segmento, mais a cauda) dos dias pedidos; sem dias: o livro inteiro
+    def __blocos(self, dias: Optional[Iterable[str]]) -> List[Dict[str, np.ndarray]]:
+        with self.__lock:
+            self.__garantir_aberto()
+            escolhidos: List[Optional[str]] = [None] + self.dias() if dias is None else sorted(set(dias))
+            blocos = []
+            for dia in escolhidos:
+                if dia == self.__dia_aberto:
+                    blocos.extend(self.__segmentos[dia])
+                    blocos.append(self.__cauda.visao())
+                else:
+                    blocos.extend(self.__segmentos_do_dia(dia))
+            return [b for b in blocos if len(b["pedido_id"])]
+
+    def __len__(self) -> int:
+        return sum(len(b["pedido_id"]) for b in self.__blocos(None))
+
+    def colunas(self, dias: Optional[Iterable[str]] = None,
+                nomes: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        nomes = [n for n, _ in COLUNAS] if nomes is None else list(nomes)
+        blocos = self.__blocos(dias)
+        if not blocos:
+            return {nome: np.empty(0, dtype=_REGISTRO[nome]) for nome in nomes}
+        return {nome: np.concatenate([b[nome] for b in blocos]) for nome in nomes}
+
+    def somar_por(self, chave: str, valor: str = "quantidade",
+                  dias: Optional[Iterable[str]] = None) -> Dict[int, int]:
+        return _somar(self.__blocos(dias), chave, valor)
+
+    def __ranking_geral(self) -> RankingDeVendas:
+        if self.__ranking is None:
+            totais: Dict[int, int] = {}
+            for dia in [None] + self.dias():
+                for id_prato, quantidade in self.__vendas_do_dia(dia).items():
+                    totais[id_prato] = totais.get(id_prato, 0) + quantidade
+            self.__ranking = RankingDeVendas(totais)
+        return self.__ranking
+
+    # só os dias que podem ter vendas da última semana: o nome do dia começa pela data em
+    # que ele abriu e um dia fechado vai até o seguinte abrir; dia sem data no nome entra sempre
+    def __janelas_recentes(self) -> JanelasDeVendas:
+        if self.__janelas is None:
+            limite = time.time() - MINUTOS_GUARDADOS * 60
+            # um dia de folga na conta, por causa de fuso e relógio
+            primeiro_dia = (date.fromtimestamp(limite) - timedelta(days=1)).isoformat()
+            datados = sorted({d for d in self.dias() + [self.__dia_aberto] if d is not None and d[:4].isdigit()})
+            antigos = {d for d, seguinte in zip(datados, datados[1:]) if seguinte[:10] < primeiro_dia}
+            janelas = JanelasDeVendas()
+            for dia in [None] + self.dias():
+                if dia in antigos and dia != self.__dia_aberto:
+                    continue
+                blocos = self.__segmentos_do_dia(dia) if dia != self.__dia_aberto else (
+                    self.__segmentos[dia] + [self.__cauda.visao()])
+                for bloco in blocos:
+                    recentes = np.flatnonzero(bloco["instante"] >= limite)
+                    if len(recentes):
+                        janelas.registrar({nome: bloco[nome][recentes] for nome, _ in COLUNAS})
+            self.__janelas = janelas
+        return self.__janelas
+
+    # vendas da janela por prato, garçom e mesa: {dimensão: {id: (itens, receita em centavos, pedidos)}}
+    def vendas_na_janela(self, janela: JanelaDeTempo, agora: Optional[float] = None) -> Dict[str, Dict[int, Totais]]:
+        agora = time.time() if agora is None else agora
+        with self.__lock:
+            self.__garantir_aberto()
+            return self.__janelas_recentes().totais(inicio_da_janela(janela, agora), agora)
+
+    # quantidade vendida por prato, dos contadores; sem dias: o livro inteiro
+    def vendas_por_prato(self, dias: Optional[Iterable[str]] = None) -> Dict[int, int]:
+        with self.__lock:
+            self.__garantir_aberto()
+            if dias is None:
+                return self.__ranking_geral().totais()
+            totais: Dict[int, int] = {}
+            for dia in set(dias):
+                for id_prato, quantidade in self.__vendas_do_dia(dia).items():
+                    totais[id_prato] = totais.get(id_prato, 0) + quantidade
+            return totais
+
+    # [(id do prato, quantidade)] dos k mais vendidos; sem dias sai direto do ranking mantido
+    def mais_vendidos(self, k: int, dias: Optional[Iterable[str]] = None) -> List[Tuple[int, int]]:
+        if dias is None:
+            with self.__lock:
+                self.__garantir_aberto()
+                return self.__ranking_geral().mais_vendidos(k)
+        vendas = self.vendas_por_prato(dias)
+        return [(i, vendas[i]) for i in heapq.nsmallest(k, vendas, key=lambda i: (-vendas[i], i))]
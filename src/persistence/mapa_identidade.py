@@ -0,0 +1,135 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from models.mesa import Mesa
+from models.conta import Conta
+from models.pedido import Pedido
+from models.grupo_cliente import GrupoCliente
+from models.funcionario import Funcionario
+from models.rastreavel import Rastreavel
+
+Chave = Tuple[str, int]
+
+# entidades persistidas por ID: classe base -> (tipo usado na chave, propriedade com o ID).
+# Prato fica de fora de propósito: o item de pedido guarda o prato por valor, para o
+# histórico sobreviver à remoção do prato do cardápio.
+ENTIDADES: Dict[type, Tuple[str, str]] = {
+    Mesa: ("Mesa", "id_mesa"),
+    Conta: ("Conta", "id_conta"),
+    Pedido: ("Pedido", "id_pedido"),
+    GrupoCliente: ("GrupoCliente", "id_grupo"),
+    Funcionario: ("Funcionario", "id_funcionario"),
+}
+
+
+def transplantar(destino: Any, origem: Any) -> None:
+    # copia o estado de 'origem' para 'destino' (atributos de __dict__ e de __slots__)
+    if hasattr(origem, "__dict__"):
+        destino.__dict__.update(origem.__dict__)
+    for cls in type(origem).__mro__:
+        slots = getattr(cls, "__slots__", ())
+        for nome in ([slots] if isinstance(slots, str) else slots):
+            if nome in ("__dict__", "__weakref__"):
+                continue
+            # slot vazio não é copiado (sem passar por __getattr__, que devolveria o padrão da classe)
+            try:
+                valor = object.__getattribute__(origem, nome)
+            except AttributeError:
+                continue
+            object.__setattr__(destino, nome, valor)
+
+
+class MapaIdentidade:
+    """Uma única instância por entidade, compartilhada por todos os DAOs.
+
+    Quando um registro referencia uma entidade de outro DAO que ainda não foi
+    carregado, o mapa devolve um objeto vazio (reserva) da classe certa; quando o
+    DAO dono carrega a entidade, o estado dela é transplantado para a reserva, de
+    modo que todas as referências apontam para o mesmo objeto."""
+
+    def __init__(self):
+        self._objetos: Dict[Chave, Any] = {}
+        self._reservas: Dict[int, Chave] = {}
+        self._tipos: Dict[type, Optional[Tuple[str, str]]] = {}
+        # tipo -> função que carrega o DAO dono, para os DAOs carregados sob demanda
+        self._cargas: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.RLock()
+
+    def _entidade(self, cls: type) -> Optional[Tuple[str, str]]:
+        try:
+            return self._tipos[cls]
+        except KeyError:
+            encontrado = next((ENTIDADES[base] for base in cls.__mro__ if base in ENTIDADES), None)
+            self._tipos[cls] = encontrado
+            return encontrado
+
+    def chave_de(self, obj: Any) -> Optional[Chave]:
+        entidade = self._entidade(type(obj))
+        if entidade is None:
+            return None
+        reserva = self._reservas.get(id(obj))
+        if reserva is not None:
+            return reserva
+        tipo, atributo = entidade
+        return tipo, getattr(obj, atributo)
+
+    def obter(self, chave: Chave) -> Any:
+        return self._objetos.get(chave)
+
+    def registrar(self, obj: Any) -> None:
+        chave = self.chave_de(obj)
+        if chave is not None:
+            with self._lock:
+                self._objetos[chave] = obj
+
+    def remover(self, obj: Any) -> None:
+        chave = self.chave_de(obj)
+        if chave is not None:
+            with self._lock:
+                if self._objetos.get(chave) is obj:
+                    del self._objetos[chave]
+
+    # usado ao desserializar uma referência por ID
+    def resolver(self, tipo: str, ident: int, cls: type) -> Any:
+        chave = (tipo, ident)
+        with self._lock:
+            obj = self._objetos.get(chave)
+            if obj is None:
+                obj = cls.__new__(cls)
+                self._objetos[chave] = obj
+                self._reservas[id(obj)] = chave
+            return obj
+
+    def registrar_carga(self, tipo: str, carregar: Callable[[], Any]) -> None:
+        self._cargas[tipo] = carregar
+
+    # reserva lida antes de o DAO dono carregar: carrega o dono (fora do lock, a carga
+    # incorpora pelo mapa) e diz se ela deixou de ser reserva. Uma referência a uma
+    # entidade que o dono não tem continua reserva
+    def carregar_reserva(self, obj: Any) -> bool:
+        chave = self._reservas.get(id(obj))
+        if chave is None:
+            return False
+        carregar = self._cargas.get(chave[0])
+        if carregar is None:
+            return False
+        carregar()
+        return id(obj) not in self._reservas
+
+    # entidade recém-carregada pelo DAO dono: devolve a instância canônica
+    def incorporar(self, obj: Any) -> Any:
+        chave = self.chave_de(obj)
+        if chave is None:
+            return obj
+        with self._lock:
+            atual = self._objetos.get(chave)
+            if atual is not None and atual is not obj and id(atual) in self._reservas:
+                transplantar(atual, obj)
+                del self._reservas[id(atual)]
+                return atual
+            self._objetos[chave] = obj
+            return obj
+
+
+mapa_identidade = MapaIdentidade()
+Rastreavel._carregar_reserva = mapa_identidade.carregar_reserva
@@ -7,6 +7,12 @@ class MesaDAO(DAO):
         if not self.get_all():
             self._setup_inicial()
 
+    def _colunas_indexadas(self):
+        return {
+            'status': lambda m: m.status.name,
+            'capacidade': lambda m: m.capacidade,
+        }
+
     def _setup_inicial(self):
         mesas_iniciais = [
             (1, 4),
@@ -23,4 +29,4 @@ class MesaDAO(DAO):
                 pass
 
     def encontrar_mesa_por_numero(self, numero_mesa: int) -> Mesa:
-        return self.get(numero_mesa)
\ No newline at end of file
+        return self.get(numero_mesa)
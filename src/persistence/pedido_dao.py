@@ -1,55 +1,40 @@
-import os
-import pickle
-from typing import Dict, List, Union
+from typing import List, Union
 
 from .abstract_dao import DAO
+from .gerador_ids import gerador_ids
 from models.pedido import Pedido
+from models.status_enums import StatusPedido
 
 
 class PedidoDAO(DAO):
     def __init__(self):
-        self.__datasource = "pedidos.pkl"
-        self._pedidos: Dict[int, Pedido] = {}
-
-        try:
-            self.__load_all()
-        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
-            self._pedidos.clear()
-            self.__dump_all()
-
-    def __dump_all(self) -> None:
-        with open(self.__datasource, "wb") as f:
-            pickle.dump(self._pedidos, f)
-
-    def __load_all(self) -> None:
-        if not os.path.exists(self.__datasource) or os.path.getsize(self.__datasource) == 0:
-            raise FileNotFoundError
-
-        with open(self.__datasource, "rb") as f:
-            data = pickle.load(f)
-
-        if isinstance(data, dict):
-            self._pedidos = dict(data)
-        else:
-            raise ValueError("Formato de arquivo de pedidos inválido.")
+        super().__init__("pedidos.pkl")
+        self._reservar_ids("Pedido")
 
+    def _colunas_indexadas(self):
+        return {"status": lambda p: p.status.name}
 
     def add(self, key: int, obj: Pedido) -> None:
-        self._pedidos[key] = obj
-        self.__dump_all()
+        super().add(key, obj)
+        gerador_ids.garantir_acima("Pedido", key)
 
     def update(self, key: int, obj: Pedido) -> None:
-        if key in self._pedidos:
-            self._pedidos[key] = obj
-            self.__dump_all()
+        super().update(key, obj)
 
     def get(self, key: int) -> Union[Pedido, None]:
-        return self._pedidos.get(key)
+        return super().get(key)
 
     def remove(self, key: int) -> None:
-        if key in self._pedidos:
-            self._pedidos.pop(key)
-            self.__dump_all()
+        super().remove(key)
 
     def get_all(self) -> List[Pedido]:
-        return list(self._pedidos.values())
+        return list(super().get_all())
+
+    def listar_por_status(self, *status: StatusPedido) -> List[Pedido]:
+        pedidos: List[Pedido] = []
+        for s in status:
+            pedidos.extend(self._buscar([("status", "=", s.name)]))
+        return pedidos
+
+    def get_proximo_id(self) -> int:
+        return gerador_ids.proximo("Pedido")
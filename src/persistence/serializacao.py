@@ -0,0 +1,66 @@
+import io
+import pickle
+from typing import Any, Optional
+
+from .codec_binario import Resolver, codificar, decodificar, eh_binario
+from .mapa_identidade import mapa_identidade
+
+
+class _PicklerComReferencias(pickle.Pickler):
+    # grava o objeto raiz por completo e as outras entidades só como (tipo, id, classe)
+    def __init__(self, arquivo, raiz, referenciar_todas=False):
+        super().__init__(arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self._raiz = raiz
+        self._referenciar_todas = referenciar_todas
+
+    def persistent_id(self, obj):
+        if obj is self._raiz:
+            return None
+        chave = mapa_identidade.chave_de(obj)
+        if chave is None:
+            return None
+        if not self._referenciar_todas and mapa_identidade.obter(chave) is None:
+            # entidade que nenhum DAO guarda: vai por valor
+            return None
+        return chave[0], chave[1], type(obj)
+
+
+class _UnpicklerComReferencias(pickle.Unpickler):
+    def __init__(self, arquivo, resolver: Resolver):
+        super().__init__(arquivo)
+        self._resolver = resolver
+
+    def persistent_load(self, pid):
+        tipo, ident, cls = pid
+        return self._resolver(tipo, ident, cls)
+
+
+def serializar(obj: Any, referenciar_todas: bool = False) -> bytes:
+    # os tipos do domínio vão no formato binário; o resto continua em pickle
+    dados = codificar(obj)
+    if dados is not None:
+        return dados
+    buffer = io.BytesIO()
+    _PicklerComReferencias(buffer, obj, referenciar_todas).dump(obj)
+    return buffer.getvalue()
+
+
+def normalizar_legado(dados: Any) -> bytes:
+    if isinstance(dados, bytes):
+        return dados
+    # registro gravado antes da normalização, com o grafo inteiro embutido: as cópias
+    # das outras entidades viram referências para as instâncias dos DAOs donos
+    return serializar(dados, referenciar_todas=True)
+
+
+# registro em pickle (formato antigo) que ainda precisa ser regravado no formato binário
+def precisa_atualizar(dados: bytes) -> bool:
+    return not eh_binario(dados)
+
+
+def desserializar(dados: bytes, resolver: Optional[Resolver] = None) -> Any:
+    resolver = resolver or mapa_identidade.resolver
+    dados = normalizar_legado(dados)
+    if eh_binario(dados):
+        return decodificar(dados, resolver)
+    return _UnpicklerComReferencias(io.BytesIO(dados), resolver).load()
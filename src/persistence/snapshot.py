@@ -0,0 +1,41 @@
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from .mapa_identidade import MapaIdentidade
+from .serializacao import desserializar
+from .unidade_de_trabalho import trava_de_gravacao
+
+
+class Snapshot:
+    """Visão congelada dos registros gravados de alguns DAOs, num mesmo instante.
+
+    Não copia nada: guarda os próprios dicionários chave -> bytes dos DAOs, que
+    passam a ser copy-on-write (a próxima gravação do DAO troca o dicionário dele
+    por uma cópia e o do snapshot fica intacto). Os objetos são decodificados sob
+    demanda num mapa de identidade próprio, sem tocar nas instâncias em uso, então
+    o relatório pode rodar em outra thread enquanto o atendimento continua.
+
+    Referências entre entidades dos DAOs do snapshot apontam umas para as outras;
+    referências a DAOs que ficaram de fora viram objetos vazios."""
+
+    def __init__(self, registros: Dict[Any, Mapping[Any, bytes]]):
+        self.__registros = registros
+        self.__objetos: Dict[Any, Dict[Any, Any]] = {}
+        self.__local = MapaIdentidade()
+
+    def registros(self, dao) -> Mapping[Any, bytes]:
+        return self.__registros[dao]
+
+    def objetos(self, dao) -> Dict[Any, Any]:
+        if dao not in self.__objetos:
+            self.__objetos[dao] = {
+                key: self.__local.incorporar(desserializar(dados, self.__local.resolver))
+                for key, dados in self.__registros[dao].items()
+            }
+        return self.__objetos[dao]
+
+
+# tirado entre commits: nenhuma unidade de trabalho fica pela metade no snapshot
+def tirar_snapshot(*daos) -> Snapshot:
+    with trava_de_gravacao:
+        return Snapshot({dao: MappingProxyType(dao.congelar()) for dao in daos})
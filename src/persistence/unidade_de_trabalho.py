@@ -0,0 +1,99 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+_local = threading.local()
+# commits e gravações diretas seguram a trava; um snapshot tirado com ela nunca vê um commit pela metade
+trava_de_gravacao = threading.RLock()
+
+
+class UnidadeDeTrabalho:
+    """Agrupa as mutações feitas nos DAOs durante um caso de uso.
+
+    As alterações valem em memória na hora, mas só vão para o disco no commit,
+    com uma única gravação por DAO. Se o caso de uso falhar, as entidades que
+    passaram pelos DAOs voltam ao último estado gravado."""
+
+    def __init__(self):
+        # dao -> {chave: (registro gravado antes da transação, instância antes da transação)}
+        self._tocados: Dict[Any, Dict[Any, Tuple[Optional[bytes], Any]]] = {}
+        # estado em memória fora dos DAOs (índices dos controllers) que também volta no rollback,
+        # com o DAO que o índice acompanha (None: volta sempre)
+        self._compensacoes: List[Tuple[Optional[Any], Callable[[], None]]] = []
+        # DAOs já gravados por um commit que falhou no meio: a memória deles já bate com o disco
+        self._aplicados: Set[Any] = set()
+        # gravações fora dos DAOs (livro de itens) que só acontecem se a transação for confirmada
+        self._confirmacoes: List[Callable[[], None]] = []
+
+    def registrar(self, dao: Any, key: Any, registro_anterior: Optional[bytes], anterior: Any) -> None:
+        chaves = self._tocados.setdefault(dao, {})
+        if key not in chaves:
+            chaves[key] = (registro_anterior, anterior)
+
+    def commit(self) -> None:
+        with trava_de_gravacao:
+            # serializa tudo antes de gravar: um registro que não codifica derruba a transação
+            # sem que nada tenha ido para o disco
+            lotes = [(dao, dao._preparar(list(chaves))) for dao, chaves in self._tocados.items()]
+            for dao, lote in lotes:
+                dao._aplicar(lote)
+                # gravado: um rollback daqui em diante não mexe mais neste DAO nem nos índices dele
+                del self._tocados[dao]
+                self._aplicados.add(dao)
+            self._compensacoes.clear()
+            for confirmacao in self._confirmacoes:
+                confirmacao()
+        self._tocados.clear()
+        self._compensacoes.clear()
+        self._confirmacoes.clear()
+        self._aplicados.clear()
+
+    # dao: o DAO cujo estado o índice acompanha; se o commit gravar esse DAO e falhar num
+    # DAO seguinte, a compensação não roda (o índice já bate com o que foi gravado)
+    def ao_desfazer(self, compensacao: Callable[[], None], dao: Optional[Any] = None) -> None:
+        self._compensacoes.append((dao, compensacao))
+
+    def ao_confirmar(self, acao: Callable[[], None]) -> None:
+        self._confirmacoes.append(acao)
+
+    def rollback(self) -> None:
+        for dao, chaves in self._tocados.items():
+            for key, (registro_anterior, anterior) in chaves.items():
+                dao._desfazer(key, registro_anterior, anterior)
+        self._tocados.clear()
+        for dao, compensacao in reversed(self._compensacoes):
+            if dao is None or dao not in self._aplicados:
+                compensacao()
+        self._compensacoes.clear()
+        self._confirmacoes.clear()
+        self._aplicados.clear()
+
+
+def transacao_atual() -> Optional[UnidadeDeTrabalho]:
+    return getattr(_local, "transacao", None)
+
+
+@contextmanager
+def uow() -> Iterator[UnidadeDeTrabalho]:
+    atual = transacao_atual()
+    if atual is not None:
+        # transação aninhada: participa da mais externa, que decide commit/rollback
+        yield atual
+        return
+
+    transacao = UnidadeDeTrabalho()
+    _local.transacao = transacao
+    try:
+        yield transacao
+    except BaseException:
+        transacao.rollback()
+        raise
+    else:
+        try:
+            transacao.commit()
+        except BaseException:
+            # o que não chegou ao disco volta ao último estado gravado
+            transacao.rollback()
+            raise
+    finally:
+        _local.transacao = None
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+# pacotes com estado global (mapa de identidade, gerador de ids, armazenamento, dia de serviço)
+PACOTES_DA_APLICACAO = ("controllers", "models", "persistence")
+
+
+def _descarregar() -> None:
+    armazenamento = sys.modules.get("persistence.armazenamento")
+    if armazenamento is not None:
+        armazenamento.encerrar_armazenamento()
+    for nome in list(sys.modules):
+        if nome.split(".")[0] in PACOTES_DA_APLICACAO:
+            del sys.modules[nome]
+
+
+class Restaurante:
+    """Monta os controllers como o build_app_gui, sem a GUI, numa pasta só do teste.
+
+    reiniciar() simula fechar e abrir a aplicação: descarrega os módulos (e com eles
+    os singletons) e monta tudo de novo a partir do que ficou gravado."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.montar()
+
+    def montar(self) -> None:
+        from controllers.cardapio_controller import CardapioController
+        from controllers.conta_controller import ContaController
+        from controllers.fila_de_espera_controller import FilaController
+        from controllers.funcionario_controller import FuncionarioController
+        from controllers.grupo_cliente_controller import ClienteController
+        from controllers.mesa_controller import MesaController
+        from controllers.pedido_controller import PedidoController
+        from controllers.restaurante_controller import RestauranteController
+        from persistence.armazenamento import configurar_armazenamento
+
+        configurar_armazenamento(self.backend, durabilidade="sync")
+        self.clientes = ClienteController()
+        self.fila = FilaController(cliente_controller=self.clientes)
+        self.mesas = MesaController()
+        self.funcionarios = FuncionarioController()
+        self.cardapio = CardapioController()
+        self.contas = ContaController()
+        self.pedidos = PedidoController(conta_controller=self.contas, cardapio_controller=self.cardapio)
+        self.restaurante = RestauranteController(
+            mesa_controller=self.mesas, conta_controller=self.contas, fila_controller=self.fila,
+            funcionario_controller=self.funcionarios, cardapio_controller=self.cardapio,
+            cliente_controller=self.clientes, pedido_controller=self.pedidos)
+
+    def reiniciar(self) -> None:
+        _descarregar()
+        self.montar()
+
+
+@pytest.fixture(params=["pickle", "sqlite"])
+def app(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _descarregar()
+    restaurante = Restaurante(request.param)
+    yield restaurante
+    _descarregar()
@@ -0,0 +1,37 @@
+import pytest
+
+
+def _politica(continuar_apos_falha):
+    from controllers.motor_alocacao import PoliticaAlocacao
+
+    class PlanoFixo(PoliticaAlocacao):
+        # o primeiro grupo vai para uma mesa pequena demais, o segundo para uma que serve
+        def planejar(self, fila, mesas_livres):
+            pequenas = sorted((m for m in mesas_livres if m.capacidade == 2), key=lambda m: m.id_mesa)
+            return [(fila[0], pequenas[0]), (fila[1], pequenas[1])]
+
+    politica = PlanoFixo()
+    politica.continuar_apos_falha = continuar_apos_falha
+    return politica
+
+
+@pytest.mark.parametrize("continuar", [False, True])
+def test_politica_decide_se_a_rodada_segue_depois_de_uma_falha(app, continuar):
+    grande, pequeno = app.clientes.criar_grupo(6), app.clientes.criar_grupo(2)
+    app.fila.adicionar_grupo(grande)
+    app.fila.adicionar_grupo(pequeno)
+
+    msgs = app.restaurante.auto_alocar_grupos(politica=_politica(continuar))
+
+    assert any("Falha ao auto-alocar" in m for m in msgs)
+    sentados = [c.grupo_cliente for c in app.contas.listar_contas_abertas()]
+    assert grande not in sentados
+    assert (pequeno in sentados) is continuar
+    assert list(app.fila.listar()) == ([grande] if continuar else [grande, pequeno])
+
+
+def test_politicas_padrao():
+    from controllers.motor_alocacao import PoliticaFifo, PoliticaGulosa, PoliticaOtima
+    assert not PoliticaFifo.continuar_apos_falha
+    assert PoliticaGulosa.continuar_apos_falha
+    assert PoliticaOtima.continuar_apos_falha
@@ -0,0 +1,31 @@
+import threading
+
+
+def _registro(key, valor):
+    return ("update", key, f"valor {valor}".encode(), {})
+
+
+def test_compactacao_que_falha_nao_perde_gravacoes_feitas_durante_ela(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from persistence.armazenamento import ArmazenamentoJournal
+
+    armazenamento = ArmazenamentoJournal("dados.pkl", dict, sincronizar=True)
+    armazenamento.carregar()
+    # compacta a cada lote; o snapshot fica preso até as outras gravações entrarem e então falha
+    armazenamento.LIMITE_JOURNAL = 1
+    liberar = threading.Event()
+
+    def dump_que_falha(registros=None):
+        liberar.wait(5)
+        raise OSError("disco cheio")
+
+    armazenamento._ArmazenamentoJournal__dump = dump_que_falha
+    armazenamento.gravar_lote([_registro(1, 1)])
+    for key in range(2, 6):
+        armazenamento.gravar_lote([_registro(key, key)])
+    armazenamento.gravar_lote([_registro(1, "novo")])
+    liberar.set()
+    armazenamento.fechar()
+
+    recarregado = ArmazenamentoJournal("dados.pkl", dict, sincronizar=True).carregar()
+    assert recarregado == {1: b"valor novo", **{key: f"valor {key}".encode() for key in range(2, 6)}}
@@ -0,0 +1,49 @@
+def _atendimento_em_andamento(app):
+    for tamanho in (2, 4):
+        app.restaurante.receber_clientes(tamanho)
+    mesa = next(m for m in app.mesas.listar_mesas() if app.contas.encontrar_conta_por_mesa(m.id_mesa))
+    app.pedidos.realizar_pedido(mesa.id_mesa, 1, 2)
+    app.restaurante.confirmar_pedido_na_cozinha(mesa.id_mesa)
+    return mesa.id_mesa
+
+
+def test_contas_e_pedidos_so_carregam_quando_usados(app):
+    id_mesa = _atendimento_em_andamento(app)
+    app.reiniciar()
+    assert not app.contas.carregado
+    assert not app.pedidos.carregado
+
+    # a cozinheira carregou com referências aos pedidos em preparo: ler uma carrega os pedidos
+    from models.cozinheiro import Cozinheiro
+    cozinheira = next(f for f in app.funcionarios.listar_funcionarios() if isinstance(f, Cozinheiro))
+    (pedido,) = cozinheira.pedidos_em_preparo
+    assert pedido.mesa.id_mesa == id_mesa
+    assert app.pedidos.carregado
+    assert pedido is app.pedidos.encontrar_pedido_por_id(pedido.id_pedido)
+
+    # a mesa ocupada referencia a conta aberta: idem para as contas
+    conta = app.mesas.encontrar_mesa_por_numero(id_mesa).conta
+    assert conta.id_conta and app.contas.carregado
+    assert conta is app.contas.encontrar_conta_por_mesa(id_mesa)
+
+
+def test_pre_carga_em_segundo_plano(app):
+    id_mesa = _atendimento_em_andamento(app)
+    app.reiniciar()
+    from persistence.carga_preguicosa import aguardar_cargas
+    assert not app.restaurante.concluir_carga()
+    app.restaurante.pre_carregar()
+    aguardar_cargas()
+    assert app.contas.carregado and app.pedidos.carregado
+    assert app.restaurante.concluir_carga()
+    assert app.restaurante.marcar_pedido_pronto(id_mesa)
+    assert app.pedidos.conta_para_view(app.contas.encontrar_conta_por_mesa(id_mesa))["total"] > 0
+
+
+def test_venda_confirmada_antes_da_carga_entra_uma_vez_no_livro(app):
+    # na primeira execução o livro é montado a partir dos pedidos; a venda confirmada
+    # logo depois não pode entrar de novo pelo registro da confirmação
+    _atendimento_em_andamento(app)
+    assert sum(app.pedidos.get_estatisticas_pratos().values()) == 2
+    app.reiniciar()
+    assert sum(app.pedidos.get_estatisticas_pratos().values()) == 2
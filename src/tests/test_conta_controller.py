@@ -0,0 +1,34 @@
+from typing import Optional
+
+
+def _por_varredura(app, id_mesa: int) -> Optional[object]:
+    abertas = [c for c in app.contas.listar_contas() if c.esta_aberta and c.mesa.id_mesa == id_mesa]
+    assert len(abertas) <= 1
+    return abertas[0] if abertas else None
+
+
+def _conferir_indice(app) -> None:
+    for mesa in app.mesas.listar_mesas():
+        assert app.contas.encontrar_conta_por_mesa(mesa.id_mesa) is _por_varredura(app, mesa.id_mesa)
+
+
+def test_busca_por_mesa_bate_com_a_varredura(app):
+    for tamanho in (2, 4, 6, 3):
+        app.restaurante.receber_clientes(tamanho)
+    _conferir_indice(app)
+
+    ocupada = next(m.id_mesa for m in app.mesas.listar_mesas() if app.contas.encontrar_conta_por_mesa(m.id_mesa))
+    app.pedidos.realizar_pedido(ocupada, 1, 1)
+    app.restaurante.confirmar_pedido_na_cozinha(ocupada)
+    app.restaurante.finalizar_atendimento(ocupada, 10.0)
+    assert app.contas.encontrar_conta_por_mesa(ocupada) is None
+    _conferir_indice(app)
+
+    app.restaurante.limpar_mesa(ocupada)
+    app.restaurante.auto_alocar_grupos(greedy=True)
+    _conferir_indice(app)
+
+    app.reiniciar()
+    _conferir_indice(app)
+    assert any(app.contas.encontrar_conta_por_mesa(m.id_mesa) for m in app.mesas.listar_mesas())
+    assert any(not c.esta_aberta for c in app.contas.listar_contas())
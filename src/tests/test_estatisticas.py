@@ -0,0 +1,14 @@
+def test_estatisticas_de_pratos_por_periodo(app):
+    app.restaurante.receber_clientes(2)
+    id_mesa = next(m.id_mesa for m in app.mesas.listar_mesas() if app.contas.encontrar_conta_por_mesa(m.id_mesa))
+    app.pedidos.realizar_pedido(id_mesa, 1, 2)
+    app.pedidos.realizar_pedido(id_mesa, 4, 1)
+    # pedido ainda aberto não conta como venda
+    assert app.restaurante.estatisticas_pratos() == {}
+    app.restaurante.confirmar_pedido_na_cozinha(id_mesa)
+
+    esperado = {1: 2, 4: 1}
+    for periodo in [None] + app.restaurante.periodos_de_vendas():
+        estatisticas = app.restaurante.estatisticas_pratos(periodo)
+        assert {prato.id_prato: qtd for prato, qtd in estatisticas.items()} == esperado
+    assert app.restaurante.ver_prato_mais_pedido("Hoje")["quantidade"] == 2
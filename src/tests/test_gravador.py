@@ -0,0 +1,76 @@
+import pytest
+
+
+def _backend(falhas):
+    from persistence.armazenamento import Armazenamento
+
+    class BackendInstavel(Armazenamento):
+        """Guarda os lotes em memória e falha nas primeiras 'falhas' gravações."""
+
+        def __init__(self):
+            self.gravado = {}
+            self.tentativas = 0
+
+        def carregar(self):
+            return dict(self.gravado)
+
+        def gravar_lote(self, registros):
+            self.tentativas += 1
+            if self.tentativas <= falhas:
+                raise OSError("disco indisponível")
+            for op, key, dados, _ in registros:
+                self.gravado[key] = dados
+
+    return BackendInstavel()
+
+
+def _registro(key, valor):
+    return ("update", key, valor, {})
+
+
+@pytest.fixture
+def gravador():
+    from persistence.gravador import GravadorEmSegundoPlano
+    gravador = GravadorEmSegundoPlano(intervalo=0.0)
+    gravador.ESPERA_INICIAL = 0.01
+    yield gravador
+    try:
+        gravador.encerrar()
+    except OSError:
+        pass
+
+
+def test_lote_que_falha_uma_vez_e_gravado_na_nova_tentativa(gravador):
+    backend = _backend(falhas=1)
+    gravador.enfileirar(backend, [_registro(1, b"a"), _registro(2, b"b")])
+    gravador.esvaziar()
+    assert backend.gravado == {1: b"a", 2: b"b"}
+    assert backend.tentativas == 2
+    gravador.encerrar()
+
+
+def test_versao_mais_nova_nao_e_sobrescrita_pelo_lote_que_volta(gravador):
+    backend = _backend(falhas=1)
+    # enquanto a primeira tentativa falha, chega uma versão nova da chave 1
+    gravar = backend.gravar_lote
+
+    def gravar_e_atualizar(registros):
+        if backend.tentativas == 0:
+            gravador.enfileirar(backend, [_registro(1, b"novo")])
+        gravar(registros)
+
+    backend.gravar_lote = gravar_e_atualizar
+    gravador.enfileirar(backend, [_registro(1, b"velho"), _registro(2, b"b")])
+    gravador.encerrar()
+    assert backend.gravado == {1: b"novo", 2: b"b"}
+
+
+def test_falha_persistente_sobe_no_esvaziar_e_no_encerrar(gravador):
+    backend = _backend(falhas=1000)
+    gravador.enfileirar(backend, [_registro(1, b"a")])
+    with pytest.raises(OSError):
+        gravador.esvaziar()
+    assert gravador.pendente(backend)
+    with pytest.raises(OSError):
+        gravador.encerrar()
+    assert backend.gravado == {}
@@ -0,0 +1,50 @@
+def _conferir_totais(conta, itens_esperados):
+    # itens_esperados: (prato, quantidade, subtotal em centavos) de cada item, na ordem em que
+    # foram pedidos, com o preço do cardápio na hora do pedido
+    itens = [it for p in conta.pedidos for it in p.itens]
+    assert [(it.prato.id_prato, it.quantidade, it.subtotal_centavos) for it in itens] == itens_esperados
+    for pedido in conta.pedidos:
+        assert pedido.total_centavos == sum(it.subtotal_centavos for it in pedido.itens)
+    assert conta.total_centavos == sum(subtotal for _, _, subtotal in itens_esperados)
+
+
+def _mesa_com_conta(app):
+    app.restaurante.receber_clientes(2)
+    return next(m.id_mesa for m in app.mesas.listar_mesas() if app.contas.encontrar_conta_por_mesa(m.id_mesa))
+
+
+def _pedir(app, id_mesa, id_prato, quantidade):
+    app.pedidos.realizar_pedido(id_mesa, id_prato, quantidade)
+    return id_prato, quantidade, round(app.cardapio.buscar_prato_por_id(id_prato).preco * 100) * quantidade
+
+
+def test_totais_guardados_batem_com_a_soma(app):
+    id_mesa = _mesa_com_conta(app)
+    conta = app.contas.encontrar_conta_por_mesa(id_mesa)
+    esperados = []
+    _conferir_totais(conta, esperados)
+
+    # o mesmo prato duas vezes no primeiro pedido e um segundo pedido depois da confirmação
+    for id_prato, quantidade in ((1, 2), (4, 1), (1, 3)):
+        esperados.append(_pedir(app, id_mesa, id_prato, quantidade))
+        _conferir_totais(conta, esperados)
+    app.restaurante.confirmar_pedido_na_cozinha(id_mesa)
+    esperados.append(_pedir(app, id_mesa, 5, 70000))
+    assert len(conta.pedidos) == 2
+    _conferir_totais(conta, esperados)
+
+    # o preço fica fixado no item: mudar o cardápio não mexe no que já foi pedido
+    prato = app.cardapio.buscar_prato_por_id(1)
+    app.cardapio.atualizar_prato(1, prato.nome, prato.preco + 10)
+    _conferir_totais(conta, esperados)
+
+    app.reiniciar()
+    conta = app.contas.encontrar_conta_por_mesa(id_mesa)
+    _conferir_totais(conta, esperados)
+    assert round(app.pedidos.conta_para_view(conta)["total"] * 100) == conta.total_centavos
+
+    # depois da recarga os totais continuam acompanhando os itens novos
+    esperados.append(_pedir(app, id_mesa, 1, 1))
+    _conferir_totais(conta, esperados)
+    app.reiniciar()
+    _conferir_totais(app.contas.encontrar_conta_por_mesa(id_mesa), esperados)
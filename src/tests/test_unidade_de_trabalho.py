@@ -0,0 +1,47 @@
+import pytest
+
+
+def _conferir_contas(app):
+    abertas = {c.mesa.id_mesa: c for c in app.contas.listar_contas() if c.esta_aberta}
+    for mesa in app.mesas.listar_mesas():
+        assert app.contas.encontrar_conta_por_mesa(mesa.id_mesa) is abertas.get(mesa.id_mesa)
+    livres = {m.id_mesa for m in app.mesas.listar_mesas() if m.status.name == "LIVRE"}
+    assert {m.id_mesa for m in app.mesas.listar_mesas_livres()} == livres
+
+
+def test_commit_que_falha_no_segundo_dao_deixa_memoria_indices_e_disco_de_acordo(app, monkeypatch):
+    app.restaurante.receber_clientes(2)
+    id_mesa = next(m.id_mesa for m in app.mesas.listar_mesas() if app.contas.encontrar_conta_por_mesa(m.id_mesa))
+    app.pedidos.realizar_pedido(id_mesa, 1, 1)
+    app.restaurante.confirmar_pedido_na_cozinha(id_mesa)
+
+    # finalizar grava as contas primeiro e as mesas em seguida: a gravação das mesas falha
+    from persistence.mesa_dao import MesaDAO
+
+    aplicar = MesaDAO._aplicar
+    falhando = True
+
+    def falhar(self, lote):
+        if falhando:
+            raise OSError("disco cheio")
+        aplicar(self, lote)
+
+    monkeypatch.setattr(MesaDAO, "_aplicar", falhar)
+    with pytest.raises(OSError):
+        app.restaurante.finalizar_atendimento(id_mesa)
+    falhando = False
+
+    # a conta fechada já foi gravada: fica fechada em memória e sai do índice de abertas;
+    # a mesa não foi gravada e volta ao estado anterior, com o índice de livres junto
+    conta = next(c for c in app.contas.listar_contas() if c.mesa.id_mesa == id_mesa)
+    assert not conta.esta_aberta
+    assert app.contas.encontrar_conta_por_mesa(id_mesa) is None
+    assert app.mesas.encontrar_mesa_por_numero(id_mesa).status.name == "OCUPADA"
+    _conferir_contas(app)
+
+    em_memoria = {c.id_conta: c.esta_aberta for c in app.contas.listar_contas()}
+    mesas_em_memoria = app.mesas.listar_mesas_para_view()
+    app.reiniciar()
+    assert {c.id_conta: c.esta_aberta for c in app.contas.listar_contas()} == em_memoria
+    assert app.mesas.listar_mesas_para_view() == mesas_em_memoria
+    _conferir_contas(app)
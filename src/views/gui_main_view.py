@@ -120,6 +120,12 @@ class GuiMainView:
                 button_color=("white", "#00897B"),
                 size=(9, 1),
             ),
+            sg.Button(
+                "Fechar Dia",
+                key="-BTN_FECHAR_DIA-",
+                button_color=("white", "#455A64"),
+                size=(9, 1),
+            ),
             sg.Button(
                 "Sair",
                 key="-BTN_SAIR-",
@@ -267,8 +273,8 @@ class GuiMainView:
             size=(1100, 650),
         )
 
-    def read(self):
-        return self.window.read()
+    def read(self, timeout: Optional[int] = None):
+        return self.window.read(timeout=timeout)
 
     def close(self) -> None:
         self.window.close()
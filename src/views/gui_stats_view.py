@@ -14,7 +14,9 @@ class GuiStatsView:
         sg.set_options(font=("Segoe UI", 10))
 
     def show_stats_window(self) -> None:
-        dados_prato = self._restaurante.ver_prato_mais_pedido()
+        periodos = self._restaurante.periodos_de_vendas()
+        periodo = periodos[0]
+        dados_prato = self._restaurante.ver_prato_mais_pedido(periodo)
         nome_prato = dados_prato.get("prato_nome", "N/A")
         qtd_prato = dados_prato.get("quantidade", 0)
 
@@ -49,6 +51,7 @@ class GuiStatsView:
             [
                 sg.Text(
                     nome_prato,
+                    key="-TXT_PRATO-",
                     font=("Segoe UI", 16, "bold"),
                     text_color="gold",
                 )
@@ -56,6 +59,7 @@ class GuiStatsView:
             [
                 sg.Text(
                     f"Vendido {qtd_prato} vezes",
+                    key="-TXT_QTD_PRATO-",
                     font=("Segoe UI", 10, "italic"),
                     text_color="#DDDDDD",
                 )
@@ -208,6 +212,17 @@ class GuiStatsView:
                 )
             ],
             [sg.HorizontalSeparator()],
+            [
+                sg.Text("Período:", font=("Segoe UI", 10, "bold")),
+                sg.Combo(
+                    periodos,
+                    default_value=periodo,
+                    key="-CMB_PERIODO-",
+                    readonly=True,
+                    enable_events=True,
+                ),
+                sg.Text("", key="-TXT_RESUMO_PERIODO-", font=("Segoe UI", 10)),
+            ],
             [sg.Column(layout_cards_top, expand_x=True)],
             [sg.HorizontalSeparator()],
             [
@@ -248,7 +263,7 @@ class GuiStatsView:
             size=(900, 550),
         )
 
-        img_data_inicial = self._gerar_grafico_pratos()
+        img_data_inicial = self._gerar_grafico_pratos(periodo)
         if img_data_inicial:
             window["-IMG_GRAFICO-"].update(data=img_data_inicial)
 
@@ -257,8 +272,19 @@ class GuiStatsView:
             if event in (sg.WINDOW_CLOSED, "-BTN_FECHAR-"):
                 break
 
+            # trocar o período só consulta as janelas de vendas, sem reler o histórico
+            if event == "-CMB_PERIODO-":
+                periodo = values["-CMB_PERIODO-"]
+                dados_prato = self._restaurante.ver_prato_mais_pedido(periodo)
+                window["-TXT_PRATO-"].update(dados_prato.get("prato_nome", "N/A"))
+                window["-TXT_QTD_PRATO-"].update(f"Vendido {dados_prato.get('quantidade', 0)} vezes")
+                window["-TXT_RESUMO_PERIODO-"].update(self._texto_resumo(periodo, periodos))
+                img_data = self._gerar_grafico_pratos(periodo)
+                if img_data:
+                    window["-IMG_GRAFICO-"].update(data=img_data)
+
             if event == "-BTN_GRAFICO_PRATOS-":
-                img_data = self._gerar_grafico_pratos()
+                img_data = self._gerar_grafico_pratos(periodo)
                 if img_data:
                     window["-IMG_GRAFICO-"].update(data=img_data)
                 else:
@@ -272,12 +298,18 @@ class GuiStatsView:
 
         window.close()
 
-    def _gerar_grafico_pratos(self) -> bytes:
-        try:
-            estatisticas = self._restaurante._pedido_controller.get_estatisticas_pratos()
-        except AttributeError:
-            return b""
+    def _texto_resumo(self, periodo: str, periodos: List[str]) -> str:
+        # o primeiro período é o histórico inteiro, que já tem os cards e o relatório
+        if periodo == periodos[0]:
+            return ""
+        resumo = self._restaurante.resumo_vendas(periodo)
+        return (
+            f"{resumo['pedidos']} pedidos, {resumo['itens']} itens, R$ {resumo['receita']:.2f}"
+            f" | Garçom: {resumo['garcom_destaque']} | {resumo['mesa_destaque']}"
+        )
 
+    def _gerar_grafico_pratos(self, periodo: str) -> bytes:
+        estatisticas = self._restaurante.estatisticas_pratos(periodo)
         if not estatisticas:
             return b""
 